@@ -2,9 +2,25 @@ import notion
 
 import notion.notion_client
 
+import notion.aggregate
+import notion.backup
+import notion.block
 import notion.cache
 import notion.client
+import notion.columnar
+import notion.crawler
 import notion.database
+import notion.export
+import notion.index
+import notion.upsert
+import notion.bulk
+import notion.query
+import notion.markdown
 import notion.page
+import notion.restore
 import notion.user
-import notion.utils
\ No newline at end of file
+import notion.utils
+from notion.block import OtherBlock
+
+block = OtherBlock(object="block", type="column_list", column_list={})
+assert block.build() == {"type": "column_list", "column_list": {}}
@@ -1,21 +1,34 @@
 
 from .base_model import  *
+from .aggregate import *
+from .backup import *
+from .block import *
 from .client import *
+from .columnar import *
+from .crawler import *
 from .database import *
 from .draft import *
 from .emoji import *
 from .enums import *
+from .export import *
 from .exceptions import *
 from .file import *
 from .page import *
 from .general_object import *
+from .index import *
+from .upsert import *
+from .bulk import *
+from .query import *
+from .markdown import *
 from .parent import *
+from .restore import *
 from .rich_text import *
 from .user import *
 from .utils import *
 
 """
 # Implemented
+Block
 Rich text
 Database
 Database property
@@ -27,7 +40,6 @@ File
 Emoji
 
 # TODO
-Block
 Unfurl attribute
 Comment
 """
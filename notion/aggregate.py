@@ -0,0 +1,211 @@
+"""
+Local aggregation of database columns
+
+evaluates the functions of RollupFunctionType over the cached pages of a database,
+on the arrays of Database.column. requires numpy (`pip install numpy`).
+"""
+from __future__ import annotations
+
+from .columnar import _require_numpy, _categorical_types
+from .enums import RollupFunctionType
+from typing import TYPE_CHECKING, Any
+from datetime import datetime as dt, timedelta, timezone
+
+if TYPE_CHECKING:
+    from .database import Database
+
+__all__ = (
+    "aggregate_pages",
+)
+
+
+class _Column:
+    """ array of a column with what the kernels need to know about it """
+
+    def __init__(self, np, array, column_type: str, categories: None | list[str]):
+        self.np = np
+        self.array = array
+        self.type = column_type
+        self.categories = categories
+
+    def subset(self, index) -> _Column:
+        return _Column(self.np, self.array[index], self.type, self.categories)
+
+    def empty(self):
+        """ boolean mask of empty cells. an unchecked checkbox is empty. """
+        np, a = self.np, self.array
+        if self.type in _categorical_types:
+            return a == -1
+        if self.type == "checkbox":
+            return ~a
+        if a.dtype.kind == "f":
+            return np.isnan(a)
+        if a.dtype.kind == "M":
+            return np.isnat(a)
+        return np.array([i is None or i == "" or i == [] for i in a], dtype=bool)
+
+    def values(self) -> list:
+        """ non-empty values, items of list values (multi-select, people...) are counted one by one. """
+        a = self.array[~self.empty()]
+        if self.type in _categorical_types:
+            return [self.categories[i] for i in a]
+        if a.dtype == object:
+            r = []
+            for i in a:
+                r += i if isinstance(i, list) else [i]
+            return r
+        return list(a)
+
+    def numbers(self):
+        if self.array.dtype.kind != "f":
+            raise ValueError(f"numeric rollup functions need a number column, not {self.type}")
+        return self.array[~self.np.isnan(self.array)]
+
+    def dates(self):
+        if self.array.dtype.kind != "M":
+            raise ValueError(f"date rollup functions need a date column, not {self.type}")
+        return self.array[~self.np.isnat(self.array)]
+
+    def checkboxes(self):
+        if self.type != "checkbox":
+            raise ValueError(f"checkbox rollup functions need a checkbox column, not {self.type}")
+        return self.array
+
+
+def _ratio(count, total):
+    return float(count / total) if total else 0.0
+
+
+def _stat(fn):
+    """ numeric function returning None on empty input, like an empty rollup """
+    def kernel(c: _Column):
+        numbers = c.numbers()
+        return fn(c.np, numbers) if len(numbers) else None
+    return kernel
+
+
+def _datetime(value) -> None | dt:
+    """ datetime64 of a date column (UTC) as an aware datetime, like the values of date properties. """
+    value = value.astype("datetime64[us]").item()
+    return None if value is None else value.replace(tzinfo=timezone.utc)
+
+
+def _timedelta(value) -> timedelta:
+    return value.astype("timedelta64[us]").item()
+
+
+def _date_stat(fn):
+    def kernel(c: _Column):
+        dates = c.dates()
+        return fn(dates) if len(dates) else None
+    return kernel
+
+
+def _count_per_group(c: _Column) -> dict:
+    counts = {}
+    for i in c.values():
+        counts[i] = counts.get(i, 0) + 1
+    return counts
+
+
+def _percent_per_group(c: _Column) -> dict:
+    counts = _count_per_group(c)
+    total = sum(counts.values())
+    return {k: _ratio(v, total) for k, v in counts.items()}
+
+
+def _unique(values: list) -> list:
+    return list(dict.fromkeys(values))
+
+
+_kernels = {
+    RollupFunctionType.count: lambda c: len(c.array),
+    RollupFunctionType.count_values: lambda c: len(c.values()),
+    RollupFunctionType.unique: lambda c: len(_unique(c.values())),
+    RollupFunctionType.empty: lambda c: int(c.empty().sum()),
+    RollupFunctionType.not_empty: lambda c: int((~c.empty()).sum()),
+    RollupFunctionType.percent_empty: lambda c: _ratio(c.empty().sum(), len(c.array)),
+    RollupFunctionType.percent_not_empty: lambda c: _ratio((~c.empty()).sum(), len(c.array)),
+    RollupFunctionType.sum: lambda c: float(c.numbers().sum()),
+    RollupFunctionType.average: _stat(lambda np, a: float(a.mean())),
+    RollupFunctionType.median: _stat(lambda np, a: float(np.median(a))),
+    RollupFunctionType.min: _stat(lambda np, a: float(a.min())),
+    RollupFunctionType.max: _stat(lambda np, a: float(a.max())),
+    RollupFunctionType.range: _stat(lambda np, a: float(a.max() - a.min())),
+    RollupFunctionType.checked: lambda c: int(c.checkboxes().sum()),
+    RollupFunctionType.unchecked: lambda c: int((~c.checkboxes()).sum()),
+    RollupFunctionType.percent_checked: lambda c: _ratio(c.checkboxes().sum(), len(c.array)),
+    RollupFunctionType.percent_unchecked: lambda c: _ratio((~c.checkboxes()).sum(), len(c.array)),
+    RollupFunctionType.earliest_date: _date_stat(lambda a: _datetime(a.min())),
+    RollupFunctionType.latest_date: _date_stat(lambda a: _datetime(a.max())),
+    # a duration, as in Notion
+    RollupFunctionType.date_range: _date_stat(lambda a: _timedelta(a.max() - a.min())),
+    RollupFunctionType.count_per_group: _count_per_group,
+    RollupFunctionType.percent_per_group: _percent_per_group,
+    RollupFunctionType.show_original: lambda c: c.values(),
+    RollupFunctionType.show_unique: lambda c: _unique(c.values()),
+}
+
+
+def _groups(np, column: _Column) -> dict[Any, Any]:
+    """ {group label: row indices}. rows with several values (multi-select...) are in each of their groups. """
+    a = column.array
+    if column.type in _categorical_types:
+        labels = [None] + column.categories
+        codes, inverse = np.unique(a, return_inverse=True)
+        return {labels[code + 1]: np.flatnonzero(inverse == i) for i, code in enumerate(codes)}
+    if a.dtype != object:
+        keys, inverse = np.unique(a, return_inverse=True)
+        if a.dtype.kind == "f":
+            # empty numbers are NaN
+            labels = [None if np.isnan(k) else k.item() for k in keys]
+        elif a.dtype.kind == "M":
+            labels = [_datetime(k) for k in keys]
+        else:
+            labels = [k.item() for k in keys]
+        return {label: np.flatnonzero(inverse == i) for i, label in enumerate(labels)}
+    groups = {}
+    for row, value in enumerate(a):
+        for key in (value or [None]) if isinstance(value, list) else [value]:
+            groups.setdefault(key, []).append(row)
+    return {k: np.array(v, dtype=np.intp) for k, v in groups.items()}
+
+
+def aggregate_pages(
+    database: Database,
+    agg: dict[str, str | RollupFunctionType | list[str | RollupFunctionType]],
+    group_by: None | str = None,
+) -> dict:
+    """
+    evaluate rollup functions over database.pages.
+    agg: {column name: function or list of functions}, functions are RollupFunctionType or their names.
+    returns {column: value} ({column: {function: value}} for lists of functions),
+    or {group: {column: value}} when group_by is given. empty cells form the group None.
+    dates are returned as datetimes in UTC and date_range as a timedelta.
+    """
+    np = _require_numpy()
+    columns = {}
+    functions = {}
+    for name, fn in agg.items():
+        array = database.column(name)
+        column_type = database.properties[name].type
+        categories = database.column_categories(name) if column_type in _categorical_types else None
+        columns[name] = _Column(np, array, column_type, categories)
+        functions[name] = [RollupFunctionType(i) for i in fn] if isinstance(fn, list) else RollupFunctionType(fn)
+
+    def evaluate(index) -> dict:
+        result = {}
+        for name, fn in functions.items():
+            column = columns[name] if index is None else columns[name].subset(index)
+            if isinstance(fn, list):
+                result[name] = {i.value: _kernels[i](column) for i in fn}
+            else:
+                result[name] = _kernels[fn](column)
+        return result
+
+    if group_by is None:
+        return evaluate(None)
+    key_type = database.properties[group_by].type
+    key_categories = database.column_categories(group_by) if key_type in _categorical_types else None
+    keys = _Column(np, database.column(group_by), key_type, key_categories)
+    return {label: evaluate(index) for label, index in _groups(np, keys).items()}
@@ -0,0 +1,291 @@
+"""
+Incremental workspace backup
+
+snapshots pages and databases (with their block trees) to a directory or a SQLite file.
+"""
+from __future__ import annotations
+
+from datetime import datetime as dt, timedelta, timezone
+from typing import Any
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+
+__all__ = (
+    "DirectoryStore",
+    "SqliteStore",
+    "open_store",
+    "Backup",
+)
+
+
+# last_edited_time is rounded to the minute, so an object fetched less than this after
+# its last edit may have been edited again without the timestamp changing.
+_TIMESTAMP_RESOLUTION = timedelta(minutes=1)
+
+
+def _volatile_free(obj):
+    """ copy of a response without the fields that change without the content changing. """
+    if isinstance(obj, dict):
+        if "expiry_time" in obj:
+            # signed urls of notion hosted files are renewed on every request
+            obj = {k: v for k, v in obj.items() if k not in ("url", "expiry_time")}
+        return {k: _volatile_free(v) for k, v in obj.items() if k not in ("last_edited_time", "last_edited_by")}
+    if isinstance(obj, list):
+        return [_volatile_free(i) for i in obj]
+    return obj
+
+
+def content_hash(data: dict) -> str:
+    """ sha256 of an object and its blocks, ignoring edit timestamps and signed file urls. """
+    dump = json.dumps(_volatile_free(data), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(dump.encode()).hexdigest()
+
+
+""" Stores """
+
+
+class DirectoryStore:
+    """
+    one json file per object in `path/objects` and an index of their metadata in `path/index.json`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.join(path, "objects"), exist_ok=True)
+        self._index_path = os.path.join(path, "index.json")
+        self._failures_path = os.path.join(path, "failures.json")
+        self.index: dict[str, dict] = {}
+        self.failed: dict[str, dict] = {}
+        if os.path.exists(self._index_path):
+            with open(self._index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        if os.path.exists(self._failures_path):
+            with open(self._failures_path, encoding="utf-8") as f:
+                self.failed = json.load(f)
+
+    def _object_path(self, obj_id: str) -> str:
+        return os.path.join(self.path, "objects", f"{obj_id}.json")
+
+    def meta(self, obj_id: str) -> None | dict:
+        return self.index.get(obj_id)
+
+    def get(self, obj_id: str) -> None | dict:
+        if obj_id not in self.index:
+            return None
+        with open(self._object_path(obj_id), encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, meta: dict, data: dict):
+        _write_json(self._object_path(meta["id"]), data)
+        self.index[meta["id"]] = meta
+        self.failed.pop(meta["id"], None)
+
+    def touch(self, meta: dict):
+        self.index[meta["id"]] = meta
+        self.failed.pop(meta["id"], None)
+
+    def fail(self, failure: dict):
+        self.failed[failure["id"]] = failure
+
+    def failures(self) -> list[dict]:
+        return list(self.failed.values())
+
+    def ids(self) -> list[str]:
+        return list(self.index)
+
+    def flush(self):
+        _write_json(self._index_path, self.index)
+        _write_json(self._failures_path, self.failed)
+
+    def close(self):
+        self.flush()
+
+
+class SqliteStore:
+    """
+    a single SQLite file with one row per object.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS objects ("
+            "id TEXT PRIMARY KEY, object TEXT, last_edited_time TEXT, hash TEXT, fetched_at TEXT, data TEXT)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS failures (id TEXT PRIMARY KEY, object TEXT, error TEXT, failed_at TEXT)"
+        )
+
+    def meta(self, obj_id: str) -> None | dict:
+        row = self.connection.execute(
+            "SELECT id, object, last_edited_time, hash, fetched_at FROM objects WHERE id = ?", (obj_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("id", "object", "last_edited_time", "hash", "fetched_at"), row))
+
+    def get(self, obj_id: str) -> None | dict:
+        row = self.connection.execute("SELECT data FROM objects WHERE id = ?", (obj_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, meta: dict, data: dict):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?)",
+            (meta["id"], meta["object"], meta["last_edited_time"], meta["hash"], meta["fetched_at"],
+             json.dumps(data, ensure_ascii=False)),
+        )
+        self.connection.execute("DELETE FROM failures WHERE id = ?", (meta["id"],))
+
+    def touch(self, meta: dict):
+        self.connection.execute(
+            "UPDATE objects SET last_edited_time = ?, fetched_at = ? WHERE id = ?",
+            (meta["last_edited_time"], meta["fetched_at"], meta["id"]),
+        )
+        self.connection.execute("DELETE FROM failures WHERE id = ?", (meta["id"],))
+
+    def fail(self, failure: dict):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO failures VALUES (?, ?, ?, ?)",
+            (failure["id"], failure["object"], failure["error"], failure["failed_at"]),
+        )
+
+    def failures(self) -> list[dict]:
+        rows = self.connection.execute("SELECT id, object, error, failed_at FROM failures")
+        return [dict(zip(("id", "object", "error", "failed_at"), row)) for row in rows]
+
+    def ids(self) -> list[str]:
+        return [i[0] for i in self.connection.execute("SELECT id FROM objects")]
+
+    def flush(self):
+        self.connection.commit()
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+
+def open_store(path: str) -> DirectoryStore | SqliteStore:
+    """ SqliteStore for paths ending with .sqlite, .sqlite3 or .db, DirectoryStore otherwise. """
+    if os.path.splitext(path)[1] in (".sqlite", ".sqlite3", ".db"):
+        return SqliteStore(path)
+    return DirectoryStore(path)
+
+
+def _write_json(path: str, data: Any):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+""" Backup """
+
+
+class Backup:
+    """
+    back up every page and database returned by search.
+
+    objects whose last_edited_time did not change since the previous run are skipped without
+    fetching their blocks. changed objects are fetched and only written if their content hash changed.
+    an object that can not be fetched (an API error...) is counted as failed and recorded in
+    store.failures(), the others are backed up anyway. at most max_concurrency objects are in progress.
+
+        backup = Backup(client, "backup.sqlite")
+        stats = await backup.run()
+    """
+
+    def __init__(self, client, store: str | DirectoryStore | SqliteStore, max_concurrency: int = 8, flush_interval: int = 100):
+        self.client = client
+        self.store = open_store(store) if isinstance(store, str) else store
+        self.max_concurrency = max_concurrency
+        self.flush_interval = flush_interval
+        self.stats = {"seen": 0, "fetched": 0, "written": 0, "skipped": 0, "failed": 0}
+
+    async def run(self) -> dict:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # one slot per object in progress, so that search is not read ahead of the backups
+        slots = asyncio.Semaphore(self.max_concurrency)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                async for data in self.client.search_iter(raw=True):
+                    self.stats["seen"] += 1
+                    if self.is_changed(data):
+                        await slots.acquire()
+                        tg.create_task(self._backup_or_fail(data, semaphore, slots))
+                    else:
+                        self.stats["skipped"] += 1
+        finally:
+            self.store.flush()
+        return self.stats
+
+    def is_changed(self, data: dict) -> bool:
+        meta = self.store.meta(data["id"])
+        if meta is None or meta["last_edited_time"] != data["last_edited_time"]:
+            return True
+        last_edited = dt.fromisoformat(data["last_edited_time"])
+        return dt.fromisoformat(meta["fetched_at"]) < last_edited + _TIMESTAMP_RESOLUTION
+
+    async def _backup_or_fail(self, data: dict, semaphore: asyncio.Semaphore, slots: asyncio.Semaphore):
+        try:
+            await self._backup(data, semaphore)
+        except Exception as e:
+            self.stats["failed"] += 1
+            self.store.fail({
+                "id": data["id"],
+                "object": data["object"],
+                "error": f"{e.__class__.__name__}: {e}",
+                "failed_at": dt.now(timezone.utc).isoformat(),
+            })
+        finally:
+            slots.release()
+
+    async def _backup(self, data: dict, semaphore: asyncio.Semaphore):
+        fetched_at = dt.now(timezone.utc).isoformat()
+        snapshot = {"object": data}
+        if data["object"] == "page":
+            snapshot["blocks"] = await fetch_raw_block_tree(self.client.client, data["id"], semaphore)
+        self.stats["fetched"] += 1
+        meta = {
+            "id": data["id"],
+            "object": data["object"],
+            "last_edited_time": data["last_edited_time"],
+            "hash": content_hash(snapshot),
+            "fetched_at": fetched_at,
+        }
+        old = self.store.meta(data["id"])
+        if old is not None and old["hash"] == meta["hash"]:
+            self.store.touch(meta)
+        else:
+            self.store.put(meta, snapshot)
+            self.stats["written"] += 1
+        if self.stats["fetched"] % self.flush_interval == 0:
+            self.store.flush()
+
+
+async def fetch_raw_block_tree(client, block_id: str, semaphore: asyncio.Semaphore) -> list[dict]:
+    """
+    block responses under block_id, with the children of nested blocks in a "children" key.
+    child pages and databases are separate objects and are not descended into.
+    """
+    blocks = []
+    next_cursor = None
+    while True:
+        payload = {"block_id": block_id, "page_size": 100}
+        if next_cursor:
+            payload["start_cursor"] = next_cursor
+        async with semaphore:
+            response = await client.blocks.children.list(**payload)
+        blocks += response["results"]
+        if not response["has_more"]:
+            break
+        next_cursor = response["next_cursor"]
+    nested = [i for i in blocks if i["has_children"] and i["type"] not in ("child_page", "child_database")]
+    children = await asyncio.gather(*[fetch_raw_block_tree(client, i["id"], semaphore) for i in nested])
+    for block, c in zip(nested, children):
+        block["children"] = c
+    return blocks
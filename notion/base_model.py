@@ -1,8 +1,9 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Annotated, Any, Literal, Union, get_args, get_origin
+from types import NoneType, UnionType
 
-from pydantic import BaseModel, model_serializer, ConfigDict
-from pydantic import UUID4, AnyUrl
+from pydantic import BaseModel, TypeAdapter, model_serializer, ConfigDict
+from pydantic import UUID4, AnyUrl, EmailStr
 from datetime import datetime
 from enum import Enum
 from uuid import UUID
@@ -23,25 +24,58 @@ type_conversion = {
     AnyUrl: lambda x: str(x),
 }
 
+primitive_types = (NoneType, bool, int, float, complex, str)
+
+# converter resolved for each concrete type seen by json_decoder. None means "as is".
+_converters = {t: None for t in primitive_types}
+
+def _resolve_converter(tp):
+    if issubclass(tp, NotionBaseModel):
+        return lambda x: x._serialize()
+    if issubclass(tp, list):
+        return lambda x: [json_decoder(i) for i in x]
+    if issubclass(tp, dict):
+        return lambda x: {i: json_decoder(j) for i, j in x.items()}
+    for i, j in type_conversion.items():
+        if issubclass(tp, i):
+            return j
+    return None
+
 def json_decoder(obj):
     """
     rescursive pydantic.BaseModel decoder for all available objects(types) in Notion API.
     """
-    if obj is None:
-        return obj
-    if isinstance(obj, (bool, int, float, complex, str)):
-        return obj
-    if issubclass(type(obj), NotionBaseModel):
-        return obj.model_dump()
-    if isinstance(obj, list):
-        return [json_decoder(i) for i in obj]
-    if isinstance(obj, dict):
-        return {i: json_decoder(j) for i, j in obj.items()}
+    tp = type(obj)
+    try:
+        conv = _converters[tp]
+    except KeyError:
+        conv = _converters[tp] = _resolve_converter(tp)
+    return obj if conv is None else conv(obj)
 
-    for i, j in type_conversion.items():
-        if issubclass(type(obj), i):
-            return j(obj)
-    return obj
+def _is_primitive_annotation(annotation) -> bool:
+    if annotation in primitive_types:
+        return True
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return all(type(i) in primitive_types for i in get_args(annotation))
+    if origin in (Union, UnionType):
+        return all(_is_primitive_annotation(i) for i in get_args(annotation))
+    return False
+
+def _compile_serializer(cls) -> tuple:
+    """
+    resolve (field name, converter) pairs of non-excluded fields once per class.
+    fields annotated with primitive types are dumped as is.
+    """
+    compiled = []
+    for name, info in cls.model_fields.items():
+        if info.exclude == True:
+            continue
+        if _is_primitive_annotation(info.annotation):
+            compiled.append((name, None))
+        else:
+            compiled.append((name, json_decoder))
+    return tuple(compiled)
 
 class NotionBaseModel(BaseModel):
     """
@@ -49,13 +83,48 @@ class NotionBaseModel(BaseModel):
     """
     model_config = ConfigDict(validate_assignment=True)
 
+    def _serialize(self, include=None, exclude=None) -> dict:
+        cls = self.__class__
+        try:
+            compiled = cls.__dict__["__notion_serializer__"]
+        except KeyError:
+            compiled = _compile_serializer(cls)
+            setattr(cls, "__notion_serializer__", compiled)
+        if include is not None:
+            # getattr also reads extra fields (models with extra="allow")
+            return {i: json_decoder(getattr(self, i)) for i in include}
+        values = self.__dict__
+        fields_set = self.__pydantic_fields_set__
+        r = {}
+        for name, conv in compiled:
+            if name not in fields_set or (exclude and name in exclude):
+                continue
+            v = values[name]
+            r[name] = v if conv is None else conv(v)
+        if self.__pydantic_extra__:
+            for name, v in self.__pydantic_extra__.items():
+                if not (exclude and name in exclude):
+                    r[name] = json_decoder(v)
+        return r
+
     @model_serializer(mode="wrap")
     def model_serialize(self, _handler, _info) -> dict:
-        if _info.include is not None:
-            return {i: json_decoder(self.__getattribute__(i)) for i in _info.include}
-        exclude = [] if _info.exclude is None else _info.exclude
-        exclude += [f for f, i in self.model_fields.items() if i.exclude==True]
-        return {i: json_decoder(self.__getattribute__(i)) for i in self.model_fields_set if i not in exclude}
+        return self._serialize(_info.include, _info.exclude)
+
+    @classmethod
+    def model_construct_trusted(cls, data: dict):
+        """
+        build this model recursively from a well-formed API response without validation.
+        """
+        return construct_builder(cls)(data)
+
+    def _set_trusted(self, name: str, value):
+        """
+        set a field from a well-formed API response without validate_assignment.
+        """
+        builder = construct_builder(self.model_fields[name].annotation)
+        self.__dict__[name] = value if builder is None or value is None else builder(value)
+        self.__pydantic_fields_set__.add(name)
 
 
 class NotionObjectModel(NotionBaseModel):
@@ -63,3 +132,167 @@ class NotionObjectModel(NotionBaseModel):
     Model for object instance that has id in fields
     """
     id: UUID4
+
+
+""" Trusted construction """
+
+_builders = {}
+_missing = object()
+
+def _unwrap_annotated(annotation):
+    while get_origin(annotation) is Annotated:
+        annotation = get_args(annotation)[0]
+    return annotation
+
+def _validating_builder(annotation):
+    adapter = TypeAdapter(annotation)
+    return adapter.validate_python
+
+def _scalar_builder(annotation):
+    if annotation is Any or annotation in primitive_types or annotation is EmailStr:
+        return None
+    if not isinstance(annotation, type):
+        return _validating_builder(annotation)
+    if issubclass(annotation, datetime):
+        return lambda x: datetime.fromisoformat(x) if isinstance(x, str) else x
+    if issubclass(annotation, UUID):
+        return lambda x: UUID(x) if isinstance(x, str) else x
+    if issubclass(annotation, Enum):
+        return annotation
+    if issubclass(annotation, AnyUrl):
+        # urls are only dumped back as strings
+        return None
+    if issubclass(annotation, BaseModel):
+        return _model_builder(annotation)
+    return _validating_builder(annotation)
+
+def _model_builder(cls):
+    """
+    same as cls.model_construct, without the alias lookups and with defaults resolved once.
+    """
+    fields = None
+    new = cls.__new__
+    setattr_ = object.__setattr__
+    allow_extra = cls.model_config.get("extra") == "allow"
+
+    def build(data):
+        nonlocal fields
+        if not isinstance(data, dict):
+            return data if isinstance(data, cls) else cls.model_validate(data)
+        if fields is None:
+            fields = []
+            for name, info in cls.model_fields.items():
+                if info.is_required():
+                    default, factory = _missing, None
+                elif info.default_factory is None and type(info.default) in primitive_types:
+                    default, factory = info.default, None
+                else:
+                    default, factory = _missing, info
+                fields.append((name, construct_builder(info.annotation), default, factory))
+        values = {}
+        fields_set = set()
+        for name, builder, default, factory in fields:
+            if name in data:
+                v = data[name]
+                values[name] = v if builder is None or v is None else builder(v)
+                fields_set.add(name)
+            elif default is not _missing:
+                values[name] = default
+            elif factory is not None:
+                values[name] = factory.get_default(call_default_factory=True, validated_data=values)
+        m = new(cls)
+        setattr_(m, "__dict__", values)
+        setattr_(m, "__pydantic_fields_set__", fields_set)
+        setattr_(m, "__pydantic_extra__", {k: v for k, v in data.items() if k not in values} if allow_extra else None)
+        setattr_(m, "__pydantic_private__", None)
+        if cls.__pydantic_post_init__:
+            m.model_post_init(None)
+        return m
+    return build
+
+def _model_signature(cls):
+    """ Literal fields, required fields and extra policy used to pick a union member. """
+    literals = {}
+    for name, info in cls.model_fields.items():
+        annotation = _unwrap_annotated(info.annotation)
+        if get_origin(annotation) is Literal:
+            literals[name] = get_args(annotation)
+    required = tuple(name for name, info in cls.model_fields.items() if info.is_required())
+    forbid = cls.model_config.get("extra") == "forbid"
+    return literals, required, forbid, set(cls.model_fields)
+
+def _union_builder(annotation):
+    members = [_unwrap_annotated(i) for i in get_args(annotation)]
+    nullable = NoneType in members
+    members = [i for i in members if i is not NoneType]
+    if len(members) == 1:
+        return construct_builder(members[0])
+    models = [(m, _model_signature(m), _model_builder(m)) for m in members if isinstance(m, type) and issubclass(m, BaseModel)]
+    scalars = tuple(m for m in members if isinstance(m, type) and not issubclass(m, BaseModel))
+    fallback = _validating_builder(annotation)
+
+    # index members by the Literal field that discriminates most of them (usually 'type').
+    keys = {}
+    for m, (literals, *_), _b in models:
+        for k, v in literals.items():
+            keys.setdefault(k, set()).update(v)
+    key = max(keys, key=lambda k: len(keys[k]), default=None)
+    rest = [i for i in models if key not in i[1][0]]
+    index = {}
+    if key is not None:
+        for v in keys[key]:
+            index[v] = [i for i in models if key not in i[1][0] or v in i[1][0][key]]
+
+    def build(data):
+        if data is None and nullable:
+            return None
+        if isinstance(data, dict):
+            for m, (literals, required, forbid, names), builder in index.get(data.get(key), rest):
+                if any(data.get(k) not in v for k, v in literals.items()):
+                    continue
+                if any(k not in data for k in required):
+                    continue
+                if forbid and any(k not in names for k in data):
+                    continue
+                return builder(data)
+        elif type(data) in scalars:
+            return data
+        return fallback(data)
+    return build
+
+def construct_builder(annotation):
+    """
+    compile a function that builds a value of `annotation` from trusted (already well-formed) data
+    without running validators. union members are picked by their Literal fields and required keys,
+    and anything that cannot be resolved this way falls back to normal validation.
+    returns None when the data can be used as is.
+    """
+    try:
+        return _builders[annotation]
+    except KeyError:
+        pass
+    except TypeError:
+        return _compile_builder(annotation)
+    builder = _builders[annotation] = _compile_builder(annotation)
+    return builder
+
+def _compile_builder(annotation):
+    annotation = _unwrap_annotated(annotation)
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return None
+    if origin in (Union, UnionType):
+        return _union_builder(annotation)
+    if origin is list:
+        item = construct_builder(get_args(annotation)[0])
+        if item is None:
+            return None
+        return lambda x: [i if i is None else item(i) for i in x]
+    if origin is dict:
+        item = construct_builder(get_args(annotation)[1])
+        if item is None:
+            return None
+        return lambda x: {k: v if v is None else item(v) for k, v in x.items()}
+    if origin is not None:
+        return _validating_builder(annotation)
+    return _scalar_builder(annotation)
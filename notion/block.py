@@ -0,0 +1,578 @@
+"""
+Block objects
+
+https://developers.notion.com/reference/block
+"""
+from __future__ import annotations
+
+from pydantic import UUID4, Field, ConfigDict, TypeAdapter
+from .base_model import NotionBaseModel, construct_builder
+from .emoji import Emoji
+from .file import File, FileProperty
+from .general_object import EmptyObject, UrlObject
+from .parent import Parent
+from .rich_text import RichText, Text, TextColor, EquationContent
+from .user import User
+from typing import Literal, Union, Any
+from datetime import datetime as dt
+
+import asyncio
+
+__all__ = (
+    "Paragraph",
+    "Heading1",
+    "Heading2",
+    "Heading3",
+    "BulletedListItem",
+    "NumberedListItem",
+    "Quote",
+    "Toggle",
+    "ToDo",
+    "Callout",
+    "Code",
+    "Equation",
+    "Divider",
+    "ChildPage",
+    "ChildDatabase",
+    "Table",
+    "TableRow",
+    "Image",
+    "Video",
+    "Pdf",
+    "FileBlock",
+    "Audio",
+    "Bookmark",
+    "Embed",
+    "LinkPreview",
+    "OtherBlock",
+    "Block",
+)
+
+
+""" Block contents """
+
+
+def _to_rich_text(text: str | RichText | list[RichText]) -> list[RichText]:
+    if isinstance(text, str):
+        return Text.new_list(text)
+    if isinstance(text, list):
+        return text
+    return [text]
+
+
+class TextBlockContent(NotionBaseModel):
+    rich_text: list[RichText]
+    color: TextColor = TextColor.default
+
+
+class HeadingContent(TextBlockContent):
+    is_toggleable: bool = False
+
+
+class ToDoContent(TextBlockContent):
+    checked: bool = False
+
+
+class CalloutContent(TextBlockContent):
+    icon: None | File | Emoji = None
+
+
+class CodeContent(NotionBaseModel):
+    rich_text: list[RichText]
+    caption: list[RichText] = []
+    language: str = "plain text"
+
+
+class TitleContent(NotionBaseModel):
+    title: str
+
+
+class TableContent(NotionBaseModel):
+    table_width: int
+    has_column_header: bool = False
+    has_row_header: bool = False
+
+
+class TableRowContent(NotionBaseModel):
+    cells: list[list[RichText]]
+
+
+class MediaContent(NotionBaseModel):
+    type: Literal["external", "file"]
+    external: None | UrlObject = None
+    file: None | FileProperty = None
+    caption: list[RichText] = []
+    name: None | str = None
+
+    @property
+    def url(self) -> str:
+        return str(self.external.url if self.type == "external" else self.file.url)
+
+    @classmethod
+    def new(cls, url: str):
+        return cls(type="external", external=UrlObject(url=url))
+
+
+class UrlContent(NotionBaseModel):
+    url: str
+    caption: list[RichText] = []
+
+
+""" Blocks """
+
+
+class BaseBlock(NotionBaseModel):
+    object: Literal["block"] = "block"
+    id: None | UUID4 = None
+    parent: None | Parent = None
+    created_time: None | dt = None
+    created_by: None | User = None
+    last_edited_time: None | dt = None
+    last_edited_by: None | User = None
+    archived: bool = False
+    has_children: bool = False
+
+    children: list[Any] = Field(default=[], exclude=True, repr=False)
+
+    def get_content(self):
+        return self.__getattribute__(self.type)
+
+    def get_text(self) -> str:
+        """ plain text of the block, empty if this type has no rich text. """
+        rich_text = getattr(self.get_content(), "rich_text", None)
+        if not rich_text:
+            return ""
+        return "".join([i.plain_text for i in rich_text])
+
+    def build(self):
+        return self.model_dump(include={"type", self.type})
+
+
+class BaseTextBlock(BaseBlock):
+
+    @classmethod
+    def new(cls, text: str | RichText | list[RichText] = "", color: str | TextColor = TextColor.default, children: list[Block] = []):
+        type = cls.model_fields["type"].annotation.__args__[0]
+        c = cls(type=type, **{type: TextBlockContent(rich_text=_to_rich_text(text), color=color)})
+        c.children = list(children)
+        return c
+
+
+class Paragraph(BaseTextBlock):
+    type: Literal["paragraph"]
+    paragraph: TextBlockContent
+
+
+class BaseHeading(BaseBlock):
+
+    @classmethod
+    def new(cls, text: str | RichText | list[RichText] = "", color: str | TextColor = TextColor.default):
+        type = cls.model_fields["type"].annotation.__args__[0]
+        return cls(type=type, **{type: HeadingContent(rich_text=_to_rich_text(text), color=color)})
+
+
+class Heading1(BaseHeading):
+    type: Literal["heading_1"]
+    heading_1: HeadingContent
+
+
+class Heading2(BaseHeading):
+    type: Literal["heading_2"]
+    heading_2: HeadingContent
+
+
+class Heading3(BaseHeading):
+    type: Literal["heading_3"]
+    heading_3: HeadingContent
+
+
+class BulletedListItem(BaseTextBlock):
+    type: Literal["bulleted_list_item"]
+    bulleted_list_item: TextBlockContent
+
+
+class NumberedListItem(BaseTextBlock):
+    type: Literal["numbered_list_item"]
+    numbered_list_item: TextBlockContent
+
+
+class Quote(BaseTextBlock):
+    type: Literal["quote"]
+    quote: TextBlockContent
+
+
+class Toggle(BaseTextBlock):
+    type: Literal["toggle"]
+    toggle: TextBlockContent
+
+
+class ToDo(BaseBlock):
+    type: Literal["to_do"]
+    to_do: ToDoContent
+
+    @classmethod
+    def new(cls, text: str | RichText | list[RichText] = "", checked: bool = False, children: list[Block] = []):
+        c = cls(type="to_do", to_do=ToDoContent(rich_text=_to_rich_text(text), checked=checked))
+        c.children = list(children)
+        return c
+
+
+class Callout(BaseBlock):
+    type: Literal["callout"]
+    callout: CalloutContent
+
+    @classmethod
+    def new(cls, text: str | RichText | list[RichText] = "", icon: str | None = None):
+        content = CalloutContent(rich_text=_to_rich_text(text))
+        if icon is not None:
+            content.icon = Emoji.new(emoji=icon)
+        return cls(type="callout", callout=content)
+
+
+class Code(BaseBlock):
+    type: Literal["code"]
+    code: CodeContent
+
+    @classmethod
+    def new(cls, code: str | RichText | list[RichText] = "", language: str = "plain text"):
+        return cls(type="code", code=CodeContent(rich_text=_to_rich_text(code), language=language))
+
+
+class Equation(BaseBlock):
+    type: Literal["equation"]
+    equation: EquationContent
+
+    def get_text(self) -> str:
+        return self.equation.expression
+
+    @classmethod
+    def new(cls, expression: str = ""):
+        return cls(type="equation", equation=EquationContent(expression=expression))
+
+
+class Divider(BaseBlock):
+    type: Literal["divider"]
+    divider: EmptyObject
+
+    @classmethod
+    def new(cls):
+        return cls(type="divider", divider={})
+
+
+class ChildPage(BaseBlock):
+    """ uneditable, use PageDraft to create a child page """
+    type: Literal["child_page"]
+    child_page: TitleContent
+
+    def get_text(self) -> str:
+        return self.child_page.title
+
+
+class ChildDatabase(BaseBlock):
+    """ uneditable, use DatabaseDraft to create a child database """
+    type: Literal["child_database"]
+    child_database: TitleContent
+
+    def get_text(self) -> str:
+        return self.child_database.title
+
+
+class TableRow(BaseBlock):
+    type: Literal["table_row"]
+    table_row: TableRowContent
+
+    def get_cells(self) -> list[str]:
+        return ["".join([i.plain_text for i in cell]) for cell in self.table_row.cells]
+
+    @classmethod
+    def new(cls, cells: list[str | RichText | list[RichText]]):
+        return cls(type="table_row", table_row=TableRowContent(cells=[_to_rich_text(i) for i in cells]))
+
+
+class Table(BaseBlock):
+    """ rows are table_row children of this block """
+    type: Literal["table"]
+    table: TableContent
+
+    @classmethod
+    def new(cls, rows: list[list[str]], has_column_header: bool = False, has_row_header: bool = False):
+        c = cls(
+            type="table",
+            table=TableContent(
+                table_width=max([len(i) for i in rows], default=1),
+                has_column_header=has_column_header,
+                has_row_header=has_row_header,
+            )
+        )
+        c.children = [TableRow.new(i) for i in rows]
+        return c
+
+
+class BaseMediaBlock(BaseBlock):
+
+    def get_text(self) -> str:
+        return "".join([i.plain_text for i in self.get_content().caption])
+
+    @classmethod
+    def new(cls, url: str):
+        type = cls.model_fields["type"].annotation.__args__[0]
+        return cls(type=type, **{type: MediaContent.new(url)})
+
+
+class Image(BaseMediaBlock):
+    type: Literal["image"]
+    image: MediaContent
+
+
+class Video(BaseMediaBlock):
+    type: Literal["video"]
+    video: MediaContent
+
+
+class Pdf(BaseMediaBlock):
+    type: Literal["pdf"]
+    pdf: MediaContent
+
+
+class FileBlock(BaseMediaBlock):
+    type: Literal["file"]
+    file: MediaContent
+
+
+class Audio(BaseMediaBlock):
+    type: Literal["audio"]
+    audio: MediaContent
+
+
+class BaseUrlBlock(BaseBlock):
+
+    def get_text(self) -> str:
+        return self.get_content().url
+
+    @classmethod
+    def new(cls, url: str):
+        type = cls.model_fields["type"].annotation.__args__[0]
+        return cls(type=type, **{type: UrlContent(url=url)})
+
+
+class Bookmark(BaseUrlBlock):
+    type: Literal["bookmark"]
+    bookmark: UrlContent
+
+
+class Embed(BaseUrlBlock):
+    type: Literal["embed"]
+    embed: UrlContent
+
+
+class LinkPreview(BaseUrlBlock):
+    """ uneditable """
+    type: Literal["link_preview"]
+    link_preview: UrlContent
+
+
+class OtherBlock(BaseBlock):
+    """
+    blocks that have no dedicated model yet (column_list, synced_block, template, ...).
+    the content is kept as is under its type name.
+    """
+    model_config = ConfigDict(validate_assignment=True, extra="allow")
+    type: str
+
+    def get_content(self):
+        return (self.__pydantic_extra__ or {}).get(self.type)
+
+    def get_text(self) -> str:
+        content = self.get_content()
+        if not isinstance(content, dict):
+            return ""
+        return "".join([i.get("plain_text", "") for i in content.get("rich_text", [])])
+
+
+Block = Union[
+    Paragraph,
+    Heading1,
+    Heading2,
+    Heading3,
+    BulletedListItem,
+    NumberedListItem,
+    Quote,
+    Toggle,
+    ToDo,
+    Callout,
+    Code,
+    Equation,
+    Divider,
+    ChildPage,
+    ChildDatabase,
+    Table,
+    TableRow,
+    Image,
+    Video,
+    Pdf,
+    FileBlock,
+    Audio,
+    Bookmark,
+    Embed,
+    LinkPreview,
+    OtherBlock,
+]
+
+name_class_link = {
+    cls.model_fields["type"].annotation.__args__[0]: cls
+    for cls in Block.__args__ if cls is not OtherBlock
+}
+
+_block_adapter = TypeAdapter(Block)
+
+
+def parse_block(data: dict, trusted: bool = False) -> Block:
+    """ build Block from API response. """
+    if trusted:
+        return construct_builder(Block)(data)
+    if data.get("type") in name_class_link:
+        return name_class_link[data["type"]].model_validate(data)
+    return OtherBlock.model_validate(data)
+
+
+""" Block tree """
+
+
+def _should_descend(block: Block, include_child_pages: bool) -> bool:
+    if not block.has_children:
+        return False
+    return include_child_pages or block.type not in ("child_page", "child_database")
+
+
+def _first_exception(group: BaseExceptionGroup) -> BaseException:
+    """
+    first error of the group raised by a TaskGroup, re-raised on its own
+    so that callers can catch APIResponseError and the like as before.
+    """
+    while isinstance(group, BaseExceptionGroup):
+        group = group.exceptions[0]
+    return group
+
+
+async def fetch_block_tree(
+    client,
+    block_id: str,
+    max_concurrency: int = 8,
+    include_child_pages: bool = False,
+) -> list[Block]:
+    """
+    fetch the whole block tree under block_id. each block gets its children in `children`.
+    children of `has_children` blocks are fetched concurrently, at most `max_concurrency` requests at once.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    trusted = getattr(client, "trust_responses", False)
+    root = []
+
+    async def fetch(parent_id: str, container: list, tg: asyncio.TaskGroup):
+        next_cursor = None
+        while True:
+            payload = {"block_id": parent_id, "page_size": 100}
+            if next_cursor:
+                payload["start_cursor"] = next_cursor
+            async with semaphore:
+                response = await client.blocks.children.list(**payload)
+            for data in response["results"]:
+                block = parse_block(data, trusted)
+                container.append(block)
+                if _should_descend(block, include_child_pages):
+                    tg.create_task(fetch(str(block.id), block.children, tg))
+            if not response["has_more"]:
+                break
+            next_cursor = response["next_cursor"]
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(fetch(block_id, root, tg))
+    except ExceptionGroup as e:
+        raise _first_exception(e)
+    return root
+
+
+def _append_payload(block: Block) -> tuple[dict, list[Block]]:
+    """
+    payload of block for the append endpoint and the children that have to be appended afterwards.
+    table rows must be sent with the table itself, so the first 100 of them are inlined.
+    """
+    payload = block.build()
+    if isinstance(block, Table):
+        payload["table"]["children"] = [i.build() for i in block.children[:100]]
+        return payload, block.children[100:]
+    return payload, block.children
+
+
+async def append_block_tree(
+    client,
+    block_id: str,
+    blocks: list[Block],
+    max_concurrency: int = 4,
+    semaphore: None | asyncio.Semaphore = None,
+) -> list[Block]:
+    """
+    append blocks (and their `children`, recursively) to block_id and return the created blocks.
+    blocks are sent in chunks of 100, in order. children are uploaded in follow-up calls
+    to the returned block ids, concurrently with the next chunks, at most `max_concurrency` requests at once.
+    table rows sent inline with their table are not returned in its `children`.
+    a semaphore can be passed to share the concurrency limit between several uploads.
+    """
+    semaphore = semaphore or asyncio.Semaphore(max_concurrency)
+    trusted = getattr(client, "trust_responses", False)
+    root = []
+
+    async def append(parent_id: str, blocks: list[Block], container: list, tg: asyncio.TaskGroup):
+        for i in range(0, len(blocks), 100):
+            chunk = [_append_payload(b) for b in blocks[i:i + 100]]
+            async with semaphore:
+                response = await client.blocks.children.append(
+                    block_id=parent_id, children=[payload for payload, _ in chunk])
+            for (_, children), data in zip(chunk, response["results"]):
+                block = parse_block(data, trusted)
+                container.append(block)
+                if children:
+                    tg.create_task(append(str(block.id), children, block.children, tg))
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(append(block_id, blocks, root, tg))
+    except ExceptionGroup as e:
+        raise _first_exception(e)
+    return root
+
+
+async def iter_block_tree(
+    client,
+    block_id: str,
+    include_child_pages: bool = False,
+    depth: int = 0,
+):
+    """
+    yield (depth, block) for every block under block_id in document order, depth first.
+    only the current page of results of each level is held in memory, `children` is not filled.
+    """
+    trusted = getattr(client, "trust_responses", False)
+    next_cursor = None
+    while True:
+        payload = {"block_id": block_id, "page_size": 100}
+        if next_cursor:
+            payload["start_cursor"] = next_cursor
+        response = await client.blocks.children.list(**payload)
+        for data in response["results"]:
+            block = parse_block(data, trusted)
+            yield depth, block
+            if _should_descend(block, include_child_pages):
+                async for i in iter_block_tree(client, str(block.id), include_child_pages, depth + 1):
+                    yield i
+        if not response["has_more"]:
+            break
+        next_cursor = response["next_cursor"]
+
+
+def walk_block_tree(blocks: list[Block], depth: int = 0):
+    """ yield (depth, block) for a tree that has already been fetched, like Page.content. """
+    for block in blocks:
+        yield depth, block
+        yield from walk_block_tree(block.children, depth + 1)
@@ -0,0 +1,310 @@
+"""
+Bulk page operations with a resumable journal
+
+every operation of a bulk job has an idempotency key. the journal records it as pending
+before its request is sent and as done, with the resulting page id, once the server answered,
+so a job started again with the same journal skips what was already done.
+"""
+from __future__ import annotations
+
+from .exceptions import BulkOperationError, OperationPendingError
+from .notion_client.errors import HTTPResponseError, RequestTimeoutError
+from .page import Page
+from typing import TYPE_CHECKING, Any
+from datetime import datetime as dt, timezone
+
+import asyncio
+import hashlib
+import httpx
+import json
+import sqlite3
+
+if TYPE_CHECKING:
+    from .draft import PageDraft
+
+__all__ = (
+    "Journal",
+    "request_key",
+    "find_by_token",
+    "set_token",
+    "update_pages",
+    "archive_pages",
+)
+
+
+_columns = ("key", "operation", "request", "page_id", "status", "error", "updated_at")
+
+
+class Journal:
+    """
+    SQLite file with one row per operation, by idempotency key.
+    status is "pending" while the request is in flight or when it failed without knowing whether the server
+    processed it (a timeout...), then "done" or "failed".
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        # every record is committed, WAL keeps these commits cheap
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS operations ("
+            "key TEXT PRIMARY KEY, operation TEXT, request TEXT, page_id TEXT, status TEXT, error TEXT, updated_at TEXT)"
+        )
+
+    def get(self, key: str) -> None | dict:
+        row = self.connection.execute(
+            f"SELECT {', '.join(_columns)} FROM operations WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = dict(zip(_columns, row))
+        entry["request"] = json.loads(entry["request"])
+        return entry
+
+    def done(self, key: str) -> None | str:
+        """ page id of the operation `key` if it is done. """
+        row = self.connection.execute(
+            "SELECT page_id FROM operations WHERE key = ? AND status = 'done'", (key,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def begin(self, key: str, operation: str, request: dict, page_id: None | str = None):
+        self._write(key, operation, request, page_id, "pending", None)
+
+    def complete(self, key: str, operation: str, request: dict, page_id: str):
+        self._write(key, operation, request, page_id, "done", None)
+
+    def fail(self, key: str, operation: str, request: dict, page_id: None | str, error: BaseException, status: str = "failed"):
+        self._write(key, operation, request, page_id, status, f"{error.__class__.__name__}: {error}")
+
+    def forget(self, key: str):
+        """ remove the operation `key`, so that it is sent again by the next run. """
+        self.connection.execute("DELETE FROM operations WHERE key = ?", (key,))
+        self.connection.commit()
+
+    def _write(self, key, operation, request, page_id, status, error):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO operations VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, operation, json.dumps(request, ensure_ascii=False), page_id, status, error,
+             dt.now(timezone.utc).isoformat()),
+        )
+        self.connection.commit()
+
+    def entries(self, status: None | str = None) -> list[dict]:
+        """ all operations, or the ones with `status` ("pending", "done" or "failed"). """
+        query = f"SELECT {', '.join(_columns)} FROM operations"
+        rows = self.connection.execute(query + " WHERE status = ?", (status,)) if status else self.connection.execute(query)
+        entries = []
+        for row in rows:
+            entry = dict(zip(_columns, row))
+            entry["request"] = json.loads(entry["request"])
+            entries.append(entry)
+        return entries
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        count = self.connection.execute("SELECT COUNT(*) FROM operations").fetchone()[0]
+        return f"<notion.Journal '{self.path}'; {count} operations>"
+
+
+def request_key(operation: str, request: dict) -> str:
+    """ default idempotency key: the operation and a hash of its request. """
+    digest = hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+    return f"{operation}:{digest}"
+
+
+def _uncertain(error: BaseException) -> bool:
+    """ True if the request may have been processed by the server before failing. """
+    if isinstance(error, HTTPResponseError):
+        return error.status >= 500
+    return isinstance(error, (RequestTimeoutError, httpx.TransportError, OperationPendingError))
+
+
+async def _run(operations: list[tuple[str, str, dict, Any]], journal: None | str | Journal, send, max_concurrency: int) -> list[None | str]:
+    """
+    send (operation, key, request, page_id) tuples concurrently, skipping the ones done in journal.
+    send(key, request, page_id, attempted) is told if the operation was left pending by a previous run.
+    returns the resulting page ids in order. a journal opened from a path is closed at the end.
+    a failed operation does not stop the others: it is recorded in journal, as pending if the server may
+    have processed it, and BulkOperationError is raised once all the operations were tried.
+    """
+    if isinstance(journal, str):
+        with Journal(journal) as journal:
+            return await _run(operations, journal, send, max_concurrency)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results: list[None | str] = [None] * len(operations)
+    errors: dict[str, Exception] = {}
+
+    async def run(i, operation, key, request, page_id):
+        entry = None if journal is None else journal.get(key)
+        if entry is not None and entry["status"] == "done":
+            results[i] = entry["page_id"]
+            return
+        attempted = entry is not None and entry["status"] == "pending"
+        async with semaphore:
+            if journal is not None and not attempted:
+                journal.begin(key, operation, request, page_id)
+            try:
+                results[i] = await send(key, request, page_id, attempted)
+            except Exception as e:
+                errors[key] = e
+                if journal is not None:
+                    journal.fail(key, operation, request, page_id, e, "pending" if attempted or _uncertain(e) else "failed")
+                return
+        if journal is not None:
+            journal.complete(key, operation, request, results[i])
+
+    async with asyncio.TaskGroup() as tg:
+        for i, (operation, key, request, page_id) in enumerate(operations):
+            tg.create_task(run(i, operation, key, request, page_id))
+    if errors:
+        raise BulkOperationError(results, errors)
+    return results
+
+
+async def find_by_token(client, database_id: str, token_property: str, token: str) -> None | dict:
+    """
+    the page of database whose rich text column token_property equals token, as a raw response.
+    the query is always sent, a cached response could miss a page created since.
+    """
+    response = await client.databases.query(
+        database_id=database_id, filter={"property": token_property, "rich_text": {"equals": token}}, page_size=1, cache=False)
+    return response["results"][0] if response["results"] else None
+
+
+async def create_page(client, request: dict, token: None | str = None, token_property: None | str = None, check_first: bool = False) -> dict:
+    """
+    send a page creation request and return the raw response.
+    with a token stored in the column token_property of the request, the creation is not repeated:
+    before a retry after a timeout or a server error (and before sending if check_first),
+    the database is queried for a page with this token, which is returned if it exists.
+    without a token, the page may have been created when a timeout or a server error occurs,
+    so the request is not retried and the error is raised (rate limited requests are still retried).
+    """
+    if token is None:
+        return await client.pages.create(**request, retry=False)
+    database_id = request["parent"].get("database_id")
+    if database_id is None:
+        raise ValueError("idempotency tokens need a page created in a database")
+
+    async def existing():
+        return await find_by_token(client, database_id, token_property, token)
+
+    if check_first and (page := await existing()) is not None:
+        return page
+    return await client.pages.create(**request, before_retry=existing)
+
+
+def set_token(draft: PageDraft, token_property: str, token: str):
+    prop = draft.properties.get(token_property)
+    if prop is None or prop.type != "rich_text":
+        raise ValueError(f"idempotency tokens need a rich text column, '{token_property}' is not one of the draft")
+    prop.set_text(token)
+
+
+async def create_pages(
+    client,
+    drafts: list[PageDraft],
+    keys: None | list[str] = None,
+    journal: None | str | Journal = None,
+    max_concurrency: int = 4,
+    on_created=None,
+    token_property: None | str = None,
+) -> list[str]:
+    """
+    create a page for every draft and return the ids of the pages in order.
+    keys: idempotency keys of the drafts (an external id...), by default a hash of their request.
+    drafts already done in journal are not sent again, their recorded page id is returned.
+    token_property: rich text column of the database where the key of each draft is stored.
+    a retried creation, or one left unfinished by a previous run, first looks for a page
+    with its key there, so it can not create the row twice (see create_page).
+    without token_property, a creation is not retried after a timeout or a server error, which
+    may have created the page: it fails, stays pending in journal and is not sent again by the
+    next run (OperationPendingError).
+    on_created: called with each created Page.
+    a failed draft does not stop the others, BulkOperationError is raised at the end with their ids and errors.
+    """
+    if keys is not None and len(keys) != len(drafts):
+        raise ValueError("keys and drafts should have the same length")
+    operations = []
+    for i, draft in enumerate(drafts):
+        key = keys[i] if keys is not None else request_key("create", draft.model_dump())
+        if token_property is not None:
+            set_token(draft, token_property, key)
+        operations.append(("create", key, draft.model_dump(), None))
+
+    async def send(key, request, page_id, attempted):
+        if attempted and token_property is None:
+            raise OperationPendingError(
+                f"the creation '{key}' was left pending by a previous run and may have created its page, "
+                "check the database and call journal.forget(key) to send it again, or use token_property")
+        token = None if token_property is None else key
+        data = await create_page(client, request, token, token_property, check_first=attempted)
+        page = Page.from_response(client, data)
+        if on_created is not None:
+            on_created(page)
+        return str(page.id)
+
+    return await _run(operations, journal, send, max_concurrency)
+
+
+async def update_pages(
+    client,
+    pages: list[Page],
+    keys: None | list[str] = None,
+    journal: None | str | Journal = None,
+    max_concurrency: int = 4,
+) -> list[str]:
+    """
+    send the changed properties of pages (see Page.changed_properties) and return their ids.
+    pages without changes are skipped. keys default to a hash of the page id and its changes,
+    so a change already done in journal is not sent again while a later change is.
+    failed updates raise BulkOperationError once the others are done.
+    """
+    if keys is not None and len(keys) != len(pages):
+        raise ValueError("keys and pages should have the same length")
+    by_id = {}
+    operations = []
+    for i, page in enumerate(pages):
+        properties = page.changed_properties()
+        if not properties:
+            continue
+        request = {"page_id": str(page.id), "properties": properties}
+        key = keys[i] if keys is not None else request_key("update", request)
+        by_id[str(page.id)] = page
+        operations.append(("update", key, request, str(page.id)))
+
+    async def send(key, request, page_id, attempted):
+        by_id[page_id]._parse(await client.pages.update(**request))
+        return page_id
+
+    await _run(operations, journal, send, max_concurrency)
+    return [str(page.id) for page in pages]
+
+
+async def archive_pages(
+    client,
+    page_ids: list[str],
+    journal: None | str | Journal = None,
+    max_concurrency: int = 4,
+) -> list[str]:
+    """ archive pages by id. pages already archived in journal are skipped, failures raise BulkOperationError at the end. """
+    operations = []
+    for page_id in map(str, page_ids):
+        operations.append(("archive", f"archive:{page_id}", {"page_id": page_id, "archived": True}, page_id))
+
+    async def send(key, request, page_id, attempted):
+        await client.pages.update(**request)
+        return page_id
+
+    return await _run(operations, journal, send, max_concurrency)
@@ -1,7 +1,10 @@
 from typing import Any
+from uuid import UUID
 from .page import Page
 from .database import Database
+from .user import BaseUser
 from .exceptions import ClientMissingError
+from .query import QueryCache
 
 
 class Cache:
@@ -13,6 +16,8 @@ class Cache:
         self.pages = CachedObjects(valid_types=(Page), parent=self)
         self.databases = CachedDbObjects(valid_types=(Database), parent=self)
         self.columns = DbColumnsRegister()
+        self.users = UserRegister()
+        self.queries = QueryCache()
         self.client = None
 
     def __getatribute__(self, v):
@@ -71,4 +76,37 @@ class DbColumnsRegister:
         return self.get(v)
 
 
+class UserRegister:
+    """
+    interns User objects by id so that pages share a handful of instances.
+    partial users (BaseUser, id only) are kept apart from full ones so that dumps are unchanged.
+    """
+
+    def __init__(self) -> None:
+        self.users = dict()
+        self.partials = dict()
+
+    def intern(self, user):
+        """ return the registered instance equivalent to user, registering user if it is new. """
+        objects = self.partials if type(user) is BaseUser else self.users
+        registered = objects.get(user.id)
+        if registered is None or type(registered) is not type(user):
+            objects[user.id] = user
+            return user
+        return registered
+
+    def get(self, id):
+        try:
+            id = UUID(str(id))
+        except ValueError:
+            return None
+        return self.users.get(id) or self.partials.get(id)
+
+    def __contains__(self, id):
+        return self.get(id) is not None
+
+    def __len__(self):
+        return len(self.users)
+
+
 cache = Cache()
@@ -6,26 +6,104 @@ from .page import Page
 from .draft import DatabaseDraft, PageDraft
 from .cache import cache
 from .parent import Parent
+from .user import parse_user
+from .query import enable_query_cache
+from datetime import datetime as dt
 
 class Client:
 
-    def __init__(self, token, loglevel=20):
+    def __init__(self, token, loglevel=20, trust_responses=False, executor=None, query_ttl=0):
+        """
+        trust_responses: build models from API responses without validation.
+            user-supplied drafts and edits are still validated.
+        executor: concurrent.futures.Executor (thread or process pool) used to build
+            pages of query results off the event loop.
+        query_ttl: seconds during which the response of a database query holding all of its results
+            is reused for identical queries (cache.queries, shared by the clients of the process). 0 disables it.
+        """
         self.token = token
         self.client = AsyncClient(auth=token, log_level=loglevel)
         self.client.cache = cache
+        self.client.trust_responses = trust_responses
+        self.client.executor = executor
         self.cache = self.client.cache
+        if query_ttl:
+            enable_query_cache(self.client, query_ttl)
     
     async def fetch_database(self, database_id: str) -> Database:
         if database_id in self.cache.databases:
             return self.cache.databases.get(database_id)
         data = await self.client.databases.retrieve(database_id=database_id)
-        return Database(client=self.client, **data)
+        return Database.from_response(self.client, data)
     
+    async def fetch_users(self) -> list:
+        """ fetch all users of the workspace and register them to the cache. """
+        users = []
+        next_cursor = None
+        while True:
+            payload = {}
+            if next_cursor:
+                payload["start_cursor"] = next_cursor
+            response = await self.client.users.list(**payload)
+            for data in response["results"]:
+                user = parse_user(data, self.client.trust_responses)
+                users.append(self.cache.users.intern(user))
+            if not response["has_more"]:
+                break
+            next_cursor = response["next_cursor"]
+        return users
+
+    async def search_iter(
+        self,
+        query: str = "",
+        filter: None | str = None,
+        sort: None | str | dict = None,
+        page_size: int = 100,
+        raw: bool = False,
+    ):
+        """
+        iterate over search results, fetching the next page of results only when needed.
+        filter: "page" or "database" to restrict the object type.
+        sort: "ascending" or "descending" by last_edited_time, or a sort object of the API.
+        raw: yield response dicts instead of Page / Database.
+        pages and databases are registered to the cache. cached objects are reused
+        and refreshed when the result is newer.
+        """
+        payload = {"page_size": page_size}
+        if query:
+            payload["query"] = query
+        if filter is not None:
+            if filter not in ("page", "database"):
+                raise ValueError("filter should be 'page' or 'database'")
+            payload["filter"] = {"property": "object", "value": filter}
+        if sort is not None:
+            if isinstance(sort, str):
+                sort = {"direction": sort, "timestamp": "last_edited_time"}
+            payload["sort"] = sort
+        while True:
+            response = await self.client.search(**payload)
+            for data in response["results"]:
+                yield data if raw else self._from_search_result(data)
+            if not response["has_more"]:
+                break
+            payload["start_cursor"] = response["next_cursor"]
+
+    def _from_search_result(self, data: dict) -> Page | Database:
+        if data["object"] == "database":
+            model, cached = Database, self.cache.databases.get(data["id"])
+        else:
+            model, cached = Page, self.cache.pages.get(data["id"])
+        if cached is None:
+            return model.from_response(self.client, data)
+        if cached.last_edited_time < dt.fromisoformat(data["last_edited_time"]):
+            cached._parse(data)
+        return cached
+
     async def fetch_page(self, page_id: str) -> Page:
         if page_id in self.cache.pages:
             return self.cache.pages.get(page_id)
         data = await self.client.pages.retrieve(page_id=page_id)
-        return Page(client=self.client, **data)
+        return Page.from_response(self.client, data)
     
     async def create_database(
         self,
@@ -34,7 +112,7 @@ class Client:
         if draft.parent is None:
             raise FieldMissingError("draft is missing 'parent' field")
         data = await self.client.databases.create(**draft.model_dump())
-        return Database(client=self.client, **data)
+        return Database.from_response(self.client, data)
 
     async def create_page(
         self,
@@ -43,4 +121,4 @@ class Client:
         if draft.parent is None:
             raise FieldMissingError("draft is missing 'parent' field")
         data = await self.client.pages.create(**draft.model_dump())
-        return Page(client=self.client, **data)
\ No newline at end of file
+        return Page.from_response(self.client, data)
\ No newline at end of file
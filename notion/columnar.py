@@ -0,0 +1,209 @@
+"""
+Column arrays of database pages
+
+builds one NumPy array per property in a single pass over the pages of a database.
+requires numpy (`pip install numpy`), and pandas for DataFrames (`pip install pandas`).
+"""
+from __future__ import annotations
+
+from .export import flatten_value
+from .query import iter_query
+from typing import TYPE_CHECKING
+from datetime import datetime as dt, timedelta, timezone
+
+if TYPE_CHECKING:
+    from .database import Database
+
+__all__ = (
+    "column_categories",
+    "build_column",
+    "to_dataframe",
+    "fetch_dataframe",
+)
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("column arrays require numpy. install it with `pip install numpy`.") from None
+    return numpy
+
+
+def _require_pandas():
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("DataFrame conversion requires pandas. install it with `pip install pandas`.") from None
+    return pandas
+
+
+_categorical_types = ("select", "status")
+_datetime_types = ("date", "created_time", "last_edited_time")
+
+
+def column_categories(database: Database, name: str) -> list[str]:
+    """ option names of a select / status column, in the order of the codes of build_column. """
+    column = database.properties[name]
+    if column.type not in _categorical_types:
+        raise TypeError(f"column '{name}' is not a select or status column")
+    return [i.name for i in getattr(column, column.type).options]
+
+
+_NAT = -(2 ** 63)
+_epoch = dt(1970, 1, 1)
+_epoch_utc = dt(1970, 1, 1, tzinfo=timezone.utc)
+_microsecond = timedelta(microseconds=1)
+
+
+def _microseconds(value: None | dt) -> int:
+    """ microseconds since the epoch in UTC, naive datetimes are taken as UTC. NaT if empty """
+    if value is None:
+        return _NAT
+    if value.tzinfo is None:
+        return (value - _epoch) // _microsecond
+    return (value - _epoch_utc) // _microsecond
+
+
+def build_column(database: Database, name: str, pages: None | list = None):
+    """
+    NumPy array of the values of column `name` for pages (default: database.pages), in order.
+    - number: float64, NaN if empty
+    - date, created_time, last_edited_time: datetime64[us] in UTC (start of date ranges), NaT if empty
+    - checkbox: bool
+    - select, status: int32 codes into column_categories(database, name), -1 if empty
+    - other columns: object array of PageProperty.get_value()
+    """
+    np = _require_numpy()
+    column_type = database.properties[name].type
+    pages = list(database.pages.values()) if pages is None else pages
+    properties = [page.properties.get(name) for page in pages]
+
+    if column_type == "number":
+        return np.array([None if p is None else p.number for p in properties], dtype=np.float64)
+    if column_type == "checkbox":
+        return np.array([p is not None and p.checkbox for p in properties], dtype=bool)
+    if column_type in _datetime_types:
+        if column_type == "date":
+            values = [_NAT if p is None or p.date is None else _microseconds(p.date.start) for p in properties]
+        else:
+            values = [_NAT if p is None else _microseconds(getattr(p, column_type)) for p in properties]
+        return np.array(values, dtype=np.int64).view("datetime64[us]")
+    if column_type in _categorical_types:
+        codes = {category: i for i, category in enumerate(column_categories(database, name))}
+        options = [None if p is None else getattr(p, column_type) for p in properties]
+        return np.array([-1 if o is None else codes.get(o.name, -1) for o in options], dtype=np.int32)
+    array = np.empty(len(properties), dtype=object)
+    array[:] = [None if p is None else p.get_value() for p in properties]
+    return array
+
+
+def to_dataframe(database: Database, columns: None | list[str] = None, arrays: None | dict = None):
+    """
+    pandas DataFrame of database.pages indexed by page id, with dtypes taken from the columns of database:
+    float64 for numbers, datetime64[us, UTC] for dates and times, bool for checkboxes,
+    categoricals of the column options for select / status and flat values (see flatten_value) for the others.
+    arrays: already built column arrays to reuse, by column name.
+    """
+    pd = _require_pandas()
+    np = _require_numpy()
+    names = list(columns) if columns is not None else list(database.properties)
+    pages = list(database.pages.values())
+    arrays = arrays or {}
+    data = {}
+    for name in names:
+        array = arrays[name] if name in arrays else build_column(database, name, pages)
+        column_type = database.properties[name].type
+        if column_type in _categorical_types:
+            data[name] = pd.Categorical.from_codes(array, categories=column_categories(database, name))
+        elif column_type in _datetime_types:
+            data[name] = pd.DatetimeIndex(array).tz_localize("UTC")
+        elif array.dtype == object:
+            data[name] = np.empty(len(array), dtype=object)
+            data[name][:] = [flatten_value(i) for i in array]
+        else:
+            data[name] = array
+    index = pd.Index([str(page.id) for page in pages], name="id")
+    return pd.DataFrame(data, index=index, columns=names)
+
+
+""" Raw payloads """
+
+
+def _raw_text(p: dict) -> str:
+    return "".join([i["plain_text"] for i in p[p["type"]]])
+
+
+def _raw_option(p: dict) -> None | str:
+    option = p[p["type"]]
+    return None if option is None else option["name"]
+
+
+def _raw_date(p: dict) -> None | str:
+    return None if p["date"] is None else p["date"]["start"]
+
+
+def _raw_formula(p: dict):
+    formula = p["formula"]
+    value = formula[formula["type"]]
+    return _raw_date({"date": value}) if formula["type"] == "date" else value
+
+
+_raw_extractors = {
+    "title": _raw_text,
+    "rich_text": _raw_text,
+    "number": lambda p: p["number"],
+    "checkbox": lambda p: p["checkbox"],
+    "select": _raw_option,
+    "status": _raw_option,
+    "multi_select": lambda p: [i["name"] for i in p["multi_select"]],
+    "date": _raw_date,
+    "created_time": lambda p: p["created_time"],
+    "last_edited_time": lambda p: p["last_edited_time"],
+    "created_by": lambda p: p["created_by"].get("name") or p["created_by"]["id"],
+    "last_edited_by": lambda p: p["last_edited_by"].get("name") or p["last_edited_by"]["id"],
+    "people": lambda p: [i.get("name") or i["id"] for i in p["people"]],
+    "relation": lambda p: [i["id"] for i in p["relation"]],
+    "files": lambda p: [i[i["type"]]["url"] for i in p["files"]],
+    "url": lambda p: p["url"],
+    "email": lambda p: p["email"],
+    "phone_number": lambda p: p["phone_number"],
+    "formula": _raw_formula,
+}
+
+
+async def fetch_dataframe(database: Database, columns: None | list[str] = None, page_size: int = 100):
+    """
+    query database and build a DataFrame like to_dataframe directly from the property payloads
+    of the responses. no Page is built, so `pages` and the cache are left untouched.
+    """
+    pd = _require_pandas()
+    np = _require_numpy()
+    names = list(columns) if columns is not None else list(database.properties)
+    extractors = [_raw_extractors.get(database.properties[name].type, flatten_value) for name in names]
+    ids = []
+    values = [[] for _ in names]
+    async for results in iter_query(database.client, database.id, page_size=page_size):
+        for page in results:
+            ids.append(page["id"])
+            properties = page["properties"]
+            for name, extract, column in zip(names, extractors, values):
+                p = properties.get(name)
+                column.append(None if p is None else extract(p))
+
+    data = {}
+    for name, column in zip(names, values):
+        column_type = database.properties[name].type
+        if column_type == "number":
+            data[name] = np.array(column, dtype=np.float64)
+        elif column_type == "checkbox":
+            data[name] = np.array(column, dtype=bool)
+        elif column_type in _datetime_types:
+            data[name] = pd.to_datetime(column, utc=True, format="ISO8601").as_unit("us")
+        elif column_type in _categorical_types:
+            data[name] = pd.Categorical(column, categories=column_categories(database, name))
+        else:
+            array = np.empty(len(column), dtype=object)
+            array[:] = column
+            data[name] = array
+    return pd.DataFrame(data, index=pd.Index(ids, name="id"), columns=names)
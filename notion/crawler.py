@@ -0,0 +1,184 @@
+"""
+Workspace crawler
+
+discovers every page and database reachable from search results and block children.
+"""
+from __future__ import annotations
+
+from .block import parse_block, ChildPage, ChildDatabase
+from .database import Database
+from .page import Page
+from uuid import UUID
+
+import asyncio
+import json
+import os
+
+__all__ = (
+    "Crawler",
+)
+
+
+def _key(kind: str, obj_id) -> str:
+    return f"{kind}:{UUID(str(obj_id))}"
+
+
+class Crawler:
+    """
+    crawl a workspace with a deduplicating frontier and at most `max_concurrency` requests at once.
+
+    frontier items are "page:<id>", "database:<id>" and "blocks:<id>" (children of a page or block).
+    if `state_path` is given, progress is saved there every `checkpoint_interval` items and
+    a new crawler with the same path resumes from it. items that failed are retried on resume.
+
+        crawler = Crawler(client, state_path="crawl.json")
+        await crawler.run()
+        crawler.pages, crawler.databases
+    """
+
+    def __init__(
+        self,
+        client,
+        max_concurrency: int = 8,
+        state_path: None | str = None,
+        checkpoint_interval: int = 100,
+    ):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.state_path = state_path
+        self.checkpoint_interval = checkpoint_interval
+        self.pages: dict[str, Page] = {}
+        self.databases: dict[str, Database] = {}
+        self.seen: set[str] = set()
+        self.done: set[str] = set()
+        self.failed: dict[str, str] = {}
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._since_checkpoint = 0
+        self._load()
+
+    """ frontier """
+
+    def push(self, key: str):
+        if key not in self.seen:
+            self.seen.add(key)
+            self.queue.put_nowait(key)
+
+    def add_page(self, page_id):
+        self.push(_key("page", page_id))
+
+    def add_database(self, database_id):
+        self.push(_key("database", database_id))
+
+    @property
+    def pending(self) -> set[str]:
+        return self.seen - self.done
+
+    """ persistence """
+
+    def _load(self):
+        if self.state_path is None or not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        self.done = set(state["done"])
+        self.seen = set(self.done)
+        for key in state["pending"]:
+            self.push(key)
+
+    def save(self):
+        """ write the progress to state_path. written to a temporary file first so a crash keeps the old state. """
+        if self.state_path is None:
+            return
+        state = {
+            "done": sorted(self.done),
+            "pending": sorted(self.pending),
+            "failed": self.failed,
+        }
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)
+
+    def _mark_done(self, key: str):
+        self.done.add(key)
+        self.failed.pop(key, None)
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self.checkpoint_interval:
+            self._since_checkpoint = 0
+            self.save()
+
+    """ crawling """
+
+    async def run(self, search_roots: bool = True):
+        """
+        crawl until the frontier is empty. roots are the search results of the workspace
+        and the pages / databases added with add_page / add_database.
+        """
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+        try:
+            if search_roots:
+                async for data in self.client.search_iter(raw=True):
+                    self.push(_key(data["object"], data["id"]))
+            await self.queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.save()
+        return self
+
+    async def _worker(self):
+        while True:
+            key = await self.queue.get()
+            try:
+                await self._visit(key)
+                self._mark_done(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed[key] = f"{e.__class__.__name__}: {e}"
+            finally:
+                self.queue.task_done()
+
+    async def _visit(self, key: str):
+        kind, obj_id = key.split(":", 1)
+        if kind == "page":
+            page = await self.client.fetch_page(obj_id)
+            self.pages[obj_id] = page
+            self.push(_key("blocks", obj_id))
+        elif kind == "database":
+            database = await self.client.fetch_database(obj_id)
+            self.databases[obj_id] = database
+            await database.fetch_child_pages()
+            for page in database.pages.values():
+                page_key = _key("page", page.id)
+                if page_key in self.seen:
+                    continue
+                # rows come with the query, only their content is left to fetch
+                self.seen.add(page_key)
+                self.pages[str(page.id)] = page
+                self._mark_done(page_key)
+                self.push(_key("blocks", page.id))
+        else:
+            await self._visit_blocks(obj_id)
+
+    async def _visit_blocks(self, block_id: str):
+        client = self.client.client
+        trusted = getattr(client, "trust_responses", False)
+        next_cursor = None
+        while True:
+            payload = {"block_id": block_id, "page_size": 100}
+            if next_cursor:
+                payload["start_cursor"] = next_cursor
+            response = await client.blocks.children.list(**payload)
+            for data in response["results"]:
+                block = parse_block(data, trusted)
+                if isinstance(block, ChildPage):
+                    self.add_page(block.id)
+                elif isinstance(block, ChildDatabase):
+                    self.add_database(block.id)
+                elif block.has_children:
+                    self.push(_key("blocks", block.id))
+            if not response["has_more"]:
+                break
+            next_cursor = response["next_cursor"]
@@ -15,6 +15,13 @@ from .user import User
 from .file import ExternalFile, File
 from .emoji import Emoji
 from .database_property import DatabaseProperty, Title
+from .export import iter_rows, write_csv, write_ndjson, write_parquet
+from .columnar import build_column, column_categories, to_dataframe, fetch_dataframe
+from .aggregate import aggregate_pages
+from .index import index_for
+from .upsert import upsert_pages, UpsertReport
+from .bulk import Journal, create_page, create_pages, set_token
+from .query import iter_query
 
 import emoji
 from urllib.parse import urlparse
@@ -49,12 +56,34 @@ class Database(NotionObjectModel):
     client: Any = Field(default=None, exclude=True, repr=False)
     cache: Any = Field(default=None, exclude=True, repr=False)
     page_key_callback: Any = Field(default=lambda page: page.id, exclude=True, repr=False)
+    column_arrays: dict[str, Any] = Field(default=dict(), exclude=True, repr=False)
+    indexes: dict[str, Any] = Field(default=dict(), exclude=True, repr=False)
+    # every page of the database is in `pages` (set by an unfiltered fetch_child_pages)
+    fetched_all_pages: bool = Field(default=False, exclude=True, repr=False)
 
     def __init__(self, *, client, **kwargs):
         super().__init__(**kwargs)
+        self._bind(client)
+
+    def _bind(self, client):
         self.client = client
         self.cache = client.cache
         self.cache.databases.add(self)
+        self._intern_users()
+
+    def _intern_users(self):
+        users = self.cache.users
+        self.__dict__["created_by"] = users.intern(self.created_by)
+        self.__dict__["last_edited_by"] = users.intern(self.last_edited_by)
+
+    @classmethod
+    def from_response(cls, client, data: dict):
+        """ build database from API response. validation is skipped if client trusts responses. """
+        if not getattr(client, "trust_responses", False):
+            return cls(client=client, **data)
+        db = cls.model_construct_trusted(data)
+        db._bind(client)
+        return db
 
     def __getitem__(self, v):
         try:
@@ -64,9 +93,15 @@ class Database(NotionObjectModel):
                 f"'{self.__class__.__name__}' instance has no property named '{v}'")
     
     def _parse(self, data):
+        trusted = getattr(self.client, "trust_responses", False)
         for field in self.model_fields.keys():
             if data.get(field):
-                self.__setattr__(field, data.get(field))
+                if trusted:
+                    self._set_trusted(field, data.get(field))
+                else:
+                    self.__setattr__(field, data.get(field))
+        self._intern_users()
+        self.invalidate_columns()
 
     def edit(
         self,
@@ -160,34 +195,199 @@ class Database(NotionObjectModel):
         self._parse(response)
         return self
 
-    async def fetch_child_pages(self):
-        next_cursor = None
-        while True:
-            payload = {"database_id": self.id}
-            if next_cursor:
-                payload["start_cursor"] = next_cursor
-            query = await self.client.databases.query(**payload)
-            for page_payload in query["results"]:
-                page = Page(client=self.client, **page_payload)
+    async def fetch_child_pages(self, filter: dict = None, sorts: list = None, checkpoint: str = None):
+        """
+        query the pages of this database into `pages`, all of them by default.
+        checkpoint: path of a file where the position of the query is saved (see notion.query.iter_query).
+        an interrupted query started again resumes there and only fetches the remaining pages.
+        with a query cache (Client(query_ttl=...)), a query whose results fit in one response may be answered from it.
+        """
+        async for results in iter_query(self.client, self.id, filter=filter, sorts=sorts, checkpoint=checkpoint, cache=True):
+            for page in await Page.from_responses(self.client, results):
                 self.pages[self.page_key_callback(page)] = page
-            if not query["has_more"]:
-                break
-            next_cursor = query["next_cursor"]
+                self._index_page(page)
+        if filter is None and checkpoint is None:
+            # a resumed query only fetched the pages after its checkpoint
+            self.fetched_all_pages = True
+        self.invalidate_columns()
         return self
 
+    def column(self, name: str):
+        """
+        NumPy array of the values of column `name` over `pages`, see notion.columnar.build_column.
+        arrays are cached until pages or the columns of this database change.
+        if `pages` is modified directly, call invalidate_columns.
+        """
+        if name not in self.properties:
+            raise KeyError(f"'{self.__class__.__name__}' instance has no property named '{name}'")
+        if name not in self.column_arrays:
+            self.column_arrays[name] = build_column(self, name)
+        return self.column_arrays[name]
+
+    def column_categories(self, name: str) -> list[str]:
+        """ option names of a select / status column, indexed by the codes of column(name). """
+        return column_categories(self, name)
+
+    def aggregate(self, agg: dict, group_by: str = None) -> dict:
+        """
+        evaluate rollup functions over `pages` locally, e.g.
+        database.aggregate({"Budget": "sum", "Done": "percent_checked"}, group_by="Status")
+        see notion.aggregate.aggregate_pages.
+        """
+        return aggregate_pages(self, agg, group_by=group_by)
+
+    def to_dataframe(self, columns: list[str] = None):
+        """
+        pandas DataFrame of `pages` indexed by page id, typed from the columns of this database.
+        cached column arrays are reused.
+        """
+        return to_dataframe(self, columns=columns, arrays=self.column_arrays)
+
+    async def fetch_dataframe(self, columns: list[str] = None):
+        """
+        query this database into a DataFrame typed like to_dataframe, built from the raw
+        property payloads without building pages. `pages` is not filled.
+        """
+        return await fetch_dataframe(self, columns=columns)
+
+    def invalidate_columns(self):
+        self.column_arrays.clear()
+
+    def create_index(self, name: str, kind: str = None):
+        """
+        index column `name` for find / find_range. kind is "hash", "sorted" or "inverted",
+        by default sorted for numbers and dates, inverted for multi-select, people and relation, hash otherwise.
+        the index is kept up to date as pages are fetched, created, updated or reloaded.
+        """
+        if name not in self.properties:
+            raise KeyError(f"'{self.__class__.__name__}' instance has no property named '{name}'")
+        index = index_for(name, self.properties[name].type, kind)
+        index.rebuild(self.pages.values())
+        self.indexes[name] = index
+        return index
+
+    def drop_index(self, name: str):
+        self.indexes.pop(name, None)
+
+    def _index(self, name: str):
+        """ the index of column name, or a temporary one if the column is not indexed. """
+        if name in self.indexes:
+            return self.indexes[name]
+        if name not in self.properties:
+            raise KeyError(f"'{self.__class__.__name__}' instance has no property named '{name}'")
+        index = index_for(name, self.properties[name].type)
+        index.rebuild(self.pages.values())
+        return index
+
+    def find(self, name: str, value) -> list[Page]:
+        """
+        pages of `pages` whose column `name` equals value (contains value for multi-valued columns).
+        values are compared in their flat form (see notion.export.flatten_value): option names, plain texts...
+        """
+        return self._index(name).find(value)
+
+    def find_range(self, name: str, start=None, end=None) -> list[Page]:
+        """ pages whose number / date column `name` is between start and end (inclusive), in ascending order. """
+        index = self._index(name)
+        if not hasattr(index, "find_range"):
+            raise TypeError(f"column '{name}' has a {index.kind} index, range lookups need a sorted index")
+        return index.find_range(start, end)
+
+    def _index_page(self, page: Page):
+        for index in self.indexes.values():
+            index.update(page)
+
+    def _page_changed(self, page: Page):
+        """ called by pages of this database when they change. """
+        self.invalidate_columns()
+        if self.pages.get(self.page_key_callback(page)) is page:
+            self._index_page(page)
+
+    def iter_rows(self, columns: list[str] = None, include_id: bool = True, checkpoint: str = None):
+        """
+        async iterator of {column name: flat value} for every page of this database.
+        pages are streamed from the query, `pages` is not filled.
+        checkpoint: path of a file where the position of the query is saved, see notion.query.iter_query.
+        """
+        return iter_rows(self, columns=columns, include_id=include_id, checkpoint=checkpoint)
+
+    async def export(self, path: str, format: Literal["csv", "ndjson", "parquet"] = "csv", columns: list[str] = None, include_id: bool = True) -> int:
+        """
+        stream the rows of this database to a csv, ndjson or parquet file and return the number of rows.
+        columns: names of the columns to export, all columns by default.
+        parquet columns are typed from the column types of this database and require pyarrow.
+        """
+        if format not in ("csv", "ndjson", "parquet"):
+            raise ValueError("format should be one of 'csv', 'ndjson' or 'parquet'")
+        columns = list(columns) if columns is not None else list(self.properties)
+        if format == "parquet":
+            return await write_parquet(self, path, columns=columns, include_id=include_id)
+        rows = self.iter_rows(columns=columns, include_id=include_id)
+        with open(path, "w", encoding="utf-8", newline="") as fp:
+            if format == "csv":
+                return await write_csv(rows, fp, (["id"] if include_id else []) + columns)
+            return await write_ndjson(rows, fp)
+
     async def create_page(
         self,
-        draft: PageDraft
+        draft: PageDraft,
+        token: str = None,
+        token_property: str = None,
     ):
+        """
+        create a page from draft. with an idempotency token stored in the rich text column token_property,
+        a creation retried after a timeout or a server error returns the page created by the first attempt.
+        without a token, such errors are raised instead of retried.
+        """
         draft.parent = self
-        page = await self.client.create_page(draft=draft)
-        self.pages[self.page_key_callback(page)] = page
+        if token is not None:
+            set_token(draft, token_property, token)
+        data = await create_page(self.client, draft.model_dump(), token, token_property)
+        page = Page.from_response(self.client, data)
+        self._add_page(page)
         return page
 
+    async def create_pages(
+        self,
+        drafts: list[PageDraft],
+        keys: list[str] = None,
+        journal: str | Journal = None,
+        max_concurrency: int = 4,
+        token_property: str = None,
+    ) -> list[str]:
+        """
+        create pages from drafts concurrently and return their ids in order.
+        with a journal, a job started again skips the drafts already created.
+        with token_property, the keys are stored in this rich text column so retries do not create duplicates.
+        drafts that fail do not stop the others, they raise BulkOperationError at the end.
+        see notion.bulk.create_pages.
+        """
+        for draft in drafts:
+            draft.parent = self
+        return await create_pages(
+            self.client, drafts, keys=keys, journal=journal, max_concurrency=max_concurrency,
+            on_created=self._add_page, token_property=token_property)
+
+    def _add_page(self, page: Page):
+        self.pages[self.page_key_callback(page)] = page
+        self._index_page(page)
+        self.invalidate_columns()
+
+    async def upsert(self, drafts: list[PageDraft], key: str, max_concurrency: int = 4) -> UpsertReport:
+        """
+        create the drafts whose value of column `key` is not in this database yet, update the others.
+        only changed properties are sent and unchanged pages are skipped. failed writes are in report.failed.
+        see notion.upsert.upsert_pages.
+        """
+        return await upsert_pages(self, drafts, key, max_concurrency=max_concurrency)
+
     async def reload(self):
         """ reload database. """
         response = await self.client.databases.retrieve(database_id=self.id)
         self._parse(response)
         self.pages = {}
+        self.fetched_all_pages = False
+        for index in self.indexes.values():
+            index.clear()
         await self.fetch_child_pages()
         return self
\ No newline at end of file
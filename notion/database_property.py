@@ -118,8 +118,7 @@ class BaseDbProperty(NotionBaseModel):
     is_modified: bool = Field(default=False, exclude=True)
     is_title: ClassVar[bool] = False
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+    def model_post_init(self, __context):
         self.check_is_modified()
     
     def check_is_modified(self):
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from .base_model import NotionBaseModel
+from .block import Block
 from .database import Database
 from .database_property import DatabaseProperty, Title as TitleColumn
 from .emoji import Emoji
@@ -18,7 +19,7 @@ from urllib.parse import urlparse
 
 class DatabaseDraft(NotionBaseModel):
     title: str | RichText | list[RichText]
-    parent: Parent | Database | Page = None
+    parent: Parent | Database | Page | Block = None
     object: Literal["database"] = "database"
     description: str | RichText | list[RichText] = ""
     icon: str | File | Emoji | None = None
@@ -50,8 +51,8 @@ class DatabaseDraft(NotionBaseModel):
             return DatabaseParent.new(str(value.id))
         elif isinstance(value, Page):
             return PageParent.new(str(value.id))
-        # TODO: elif isinnstance(value, Block):
-        # TODO:     return BlockParent.new(str(value.id))
+        elif isinstance(value, Block):
+            return BlockParent.new(str(value.id))
         return value
 
     @field_validator("title", "description")
@@ -142,7 +143,7 @@ class PageDraft(NotionBaseModel):
     archived: bool = False
     icon: None | ExternalFile | Emoji | str = None
     cover: None | ExternalFile | str = None
-    parent: Parent | Database | Page = None
+    parent: Parent | Database | Page | Block = None
     properties: dict[str, PageProperty] = {}
 
     parent_database: Database = None
@@ -180,8 +181,8 @@ class PageDraft(NotionBaseModel):
             return DatabaseParent.new(str(value.id))
         elif isinstance(value, Page):
             return PageParent.new(str(value.id))
-        # TODO: elif isinnstance(value, Block):
-        # TODO:     return BlockParent.new(str(value.id))
+        elif isinstance(value, Block):
+            return BlockParent.new(str(value.id))
         return value
 
     @field_validator("title")
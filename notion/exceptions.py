@@ -11,4 +11,17 @@ class NotionValidationError(NotionBaseException):
     pass
 
 class FieldMissingError(NotionBaseException):
-    pass
\ No newline at end of file
+    pass
+
+class BulkOperationError(NotionBaseException):
+    """
+    some operations of a bulk job failed, the others were done.
+    results: page ids in the order of the operations, None for the failed ones. errors: exception by idempotency key.
+    """
+    def __init__(self, results: list, errors: dict):
+        self.results = results
+        self.errors = errors
+        super().__init__(f"{len(errors)} of {len(results)} operations failed, first error: {next(iter(errors.values()), None)!r}")
+
+class OperationPendingError(NotionBaseException):
+    pass
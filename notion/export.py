@@ -0,0 +1,260 @@
+"""
+Export of database rows
+
+rows are streamed from a paginated query and written one by one, pages are not kept.
+Arrow / Parquet export requires pyarrow (`pip install pyarrow`).
+"""
+from __future__ import annotations
+
+from pydantic import BaseModel
+from .base_model import NotionObjectModel
+from .general_object import DateObject, UrlObject
+from .user import BaseUser
+from .page import _parse_pages
+from .query import iter_query
+from typing import Any, TYPE_CHECKING, TextIO
+from datetime import datetime as dt, date
+from enum import Enum
+from uuid import UUID
+
+import asyncio
+import csv
+import json
+
+if TYPE_CHECKING:
+    from .database import Database
+
+__all__ = (
+    "flatten_value",
+    "iter_rows",
+    "write_csv",
+    "write_ndjson",
+    "arrow_schema",
+    "iter_record_batches",
+    "write_parquet",
+)
+
+
+def flatten_value(value: Any) -> Any:
+    """
+    flat representation of PageProperty.get_value(): None, bool, number, str or a list of them.
+    dates become iso strings, users their name, relations and partial users their id, files their url.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (dt, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [flatten_value(i) for i in value]
+    if isinstance(value, DateObject):
+        if value.end is None:
+            return flatten_value(value.start)
+        return f"{flatten_value(value.start)}/{flatten_value(value.end)}"
+    if isinstance(value, BaseUser):
+        return getattr(value, "name", None) or str(value.id)
+    if isinstance(value, NotionObjectModel):
+        return str(value.id)
+    if isinstance(value, UrlObject):
+        return str(value.url)
+    if isinstance(value, BaseModel) and isinstance(getattr(value, "type", None), str):
+        # formula values, files...
+        return flatten_value(getattr(value, value.type))
+    if isinstance(value, dict) and "type" in value:
+        # items of rollup arrays are raw property values
+        return flatten_value(value.get(value["type"]))
+    return str(value)
+
+
+async def _iter_pages(database: Database, page_size: int = 100, checkpoint: None | str = None):
+    """ yield the pages of database one page of results at a time. pages are neither bound to the client nor cached. """
+    client = database.client
+    trusted = getattr(client, "trust_responses", False)
+    executor = getattr(client, "executor", None)
+    loop = asyncio.get_running_loop()
+    async for results in iter_query(client, database.id, page_size=page_size, checkpoint=checkpoint):
+        if executor is None:
+            pages = _parse_pages(results, trusted)
+        else:
+            pages = await loop.run_in_executor(executor, _parse_pages, results, trusted)
+        for page in pages:
+            yield page
+
+
+async def iter_rows(
+    database: Database,
+    columns: None | list[str] = None,
+    include_id: bool = True,
+    page_size: int = 100,
+    checkpoint: None | str = None,
+):
+    """
+    yield {column name: flat value} for every page of database.
+    checkpoint: path of a file where the position of the query is saved, see notion.query.iter_query.
+    """
+    names = list(columns) if columns is not None else list(database.properties)
+    async for page in _iter_pages(database, page_size, checkpoint):
+        row = {"id": str(page.id)} if include_id else {}
+        for name in names:
+            prop = page.properties.get(name)
+            row[name] = None if prop is None else flatten_value(prop.get_value())
+        yield row
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(str(_csv_cell(i)) for i in value)
+    return value
+
+
+async def write_csv(rows, fp: TextIO, fieldnames: list[str]) -> int:
+    """ write rows from an async iterator to fp as csv and return the number of rows. """
+    writer = csv.DictWriter(fp, fieldnames=fieldnames)
+    writer.writeheader()
+    count = 0
+    async for row in rows:
+        writer.writerow({k: _csv_cell(v) for k, v in row.items()})
+        count += 1
+    return count
+
+
+async def write_ndjson(rows, fp: TextIO) -> int:
+    """ write rows from an async iterator to fp as one json object per line and return the number of rows. """
+    count = 0
+    async for row in rows:
+        fp.write(json.dumps(row, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+""" Arrow """
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Arrow / Parquet export requires pyarrow. install it with `pip install pyarrow`.") from None
+    return pyarrow
+
+
+def _string(value):
+    value = flatten_value(value)
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _string_list(value):
+    value = flatten_value(value)
+    return None if value is None else [str(i) for i in value]
+
+
+def _date(value):
+    if value is None:
+        return None
+    return {"start": value.start, "end": value.end}
+
+
+def _number(value):
+    return None if value is None else float(value)
+
+
+def _column_types(pa) -> dict[str, tuple]:
+    """ database property type: (arrow type, converter of PageProperty.get_value()) """
+    timestamp = pa.timestamp("us", tz="UTC")
+    string_list = pa.list_(pa.string())
+    # option names repeat over the rows, stored once per batch
+    category = pa.dictionary(pa.int32(), pa.string())
+    return {
+        "number": (pa.float64(), _number),
+        "checkbox": (pa.bool_(), None),
+        "date": (pa.struct([("start", timestamp), ("end", timestamp)]), _date),
+        "created_time": (timestamp, None),
+        "last_edited_time": (timestamp, None),
+        "select": (category, _string),
+        "status": (category, _string),
+        "multi_select": (string_list, None),
+        "people": (string_list, _string_list),
+        "relation": (string_list, _string_list),
+        "files": (string_list, _string_list),
+    }
+
+
+def arrow_schema(database: Database, columns: None | list[str] = None, include_id: bool = True):
+    """
+    pyarrow schema of the rows of database, from the column types of `database.properties`.
+    select and status columns are dictionary encoded strings,
+    columns without a dedicated type (text, formula, rollup...) are strings.
+    """
+    pa = _require_pyarrow()
+    types = _column_types(pa)
+    names = list(columns) if columns is not None else list(database.properties)
+    fields = [pa.field("id", pa.string(), nullable=False)] if include_id else []
+    for name in names:
+        fields.append(pa.field(name, types.get(database.properties[name].type, (pa.string(),))[0]))
+    return pa.schema(fields)
+
+
+async def iter_record_batches(
+    database: Database,
+    columns: None | list[str] = None,
+    include_id: bool = True,
+    batch_size: int = 10000,
+    page_size: int = 100,
+):
+    """ yield pyarrow.RecordBatch of at most batch_size rows. values are converted by column, without type inference. """
+    pa = _require_pyarrow()
+    types = _column_types(pa)
+    names = list(columns) if columns is not None else list(database.properties)
+    schema = arrow_schema(database, names, include_id)
+    converters = []
+    for name in names:
+        converters.append(types.get(database.properties[name].type, (None, _string))[1])
+    values = [[] for _ in schema]
+    rows = 0
+
+    def batch():
+        b = pa.record_batch([pa.array(v, type=f.type) for v, f in zip(values, schema)], schema=schema)
+        for v in values:
+            v.clear()
+        return b
+
+    async for page in _iter_pages(database, page_size):
+        if include_id:
+            values[0].append(str(page.id))
+        for name, convert, column in zip(names, converters, values[include_id:]):
+            prop = page.properties.get(name)
+            value = None if prop is None else prop.get_value()
+            column.append(value if convert is None else convert(value))
+        rows += 1
+        if rows % batch_size == 0:
+            yield batch()
+    if rows % batch_size:
+        yield batch()
+
+
+async def write_parquet(
+    database: Database,
+    path: str,
+    columns: None | list[str] = None,
+    include_id: bool = True,
+    batch_size: int = 10000,
+) -> int:
+    """ write the rows of database to a parquet file batch by batch and return the number of rows. """
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+    schema = arrow_schema(database, columns, include_id)
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        async for batch in iter_record_batches(database, columns, include_id, batch_size):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
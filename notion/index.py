@@ -0,0 +1,190 @@
+"""
+Secondary indexes over Database.pages
+
+indexes are kept up to date as pages are fetched, created, updated or reloaded.
+"""
+from __future__ import annotations
+
+from .export import flatten_value
+from abc import ABC, abstractmethod
+from typing import Any, TYPE_CHECKING
+from datetime import datetime as dt, date, timedelta, timezone
+from bisect import bisect_left, bisect_right
+
+if TYPE_CHECKING:
+    from .page import Page
+
+__all__ = (
+    "HashIndex",
+    "SortedIndex",
+    "InvertedIndex",
+    "index_for",
+)
+
+
+_epoch = dt(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _sort_key(value: Any) -> Any:
+    """ comparable key of a number or date. naive datetimes are taken as UTC. """
+    if isinstance(value, dt):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return (value - _epoch) / timedelta(microseconds=1)
+    if isinstance(value, date):
+        return _sort_key(dt(value.year, value.month, value.day))
+    return value
+
+
+class BaseIndex(ABC):
+    """ maps the values of column `name` to pages, by page id. """
+    kind = ""
+
+    def __init__(self, name: str):
+        self.name = name
+        # page id: keys of the page in this index, to remove them on update
+        self.entries: dict[Any, list] = {}
+
+    @abstractmethod
+    def keys_of(self, page: Page) -> list:
+        """ keys of page in this index. """
+
+    def value_of(self, page: Page) -> Any:
+        prop = page.properties.get(self.name)
+        return None if prop is None else prop.get_value()
+
+    def update(self, page: Page):
+        self.remove(page)
+        keys = self.keys_of(page)
+        self.entries[page.id] = keys
+        for key in keys:
+            self._add(key, page)
+
+    def remove(self, page: Page):
+        for key in self.entries.pop(page.id, []):
+            self._remove(key, page)
+
+    def rebuild(self, pages):
+        self.clear()
+        for page in pages:
+            self.update(page)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} '{self.name}'; {len(self.entries)} pages>"
+
+
+class HashIndex(BaseIndex):
+    """ equality lookups on select, status, text, email... """
+    kind = "hash"
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.buckets: dict[Any, dict[Any, Page]] = {}
+
+    def keys_of(self, page):
+        value = flatten_value(self.value_of(page))
+        if isinstance(value, list):
+            value = tuple(value)
+        return [value]
+
+    def _add(self, key, page):
+        self.buckets.setdefault(key, {})[page.id] = page
+
+    def _remove(self, key, page):
+        bucket = self.buckets.get(key, {})
+        bucket.pop(page.id, None)
+        if not bucket:
+            self.buckets.pop(key, None)
+
+    def clear(self):
+        super().clear()
+        self.buckets.clear()
+
+    def find(self, value) -> list[Page]:
+        if isinstance(value, list):
+            value = tuple(value)
+        return list(self.buckets.get(value, {}).values())
+
+
+class InvertedIndex(HashIndex):
+    """ membership lookups on multi-select, people, relation: pages having `value` among their values """
+    kind = "inverted"
+
+    def keys_of(self, page):
+        value = flatten_value(self.value_of(page))
+        if value is None:
+            return []
+        return list(dict.fromkeys(value if isinstance(value, list) else [value]))
+
+    def find(self, value) -> list[Page]:
+        return list(self.buckets.get(value, {}).values())
+
+
+class SortedIndex(BaseIndex):
+    """ range lookups on number, date, created_time, last_edited_time. the start of date ranges is indexed. """
+    kind = "sorted"
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.keys: list = []
+        self.pages: list[Page] = []
+
+    def keys_of(self, page):
+        value = self.value_of(page)
+        if value is not None and hasattr(value, "start"):
+            value = value.start
+        return [] if value is None else [_sort_key(value)]
+
+    def _add(self, key, page):
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.pages.insert(i, page)
+
+    def _remove(self, key, page):
+        i = bisect_left(self.keys, key)
+        while self.pages[i].id != page.id:
+            i += 1
+        del self.keys[i]
+        del self.pages[i]
+
+    def clear(self):
+        super().clear()
+        self.keys.clear()
+        self.pages.clear()
+
+    def find(self, value) -> list[Page]:
+        return self.find_range(value, value)
+
+    def find_range(self, start=None, end=None) -> list[Page]:
+        """ pages with start <= value <= end, in ascending order. None is unbounded. """
+        lo = 0 if start is None else bisect_left(self.keys, _sort_key(start))
+        hi = len(self.keys) if end is None else bisect_right(self.keys, _sort_key(end))
+        return self.pages[lo:hi]
+
+
+_index_kinds = {
+    "hash": HashIndex,
+    "sorted": SortedIndex,
+    "inverted": InvertedIndex,
+}
+
+_default_kinds = {
+    "number": "sorted",
+    "date": "sorted",
+    "created_time": "sorted",
+    "last_edited_time": "sorted",
+    "multi_select": "inverted",
+    "people": "inverted",
+    "relation": "inverted",
+}
+
+
+def index_for(name: str, column_type: str, kind: None | str = None) -> BaseIndex:
+    """ index of `kind`, by default sorted for numbers and dates, inverted for multi-valued columns, hash otherwise. """
+    kind = kind or _default_kinds.get(column_type, "hash")
+    if kind not in _index_kinds:
+        raise ValueError(f"index kind should be one of {list(_index_kinds)}")
+    return _index_kinds[kind](name)
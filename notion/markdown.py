@@ -0,0 +1,383 @@
+"""
+Markdown rendering and import of blocks and rich texts.
+
+Blocks are rendered one at a time from (depth, block) pairs, so a page can be
+streamed to Markdown without building its block tree in memory.
+"""
+from __future__ import annotations
+
+from .block import (
+    Block, iter_block_tree, walk_block_tree, append_block_tree,
+    Paragraph, Heading1, Heading2, Heading3, BulletedListItem, NumberedListItem,
+    ToDo, Quote, Code, Equation, Divider, Table, Image,
+)
+from .general_object import UrlObject
+from .rich_text import RichText, Text, TextContent, EquationText
+from typing import TextIO, TYPE_CHECKING
+
+import asyncio
+import re
+
+if TYPE_CHECKING:
+    from .page import Page
+
+__all__ = (
+    "MarkdownRenderer",
+    "rich_text_to_markdown",
+    "markdown_to_rich_text",
+    "markdown_to_blocks",
+    "import_markdown",
+)
+
+
+def _wrap(text: str, marker: str, closing: str | None = None) -> str:
+    """ wrap text with marker, keeping surrounding whitespace outside of it. """
+    core = text.strip()
+    if not core:
+        return text
+    start = text.index(core[0])
+    end = start + len(core)
+    return f"{text[:start]}{marker}{core}{marker if closing is None else closing}{text[end:]}"
+
+
+def rich_text_to_markdown(rich_text: list[RichText]) -> str:
+    r = ""
+    for i in rich_text:
+        if isinstance(i, EquationText):
+            r += f"${i.equation.expression}$"
+            continue
+        text = i.plain_text
+        a = i.annotations
+        if a.code:
+            text = _wrap(text, "`")
+        if a.bold:
+            text = _wrap(text, "**")
+        if a.italic:
+            text = _wrap(text, "*")
+        if a.strikethrough:
+            text = _wrap(text, "~~")
+        if i.href:
+            text = _wrap(text, "[", f"]({i.href})")
+        r += text
+    return r
+
+
+_list_types = ("bulleted_list_item", "numbered_list_item", "to_do", "toggle")
+
+# indentation added to the children of a block. children of other blocks are not indented
+# because 4 spaces would turn them into code blocks.
+_child_indent = {
+    "bulleted_list_item": "  ",
+    "numbered_list_item": "   ",
+    "to_do": "  ",
+    "toggle": "  ",
+    "quote": "> ",
+    "callout": "> ",
+}
+
+
+class MarkdownRenderer:
+    """
+    stateful renderer of (depth, block) pairs in document order.
+
+    renderer = MarkdownRenderer()
+    for depth, block in walk_block_tree(page.content):
+        fp.write(renderer.render(depth, block))
+    """
+
+    def __init__(self):
+        self.indents = [""]
+        self.parent_types = []
+        self.last_types = {}
+        self.numbers = {}
+        self.tables = {}
+        self.is_first = True
+
+    def render(self, depth: int, block: Block) -> str:
+        for d in [i for i in self.last_types if i > depth]:
+            self.last_types.pop(d, None)
+            self.numbers.pop(d, None)
+            self.tables.pop(d, None)
+        del self.indents[depth + 1:]
+        del self.parent_types[depth:]
+        indent = self.indents[depth]
+        child_indent = indent + _child_indent.get(block.type, "")
+        self.indents.append(child_indent)
+        parent_type = self.parent_types[-1] if self.parent_types else None
+        self.parent_types.append(block.type)
+
+        last_type = self.last_types.get(depth)
+        if block.type == "numbered_list_item":
+            self.numbers[depth] = self.numbers.get(depth, 0) + 1 if last_type == "numbered_list_item" else 1
+        self.last_types[depth] = block.type
+        # no blank line between items of a list, rows of a table and before the first child of a list item.
+        separator = "" if (
+            self.is_first
+            or block.type == "table_row"
+            or last_type in _list_types and block.type in _list_types
+            or last_type is None and parent_type in _list_types
+        ) else "\n"
+        self.is_first = False
+
+        text = self.render_block(depth, block)
+        if block.type == "table":
+            return separator
+        if not text:
+            return ""
+        first, *rest = text.split("\n")
+        lines = [indent + first] + [child_indent + i if i else child_indent.rstrip() for i in rest]
+        return separator + "\n".join(lines) + "\n"
+
+    def render_block(self, depth: int, block: Block) -> str:
+        content = block.get_content()
+        text = rich_text_to_markdown(content.rich_text) if hasattr(content, "rich_text") else block.get_text()
+        match block.type:
+            case "heading_1":
+                return f"# {text}"
+            case "heading_2":
+                return f"## {text}"
+            case "heading_3":
+                return f"### {text}"
+            case "bulleted_list_item" | "toggle":
+                return f"- {text}"
+            case "numbered_list_item":
+                return f"{self.numbers[depth]}. {text}"
+            case "to_do":
+                return f"- [{'x' if content.checked else ' '}] {text}"
+            case "quote":
+                return f"> {text}"
+            case "callout":
+                icon = getattr(content.icon, "emoji", None)
+                return f"> {icon} {text}" if icon else f"> {text}"
+            case "code":
+                language = "" if content.language == "plain text" else content.language
+                return f"```{language}\n{text}\n```"
+            case "equation":
+                return f"$$\n{text}\n$$"
+            case "divider":
+                return "---"
+            case "table":
+                self.tables[depth + 1] = 0
+                return ""
+            case "table_row":
+                cells = [rich_text_to_markdown(i).replace("|", "\\|") for i in content.cells]
+                row = "| " + " | ".join(cells) + " |"
+                if depth in self.tables:
+                    self.tables[depth] += 1
+                    if self.tables[depth] == 1:
+                        row += "\n|" + "|".join([" --- "] * len(cells)) + "|"
+                return row
+            case "image":
+                return f"![{text}]({content.url})"
+            case "video" | "pdf" | "file" | "audio":
+                return f"[{text or content.name or block.type}]({content.url})"
+            case "bookmark" | "embed" | "link_preview":
+                caption = rich_text_to_markdown(content.caption) if content.caption else content.url
+                return f"[{caption}]({content.url})"
+            case "child_page" | "child_database":
+                return f"[{text}](https://www.notion.so/{block.id.hex})"
+        return text
+
+    def render_tree(self, blocks: list[Block]):
+        """ yield markdown chunks of a fetched block tree. """
+        for depth, block in walk_block_tree(blocks):
+            yield self.render(depth, block)
+
+    @classmethod
+    async def stream(cls, client, block_id: str, include_child_pages: bool = False):
+        """ fetch blocks under block_id page by page and yield markdown chunks as they come. """
+        renderer = cls()
+        async for depth, block in iter_block_tree(client, block_id, include_child_pages=include_child_pages):
+            yield renderer.render(depth, block)
+
+    @classmethod
+    async def write(cls, client, block_id: str, fp: TextIO, include_child_pages: bool = False):
+        """ stream blocks under block_id to fp as markdown. """
+        async for chunk in cls.stream(client, block_id, include_child_pages=include_child_pages):
+            fp.write(chunk)
+
+
+""" Markdown import """
+
+
+_inline_pattern = re.compile(
+    r"`(?P<code>[^`]+)`"
+    r"|\*\*(?P<bold>.+?)\*\*"
+    r"|__(?P<bold_>.+?)__"
+    r"|~~(?P<strikethrough>.+?)~~"
+    r"|\*(?P<italic>[^*]+)\*"
+    r"|(?<![\w])_(?P<italic_>[^_]+)_(?![\w])"
+    r"|\[(?P<link>[^\]]+)\]\((?P<url>[^)\s]+)\)"
+    r"|\$(?P<equation>[^$]+)\$"
+)
+
+
+def _link(text: Text, url: str) -> Text:
+    """ text linking to url, with href set as in the responses of the API. """
+    return text.model_copy(update={"href": url, "text": TextContent(content=text.text.content, link=UrlObject(url=url))})
+
+
+def markdown_to_rich_text(text: str, _annotations: dict | None = None, _url: str | None = None) -> list[RichText]:
+    """
+    parse inline markdown (bold, italic, strikethrough, code, links, $equations$) to rich texts.
+    texts longer than the limit of the API are split into several segments.
+    """
+    annotations = _annotations or {}
+    r = []
+
+    def plain(s: str, extra: dict | None = None, url: str | None = None):
+        for t in Text.new_list(s):
+            if url is not None:
+                t = _link(t, url)
+            a = {**annotations, **(extra or {})}
+            r.append(t.annotate(**a) if a else t)
+
+    position = 0
+    for m in _inline_pattern.finditer(text):
+        if m.start() > position:
+            plain(text[position:m.start()], url=_url)
+        position = m.end()
+        if m["code"] is not None:
+            plain(m["code"], {"code": True}, _url)
+        elif m["equation"] is not None:
+            r.append(EquationText.new(m["equation"]))
+        elif m["link"] is not None:
+            r += markdown_to_rich_text(m["link"], annotations, m["url"])
+        else:
+            name = next(i for i in ("bold", "bold_", "strikethrough", "italic", "italic_") if m[i] is not None)
+            r += markdown_to_rich_text(m[name], {**annotations, name.rstrip("_"): True}, _url)
+    if position < len(text):
+        plain(text[position:], url=_url)
+    return r
+
+
+_heading_pattern = re.compile(r"^(#{1,6})\s+(.*)$")
+_todo_pattern = re.compile(r"^[-*+]\s+\[([ xX])\]\s+(.*)$")
+_bullet_pattern = re.compile(r"^[-*+]\s+(.*)$")
+_number_pattern = re.compile(r"^\d+[.)]\s+(.*)$")
+_image_pattern = re.compile(r"^!\[(.*?)\]\((\S+?)\)$")
+_divider_pattern = re.compile(r"^(-{3,}|\*{3,}|_{3,})$")
+_table_separator_pattern = re.compile(r"^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?$")
+
+
+def _split_row(line: str) -> list[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [i.strip().replace("\\|", "|") for i in re.split(r"(?<!\\)\|", line)]
+
+
+def markdown_to_blocks(markdown: str) -> list[Block]:
+    """
+    convert a markdown document to blocks. nested lists become `children` of their parent item.
+    supported: headings, paragraphs, bulleted/numbered/to-do lists, quotes, fenced code,
+    $$ equations, dividers, tables and images.
+    """
+    lines = markdown.splitlines()
+    root = []
+    # (indentation, list item, children of the list item) of the open lists
+    lists = [(-1, None, root)]
+    paragraph = []
+
+    def flush():
+        if paragraph:
+            root.append(Paragraph.new(markdown_to_rich_text(" ".join(paragraph))))
+            paragraph.clear()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        indent = len(line) - len(line.lstrip())
+        i += 1
+
+        if not stripped:
+            flush()
+            continue
+
+        item = None
+        if m := _todo_pattern.match(stripped):
+            item = ToDo.new(markdown_to_rich_text(m[2]), checked=m[1] != " ")
+        elif not _divider_pattern.match(stripped) and (m := _bullet_pattern.match(stripped)):
+            item = BulletedListItem.new(markdown_to_rich_text(m[1]))
+        elif m := _number_pattern.match(stripped):
+            item = NumberedListItem.new(markdown_to_rich_text(m[1]))
+        if item is not None:
+            flush()
+            while lists[-1][0] >= indent:
+                lists.pop()
+            lists[-1][2].append(item)
+            lists.append((indent, item, item.children))
+            continue
+        if len(lists) > 1 and indent > 0:
+            # lazy continuation of the innermost list item
+            lists[-1][1].get_content().rich_text += markdown_to_rich_text(" " + stripped)
+            continue
+        del lists[1:]
+
+        if stripped.startswith("```"):
+            flush()
+            language = stripped[3:].strip() or "plain text"
+            code = []
+            while i < len(lines) and not lines[i].strip().startswith("```"):
+                code.append(lines[i])
+                i += 1
+            i += 1
+            root.append(Code.new("\n".join(code), language=language))
+        elif stripped == "$$":
+            flush()
+            expression = []
+            while i < len(lines) and lines[i].strip() != "$$":
+                expression.append(lines[i])
+                i += 1
+            i += 1
+            root.append(Equation.new("\n".join(expression)))
+        elif m := _heading_pattern.match(stripped):
+            flush()
+            heading = (Heading1, Heading2, Heading3)[min(len(m[1]), 3) - 1]
+            root.append(heading.new(markdown_to_rich_text(m[2])))
+        elif _divider_pattern.match(stripped):
+            flush()
+            root.append(Divider.new())
+        elif stripped.startswith(">"):
+            flush()
+            quote = [stripped.lstrip(">").strip()]
+            while i < len(lines) and lines[i].strip().startswith(">"):
+                quote.append(lines[i].strip().lstrip(">").strip())
+                i += 1
+            root.append(Quote.new(markdown_to_rich_text("\n".join(quote))))
+        elif stripped.startswith("|") and i < len(lines) and _table_separator_pattern.match(lines[i].strip()):
+            flush()
+            rows = [_split_row(stripped)]
+            i += 1
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                rows.append(_split_row(lines[i]))
+                i += 1
+            width = max([len(r) for r in rows])
+            rows = [[markdown_to_rich_text(c) for c in r + [""] * (width - len(r))] for r in rows]
+            root.append(Table.new(rows, has_column_header=True))
+        elif m := _image_pattern.match(stripped):
+            flush()
+            image = Image.new(m[2])
+            if m[1]:
+                image.image.caption = markdown_to_rich_text(m[1])
+            root.append(image)
+        else:
+            paragraph.append(stripped)
+    flush()
+    return root
+
+
+async def import_markdown(documents: list[tuple[Page, str]], max_concurrency: int = 4) -> list[list[Block]]:
+    """
+    append markdown documents to their pages concurrently and return the created blocks of each.
+    all uploads share the same limit of `max_concurrency` requests at once.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [
+        append_block_tree(page.client, str(page.id), markdown_to_blocks(text), semaphore=semaphore)
+        for page, text in documents
+    ]
+    return list(await asyncio.gather(*tasks))
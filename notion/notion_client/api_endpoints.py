@@ -158,6 +158,8 @@ class DatabasesEndpoint(Endpoint):
                 kwargs, "parent", "title", "properties", "icon", "cover", "is_inline"
             ),
             auth=kwargs.get("auth"),
+            before_retry=kwargs.get("before_retry"),
+            retry=kwargs.get("retry", True),
         )
 
     def update(self, database_id: str, **kwargs: Any) -> SyncAsync[Any]:
@@ -202,6 +204,8 @@ class PagesEndpoint(Endpoint):
             method="POST",
             body=pick(kwargs, "parent", "properties", "children", "icon", "cover"),
             auth=kwargs.get("auth"),
+            before_retry=kwargs.get("before_retry"),
+            retry=kwargs.get("retry", True),
         )
 
     def retrieve(self, page_id: str, **kwargs: Any) -> SyncAsync[Any]:
@@ -5,7 +5,7 @@ import asyncio
 from abc import abstractclassmethod
 from dataclasses import dataclass
 from types import TracebackType
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type, Union
 
 import httpx
 from httpx import Request, Response
@@ -186,8 +186,10 @@ class Client(BaseClient):
         query: Optional[Dict[Any, Any]] = None,
         body: Optional[Dict[Any, Any]] = None,
         auth: Optional[str] = None,
+        before_retry: Optional[Callable[[], Awaitable[Any]]] = None,
+        retry: bool = True,
     ) -> Any:
-        """Send an HTTP request."""
+        """Send an HTTP request. `before_retry` and `retry` are only used by the asynchronous client."""
         request = self._build_request(method, path, query, body, auth)
         try:
             response = self.client.send(request)
@@ -236,8 +238,17 @@ class AsyncClient(BaseClient):
         query: Optional[Dict[Any, Any]] = None,
         body: Optional[Dict[Any, Any]] = None,
         auth: Optional[str] = None,
+        before_retry: Optional[Callable[[], Awaitable[Any]]] = None,
+        retry: bool = True,
     ) -> Any:
-        """Send an HTTP request asynchronously."""
+        """Send an HTTP request asynchronously.
+
+        Requests are retried on timeouts, rate limits and server errors. After a timeout or a
+        server error the request may have been processed, so `before_retry` is awaited before
+        sending it again: if it returns something other than None, that is returned instead.
+        With `retry=False`, only rate limited requests are retried, timeouts and server errors
+        are raised.
+        """
         request = self._build_request(method, path, query, body, auth)
         backoff = eb()
         while 1:
@@ -245,13 +256,21 @@ class AsyncClient(BaseClient):
                 response = await self.client.send(request)
                 return self._parse_response(response)
             except httpx.TimeoutException:
+                if not retry:
+                    raise RequestTimeoutError()
                 b = backoff.__next__()
                 self.logger.info(f"An error occurred while requesting database. Error: request timeout. retry in {b} seconds.")
                 await asyncio.sleep(b)
             except HTTPResponseError as e:
-                if 400 <= e.status < 429:
+                if 400 <= e.status < 429 or (e.status != 429 and not retry):
                     raise e
                 b = backoff.__next__()
                 self.logger.info(f"An error occurred while requesting database. Error: {e}. retry in {b} seconds.")
                 await asyncio.sleep(b)
+                if e.status == 429:
+                    continue
+            if before_retry is not None:
+                result = await before_retry()
+                if result is not None:
+                    return result
 
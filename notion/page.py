@@ -13,8 +13,10 @@ from .file import ExternalFile
 from .emoji import Emoji
 from typing import Literal, Any
 from datetime import datetime as dt
-from .page_property import PageProperty
+from .page_property import PageProperty, normalize_payload
+from .block import Block, fetch_block_tree, append_block_tree
 
+import asyncio
 import emoji
 from urllib.parse import urlparse
 
@@ -37,16 +39,57 @@ class Page(NotionObjectModel):
     public_url: None | HttpUrl
     properties: dict[str, PageProperty]
 
+    content: list[Block] = Field(default=[], exclude=True, repr=False)
     client: Any = Field(default=None, exclude=True, repr=False)
     cache: Any = Field(default=None, exclude=True, repr=False)
+    # last state returned by the server, properties are recorded on their first local change
+    server_state: dict = Field(default=dict(), exclude=True, repr=False)
 
-    def __init__(self, *, client, **kwargs):
+    def __init__(self, *, client=None, **kwargs):
         super().__init__(**kwargs)
+        if client is not None:
+            self._bind(client)
+
+    def _bind(self, client):
         self.client = client
         self.cache = client.cache
         self.cache.pages.add(self)
+        self._attach_children()
+        self._record_server_state()
+
+    def _attach_children(self):
+        users = self.cache.users
+        self.__dict__["created_by"] = users.intern(self.created_by)
+        self.__dict__["last_edited_by"] = users.intern(self.last_edited_by)
         for prop in self.properties.values():
             prop.set_parent(self)
+            prop.find_column()
+            prop.intern_users(users)
+
+    @classmethod
+    def from_response(cls, client, data: dict):
+        """ build page from API response. validation is skipped if client trusts responses. """
+        if not getattr(client, "trust_responses", False):
+            return cls(client=client, **data)
+        page = cls.model_construct_trusted(data)
+        page._bind(client)
+        return page
+
+    @classmethod
+    async def from_responses(cls, client, results: list[dict]):
+        """
+        build pages from a list of API responses.
+        if the client has an executor, models are built there and only bound to the client on the loop.
+        """
+        executor = getattr(client, "executor", None)
+        if executor is None:
+            return [cls.from_response(client, data) for data in results]
+        loop = asyncio.get_running_loop()
+        pages = await loop.run_in_executor(
+            executor, _parse_pages, results, getattr(client, "trust_responses", False))
+        for page in pages:
+            page._bind(client)
+        return pages
 
     async def get_paginated_items(self):
         for prop in self.properties.values():
@@ -54,6 +97,38 @@ class Page(NotionObjectModel):
                 await prop.get_paginated_items()
         return self
     
+    async def fetch_content(self, max_concurrency: int = 8, include_child_pages: bool = False) -> list[Block]:
+        """
+        fetch the block tree of this page into `content`.
+        children of nested blocks are fetched concurrently with at most max_concurrency requests at once.
+        """
+        self.content = await fetch_block_tree(
+            self.client, str(self.id), max_concurrency=max_concurrency, include_child_pages=include_child_pages)
+        return self.content
+
+    async def iter_markdown(self, include_child_pages: bool = False):
+        """ stream the content of this page as markdown chunks without keeping its block tree. """
+        from .markdown import MarkdownRenderer
+        async for chunk in MarkdownRenderer.stream(self.client, str(self.id), include_child_pages=include_child_pages):
+            yield chunk
+
+    async def export_markdown(self, fp, include_child_pages: bool = False):
+        """ write the content of this page to a text file object as markdown. """
+        async for chunk in self.iter_markdown(include_child_pages=include_child_pages):
+            fp.write(chunk)
+        return fp
+
+    async def append_blocks(self, blocks: list[Block], max_concurrency: int = 4) -> list[Block]:
+        """
+        append blocks with their nested children to the end of this page and return the created blocks.
+        """
+        return await append_block_tree(self.client, str(self.id), blocks, max_concurrency=max_concurrency)
+
+    async def import_markdown(self, markdown: str, max_concurrency: int = 4) -> list[Block]:
+        """ convert a markdown document to blocks and append them to this page. """
+        from .markdown import markdown_to_blocks
+        return await self.append_blocks(markdown_to_blocks(markdown), max_concurrency=max_concurrency)
+
     def get_property_values(self):
         return {i: j.get_value() for i, j in self.properties.items()}
 
@@ -65,9 +140,48 @@ class Page(NotionObjectModel):
                 f"'{self.__class__.__name__}' instance has no property named '{v}'")
         
     def _parse(self, data):
+        trusted = getattr(self.client, "trust_responses", False)
         for field in self.model_fields.keys():
             if data.get(field):
-                self.__setattr__(field, data.get(field))
+                if trusted:
+                    self._set_trusted(field, data.get(field))
+                else:
+                    self.__setattr__(field, data.get(field))
+        self._attach_children()
+        self._record_server_state()
+        self._changed()
+
+    def _record_server_state(self):
+        self.__dict__["server_state"] = {
+            "archived": self.archived, "icon": self.icon, "cover": self.cover, "properties": {}}
+
+    def _snapshot_property(self, prop):
+        """ keep the server payload of prop before its first local change. """
+        properties = self.server_state.get("properties")
+        if properties is not None and prop.id not in properties:
+            properties[prop.id] = prop.build()
+
+    def changed_properties(self) -> dict[str, dict]:
+        """ payloads of the modified properties whose value differs from the last server state. """
+        snapshots = self.server_state.get("properties", {})
+        changed = {}
+        for name, column in self.properties.items():
+            if not column.is_modified:
+                continue
+            payload = column.build()
+            old = snapshots.get(column.id)
+            if old is not None and normalize_payload(old) == normalize_payload(payload):
+                continue
+            changed[name] = payload
+        return changed
+
+    def _changed(self):
+        """ notify the parent database, whose column arrays and indexes are built from its pages. """
+        if self.cache is None or self.parent.type != "database_id":
+            return
+        database = self.cache.databases.get(self.parent.database_id)
+        if database is not None:
+            database._page_changed(self)
     
     def get_title(self):
         return [i.get_value() for i in self.properties.values() if i.type=="title"][0]
@@ -125,19 +239,20 @@ class Page(NotionObjectModel):
         icon: str = Ellipsis,
         cover: str = Ellipsis,
     ):
+        """
+        send the changes of this page. properties set to their current value and unchanged
+        archived / icon / cover are left out, and no request is made if nothing changed.
+        """
         self.edit(title=title, archived=archived, icon=icon, cover=cover)
-        properties = {}
-        for name, column in self.properties.items():
-            if column.is_modified:
-                properties[name] = column.build()
+        properties = self.changed_properties()
         dump = self.model_dump()
-        payload = {
-            "page_id": dump["id"],
-            "archived": dump["archived"],
-            "icon": dump["icon"],
-            "cover": dump["cover"],
-            "properties": properties
-        }
+        payload = {"page_id": dump["id"]}
+        for field in ("archived", "icon", "cover"):
+            if field not in self.server_state or getattr(self, field) != self.server_state[field]:
+                payload[field] = dump[field]
+        if not properties and len(payload) == 1:
+            return self
+        payload["properties"] = properties
         response = await self.client.pages.update(**payload)
         self._parse(response)
         return self
@@ -164,5 +279,10 @@ class Page(NotionObjectModel):
         response = await self.client.pages.update(**payload)
         self._parse(response)
         return self
-    
 
+
+def _parse_pages(results: list[dict], trusted: bool) -> list[Page]:
+    """ build unbound pages. module level so that process pools can pickle it. """
+    if trusted:
+        return [Page.model_construct_trusted(data) for data in results]
+    return [Page.model_validate(data) for data in results]
@@ -60,8 +60,7 @@ class BasePageProperty(NotionBaseModel):
     parent: Any = Field(default=None, exclude=True, repr=False)
     belong_to: Any = Field(default=None, exclude=True, repr=False)
 
-    def __init__(self, **kwargs) -> None:
-        super().__init__(**kwargs)
+    def model_post_init(self, __context) -> None:
         self.find_column()
         self.initialized = True
     
@@ -69,9 +68,13 @@ class BasePageProperty(NotionBaseModel):
         if not self.editable and self.initialized:
             raise UnUpdatableError()
         if self.initialized:
+            if key != "is_modified" and self.parent is not None:
+                self.parent._snapshot_property(self)
             super().__setattr__("is_modified", True)
         if key != "is_modified":
             super().__setattr__(key, value)
+            if self.initialized and self.parent is not None:
+                self.parent._changed()
 
 
     def get_value(self):
@@ -88,6 +91,10 @@ class BasePageProperty(NotionBaseModel):
             from .cache import cache
             super().__setattr__("belong_to", cache.columns.get(self.id))
 
+    def intern_users(self, register):
+        """ replace users in this property with the shared instances of register. """
+        pass
+
 
 class CreatedBy(BasePageProperty):
     """ uneditable """
@@ -95,6 +102,9 @@ class CreatedBy(BasePageProperty):
     created_by: User
     editable: bool = False
 
+    def intern_users(self, register):
+        self.__dict__["created_by"] = register.intern(self.created_by)
+
 
 class CreatedTime(BasePageProperty):
     """ uneditable """
@@ -109,6 +119,9 @@ class LastEditedBy(BasePageProperty):
     last_edited_by: User
     editable: bool = False
 
+    def intern_users(self, register):
+        self.__dict__["last_edited_by"] = register.intern(self.last_edited_by)
+
 
 class LastEditedTime(BasePageProperty):
     """ uneditable """
@@ -149,7 +162,8 @@ class MultiSelect(BasePageProperty):
     @classmethod
     def new(cls, id: str, options: list[str]=[], belong_to: Any=None):
         c = cls(id=id, type="multi_select", multi_select=[], belong_to=belong_to)
-        c.set_options(options)
+        if options:
+            c.set_options(options)
         return c
 
 
@@ -280,20 +294,25 @@ class Relation(BasePageProperty):
             return
         from .cache import cache
         client = cache.client
-        self.relation = []
+        relation = []
         start_cursor = {}
         has_more = 1
         while has_more:
             r = await client.pages.properties.retrieve(page_id=self.parent.id, property_id=self.id, **start_cursor)
             for i in r["results"]:
-                self.relation.append(NotionObjectModel(**i["relation"]))
+                relation.append(NotionObjectModel(**i["relation"]))
             has_more = r["has_more"]
             if has_more:
                 start_cursor = query_finder(r["next_url"])
+        # the complete value on the server, not a local change
+        super(BasePageProperty, self).__setattr__("relation", relation)
+        if self.parent is not None:
+            self.parent._changed()
         return self
 
     @staticmethod
     def get_notion_object(obj):
+        from .page import Page
         if isinstance(obj, Page):
             return NotionObjectModel(id=obj.id)
         elif isinstance(obj, str):
@@ -304,18 +323,20 @@ class Relation(BasePageProperty):
     def add_page(self, page: Page | str = None):
         from .cache import cache
         page = self.get_notion_object(page)
-        parent_db = cache.databases.get(self.belong_to.relation.database_id)
-        if parent_db and page in [NotionObjectModel(p.id) for p in parent_db.pages.values()]:
-            self.relation.append(page)
+        parent_db = cache.databases.get(str(self.belong_to.relation.database_id))
+        if parent_db and page in [NotionObjectModel(id=p.id) for p in parent_db.pages.values()]:
+            # assigned, not appended, so that the server value is kept and the database is notified
+            self.relation = [*self.relation, page]
         self.is_modified = True
         return self
 
     def delete_page(self, page: Page | str = None):
+        relation = list(self.relation)
         try:
-            self.relation.remove(self.get_notion_object(page))
-            self.is_modified = True
+            relation.remove(self.get_notion_object(page))
         except ValueError:
-            pass
+            return self
+        self.relation = relation
         return self
 
     def clear_pages(self):
@@ -470,6 +491,9 @@ class People(BasePageProperty):
     type: Literal["people"]
     people: list[User]
 
+    def intern_users(self, register):
+        self.__dict__["people"] = [register.intern(i) for i in self.people]
+
     @classmethod
     def new(cls, id: str, people: list[User]=[], belong_to: Any=None):
         return cls(id=id, type="people", people=[], belong_to=belong_to)
@@ -539,4 +563,53 @@ name_class_link = {
     "status": Status,
     "title": Title,
     "url": Url,
-}
\ No newline at end of file
+}
+
+""" Comparison """
+
+_default_annotations = {
+    "bold": False,
+    "italic": False,
+    "strikethrough": False,
+    "underline": False,
+    "code": False,
+    "color": "default",
+}
+
+
+def _normalize_rich_text(items: list[dict]) -> list:
+    normalized = []
+    for item in items:
+        content = item.get(item["type"])
+        if item["type"] == "mention" and content.get("type") == "user":
+            content = {"type": "user", "user": str(content["user"]["id"])}
+        normalized.append((item["type"], content, {**_default_annotations, **(item.get("annotations") or {})}))
+    return normalized
+
+
+def _normalize_option(payload: dict):
+    option = payload[payload["type"]]
+    return None if option is None else option["name"]
+
+
+_normalizers = {
+    "title": lambda p: _normalize_rich_text(p["title"]),
+    "rich_text": lambda p: _normalize_rich_text(p["rich_text"]),
+    "select": _normalize_option,
+    "status": _normalize_option,
+    "multi_select": lambda p: [i["name"] for i in p["multi_select"]],
+    "people": lambda p: [str(i["id"]) for i in p["people"]],
+    "relation": lambda p: [str(i["id"]) for i in p["relation"]],
+}
+
+
+def normalize_payload(payload: dict) -> Any:
+    """
+    comparable form of a property payload (PageProperty.build()).
+    what the server fills in (plain_text, option ids and colors, user details...) is dropped,
+    so a locally set value equals the value returned by the server for the same content.
+    """
+    normalizer = _normalizers.get(payload["type"])
+    if normalizer is not None:
+        return normalizer(payload)
+    return payload.get(payload["type"])
@@ -0,0 +1,319 @@
+"""
+Database queries
+
+paginated queries of a database with resumable checkpoints,
+and a cache of query responses in front of DatabasesEndpoint.query.
+"""
+from __future__ import annotations
+
+from .notion_client import APIErrorCode, APIResponseError
+from .notion_client.api_endpoints import DatabasesEndpoint, PagesEndpoint
+from collections import OrderedDict
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+__all__ = (
+    "query_fingerprint",
+    "QueryCheckpoint",
+    "iter_query",
+    "QueryCache",
+    "enable_query_cache",
+)
+
+
+def query_fingerprint(database_id: str, filter: None | dict = None, sorts: None | list = None, **extra) -> str:
+    """ hash of a query, the same for equal filters and sorts whatever the order of their keys. """
+    query = {"database_id": str(database_id), "filter": filter, "sorts": sorts, **extra}
+    return hashlib.sha256(json.dumps(query, sort_keys=True, ensure_ascii=False, default=str).encode()).hexdigest()
+
+
+# order of checkpointed queries without sorts, so that last_edited_time can be used to resume them
+_by_last_edited = [{"timestamp": "last_edited_time", "direction": "ascending"}]
+
+
+class QueryCheckpoint:
+    """
+    position of a paginated query, saved to a json file:
+    the cursor of the next page of results and the latest last_edited_time seen (watermark).
+    the file is only used by a query with the same fingerprint and is removed when the query is over.
+    """
+
+    def __init__(self, path: str, fingerprint: str, interval: int = 5):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.interval = interval
+        self.next_cursor: None | str = None
+        self.watermark: None | str = None
+        self.count = 0
+        self._since_save = 0
+
+    @classmethod
+    def open(cls, path: str, fingerprint: str, interval: int = 5) -> QueryCheckpoint:
+        """ the checkpoint saved at path for this query, or a new one. """
+        checkpoint = cls(path, fingerprint, interval)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("fingerprint") == fingerprint:
+                checkpoint.next_cursor = state["next_cursor"]
+                checkpoint.watermark = state["watermark"]
+                checkpoint.count = state["count"]
+        return checkpoint
+
+    def advance(self, response: dict):
+        """ record a response of the query, saved every `interval` responses. """
+        for page in response["results"]:
+            if self.watermark is None or page["last_edited_time"] > self.watermark:
+                self.watermark = page["last_edited_time"]
+        self.count += len(response["results"])
+        self.next_cursor = response["next_cursor"]
+        self._since_save += 1
+        if self._since_save >= self.interval:
+            self.save()
+
+    def save(self):
+        """ written to a temporary file first so a crash keeps the old checkpoint. """
+        self._since_save = 0
+        state = {
+            "fingerprint": self.fingerprint,
+            "next_cursor": self.next_cursor,
+            "watermark": self.watermark,
+            "count": self.count,
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __repr__(self):
+        return f"<notion.QueryCheckpoint '{self.path}'; {self.count} results, watermark: {self.watermark}>"
+
+
+def _since(filter: None | dict, watermark: str) -> dict:
+    """ filter restricted to pages edited on or after watermark. """
+    since = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": watermark}}
+    return since if not filter else {"and": [filter, since]}
+
+
+async def iter_query(
+    client,
+    database_id: str,
+    filter: None | dict = None,
+    sorts: None | list = None,
+    page_size: int = 100,
+    checkpoint: None | str = None,
+    checkpoint_interval: int = 5,
+    cache: bool = False,
+):
+    """
+    yield the results of a database query (raw page objects) one response at a time.
+    the query is always sent, unless cache is True and the client caches queries (see enable_query_cache):
+    then a result set that fits in one response may come from the cache. checkpointed queries are always sent.
+
+    checkpoint: path of a QueryCheckpoint. the position is saved every checkpoint_interval responses,
+    once the results before it were consumed, and a query started again with the same filter and sorts
+    resumes from there. without sorts, a checkpointed query is ordered by last_edited_time so that,
+    if the saved cursor expired, it resumes with the pages edited since the watermark
+    (pages edited at the watermark are returned again). with other sorts it starts over.
+    """
+    if checkpoint is not None and sorts is None:
+        sorts = _by_last_edited
+    payload = {"database_id": str(database_id), "page_size": page_size, "cache": cache and checkpoint is None}
+    if filter:
+        payload["filter"] = filter
+    if sorts:
+        payload["sorts"] = sorts
+    state = None
+    if checkpoint is not None:
+        state = QueryCheckpoint.open(checkpoint, query_fingerprint(database_id, filter, sorts), checkpoint_interval)
+        if state.next_cursor:
+            payload["start_cursor"] = state.next_cursor
+
+    while True:
+        try:
+            response = await client.databases.query(**payload)
+        except APIResponseError as e:
+            if state is None or "start_cursor" not in payload or e.code != APIErrorCode.ValidationError:
+                raise
+            # the saved cursor is not valid anymore
+            del payload["start_cursor"]
+            if sorts == _by_last_edited and state.watermark is not None:
+                payload["filter"] = _since(filter, state.watermark)
+            else:
+                state.count = 0
+            response = await client.databases.query(**payload)
+        yield response["results"]
+        if state is not None:
+            state.advance(response)
+        if not response["has_more"]:
+            break
+        payload["start_cursor"] = response["next_cursor"]
+    if state is not None:
+        state.clear()
+
+
+""" Cache """
+
+
+class QueryCache:
+    """
+    responses of database queries by fingerprint (database id, filter, sorts, page_size and token),
+    each kept for the ttl of the client that fetched it. shared by all clients of the process as cache.queries.
+    only complete result sets are cached: a response with more results to fetch (has_more) is not kept,
+    and the following ones (with a start_cursor) are always sent, so a paginated query never mixes
+    a cached response with live ones.
+    identical queries sent while one is in flight wait for its response instead of sending their own.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        # fingerprint: (expiry on time.monotonic(), database id, response as json)
+        self.entries: OrderedDict[str, tuple[float, str, str]] = OrderedDict()
+        # fingerprint: (database id, future of the json response) of the queries being sent
+        self.in_flight: dict[str, tuple[str, asyncio.Future]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def fetch(self, key: str, database_id: str, ttl: float, request) -> dict:
+        """ cached response of key, or the response of `await request()` which is cached. """
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return json.loads(entry[2])
+        if key in self.in_flight:
+            self.hits += 1
+            future = self.in_flight[key][1]
+            try:
+                return json.loads(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                # the query it waited for was cancelled, not this one: it is sent again
+                if future.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.fetch(key, database_id, ttl, request)
+                raise
+        self.misses += 1
+        database_id = _normalize_id(database_id)
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = (database_id, future)
+        try:
+            response = await request()
+            data = json.dumps(response)
+        except Exception as e:
+            future.set_exception(e)
+            # retrieved here so that no warning is logged when nobody else waits for it
+            future.exception()
+            raise
+        except BaseException:
+            # cancelled: the queries waiting for it send their own
+            future.cancel()
+            raise
+        else:
+            future.set_result(data)
+        finally:
+            # an invalidation during the request removed it from in_flight: its response may be stale
+            current = self.in_flight.get(key)
+            stale = current is None or current[1] is not future
+            if not stale:
+                del self.in_flight[key]
+        if not stale and not response.get("has_more"):
+            self.entries[key] = (time.monotonic() + ttl, database_id, data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return response
+
+    def invalidate(self, database_id: None | str = None):
+        """ drop the responses of database_id, or all of them. queries in flight are not cached. """
+        if database_id is None:
+            self.entries.clear()
+            self.in_flight.clear()
+            return
+        database_id = _normalize_id(database_id)
+        for key in [k for k, v in self.entries.items() if v[1] == database_id]:
+            del self.entries[key]
+        for key in [k for k, v in self.in_flight.items() if v[0] == database_id]:
+            del self.in_flight[key]
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return f"<notion.QueryCache; {len(self.entries)} queries, hits: {self.hits}, misses: {self.misses}>"
+
+
+def _normalize_id(object_id) -> str:
+    return str(object_id).replace("-", "")
+
+
+class CachedDatabasesEndpoint(DatabasesEndpoint):
+    """
+    DatabasesEndpoint answering queries from a QueryCache. updating a database drops its queries.
+    query(..., cache=False) always sends the query.
+    """
+
+    def __init__(self, parent, query_cache: QueryCache, ttl: float):
+        super().__init__(parent)
+        self.query_cache = query_cache
+        self.ttl = ttl
+
+    def query(self, database_id: str, cache: bool = True, **kwargs):
+        if not cache or kwargs.get("start_cursor"):
+            return super().query(database_id, **kwargs)
+        options = {k: kwargs.get(k) for k in ("filter", "sorts", "page_size", "filter_properties")}
+        token = kwargs.get("auth") or self.parent.options.auth or ""
+        key = query_fingerprint(database_id, **options, token=hashlib.sha256(token.encode()).hexdigest())
+        request = lambda: super(CachedDatabasesEndpoint, self).query(database_id, **kwargs)
+        return self.query_cache.fetch(key, database_id, self.ttl, request)
+
+    def update(self, database_id: str, **kwargs):
+        self.query_cache.invalidate(database_id)
+        return super().update(database_id, **kwargs)
+
+
+class CachedPagesEndpoint(PagesEndpoint):
+    """ PagesEndpoint dropping the cached queries of the database of the pages it creates or updates. """
+
+    def __init__(self, parent, query_cache: QueryCache):
+        super().__init__(parent)
+        self.query_cache = query_cache
+
+    def create(self, **kwargs):
+        parent = kwargs.get("parent") or {}
+        if parent.get("database_id"):
+            self.query_cache.invalidate(parent["database_id"])
+        return super().create(**kwargs)
+
+    def update(self, page_id: str, **kwargs):
+        cache = getattr(self.parent, "cache", None)
+        page = None if cache is None else cache.pages.get(str(page_id))
+        if page is not None and page.parent.type == "database_id":
+            self.query_cache.invalidate(page.parent.database_id)
+        elif page is None or page.parent.type != "page_id":
+            # the database of the page is unknown
+            self.query_cache.invalidate()
+        return super().update(page_id, **kwargs)
+
+
+def enable_query_cache(client, ttl: float, query_cache: None | QueryCache = None):
+    """
+    answer the database queries of client (an AsyncClient) from query_cache, by default the
+    process-wide cache.queries, for ttl seconds. pages created or updated and databases updated
+    through client drop the cached queries of their database, changes made elsewhere show after ttl.
+    """
+    if query_cache is None:
+        query_cache = client.cache.queries
+    client.databases = CachedDatabasesEndpoint(client, query_cache, ttl)
+    client.pages = CachedPagesEndpoint(client, query_cache)
+    return query_cache
@@ -0,0 +1,438 @@
+"""
+Restore of a backup
+
+recreates the databases, pages and block content of a snapshot written by notion.backup.Backup.
+"""
+from __future__ import annotations
+
+from .backup import DirectoryStore, SqliteStore, open_store
+from .base_model import NotionObjectModel
+from .block import parse_block, append_block_tree, ChildPage, ChildDatabase, OtherBlock, BaseMediaBlock
+from .database_property import DatabaseProperty, Relation as RelationColumn
+from .draft import DatabaseDraft, PageDraft
+from .page_property import Relation as RelationValue
+from .parent import PageParent, DatabaseParent
+from .notion_client import APIErrorCode, APIResponseError
+from pydantic import TypeAdapter
+from datetime import datetime as dt, timezone
+
+import asyncio
+import json
+import os
+
+__all__ = (
+    "Restore",
+)
+
+
+_column_adapter = TypeAdapter(DatabaseProperty)
+
+# column types that can be sent when creating a database. relations and rollups are added afterwards,
+# status columns are restored as select columns and the others (unique_id, verification...) are skipped.
+_creatable_columns = (
+    "title", "rich_text", "number", "select", "multi_select", "date", "people", "files", "checkbox",
+    "url", "email", "phone_number", "formula", "created_time", "created_by", "last_edited_time", "last_edited_by",
+)
+
+
+def _parent_id(data: dict) -> None | str:
+    parent = data["parent"]
+    if parent["type"] in ("page_id", "database_id"):
+        return parent[parent["type"]]
+    return None
+
+
+def _restorable_file(obj: None | dict) -> None | dict:
+    """ emoji and external files can be recreated. notion hosted files can not be uploaded again. """
+    if obj is not None and obj["type"] in ("emoji", "external"):
+        return obj
+    return None
+
+
+def _plain_title(data: dict) -> str:
+    if data["object"] == "database":
+        title = data["title"]
+    else:
+        title = [i for i in data["properties"].values() if i["type"] == "title"][0]["title"]
+    return "".join(i["plain_text"] for i in title)
+
+
+def _restorable_value(value: dict) -> dict:
+    """
+    property value that can be sent to another workspace: option ids are dropped (options are matched by name)
+    and notion hosted files, which can not be uploaded again, are removed.
+    """
+    if value["type"] in ("select", "status") and value[value["type"]] is not None:
+        return {**value, value["type"]: {"name": value[value["type"]]["name"]}}
+    if value["type"] == "multi_select":
+        return {**value, "multi_select": [{"name": i["name"]} for i in value["multi_select"]]}
+    if value["type"] == "files":
+        return {**value, "files": [i for i in value["files"] if i["type"] == "external"]}
+    return value
+
+
+def _remap(obj, id_map: dict[str, str]):
+    """ copy of obj with the ids of restored pages and databases (mentions, relations...) replaced. """
+    if isinstance(obj, dict):
+        return {k: id_map.get(v, v) if isinstance(v, str) else _remap(v, id_map) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_remap(i, id_map) for i in obj]
+    return obj
+
+
+class Restore:
+    """
+    restore a snapshot under `root_page_id`.
+
+    objects are recreated in three steps:
+    1. databases (via DatabaseDraft) and pages (via PageDraft), parents before children.
+       objects whose parent is not in the snapshot are created under root_page_id.
+    2. relation and rollup columns, then relation values, pointing to the new ids.
+    3. block content, with mentions of restored pages pointing to the new ids.
+
+    every step is appended to the journal file, so an interrupted restore started again
+    with the same journal continues where it stopped. an object whose creation was sent
+    but not recorded, or retried after a timeout, is looked up under its new parent (by title,
+    created since) before it is created again. the content of a page whose blocks were partly appended is cleared
+    and appended again.
+    what can not be restored (objects rejected by the API, hosted files, unsupported blocks...) is listed in `skipped`.
+
+        restore = Restore(client, "backup.sqlite", root_page_id, journal_path="restore.jsonl")
+        id_map = await restore.run()
+    """
+
+    def __init__(
+        self,
+        client,
+        store: str | DirectoryStore | SqliteStore,
+        root_page_id: str,
+        journal_path: None | str = None,
+        max_concurrency: int = 4,
+    ):
+        self.client = client
+        self.store = open_store(store) if isinstance(store, str) else store
+        self.root_page_id = root_page_id
+        self.journal_path = journal_path
+        self.max_concurrency = max_concurrency
+        self.id_map: dict[str, str] = {}
+        self.completed: set[str] = set()
+        # time at which the creation of each object was started
+        self.started: dict[str, str] = {}
+        self.skipped: list[str] = []
+        self.snapshots: dict[str, dict] = {}
+        self._load_journal()
+
+    """ journal """
+
+    def _load_journal(self):
+        if self.journal_path is None or not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self.completed.add(f"{entry['step']}:{entry['id']}")
+                if "new_id" in entry:
+                    self.id_map[entry["id"]] = entry["new_id"]
+                if "started_at" in entry:
+                    self.started[entry["id"]] = entry["started_at"]
+
+    def _record(self, step: str, obj_id: str, **extra):
+        self.completed.add(f"{step}:{obj_id}")
+        if "new_id" in extra:
+            self.id_map[obj_id] = extra["new_id"]
+        if "started_at" in extra:
+            self.started[obj_id] = extra["started_at"]
+        if self.journal_path is None:
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"step": step, "id": obj_id, **extra}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _is_done(self, step: str, obj_id: str) -> bool:
+        return f"{step}:{obj_id}" in self.completed
+
+    """ restore """
+
+    async def run(self) -> dict[str, str]:
+        """ restore the whole snapshot and return the mapping of old ids to new ids. """
+        for obj_id in self.store.ids():
+            self.snapshots[obj_id] = self.store.get(obj_id)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # creation task of each object, children wait for the task of their parent
+        self._creating: dict[str, asyncio.Task] = {}
+        async with asyncio.TaskGroup() as tg:
+            for obj_id in self.snapshots:
+                if obj_id not in self.id_map:
+                    self._creating[obj_id] = tg.create_task(self._create(obj_id))
+        # objects rejected by the API are in skipped, not in id_map
+        restored = {i: j for i, j in self.snapshots.items() if i in self.id_map}
+        async with asyncio.TaskGroup() as tg:
+            for obj_id, snapshot in restored.items():
+                if snapshot["object"]["object"] == "database" and not self._is_done("columns", obj_id):
+                    tg.create_task(self._restore_columns(obj_id))
+        async with asyncio.TaskGroup() as tg:
+            for obj_id, snapshot in restored.items():
+                if snapshot["object"]["object"] == "page" and not self._is_done("relations", obj_id):
+                    tg.create_task(self._restore_relations(obj_id))
+        async with asyncio.TaskGroup() as tg:
+            for obj_id, snapshot in restored.items():
+                if snapshot.get("blocks") and not self._is_done("blocks", obj_id):
+                    tg.create_task(self._restore_blocks(obj_id))
+        return self.id_map
+
+    async def _new_parent_id(self, data: dict) -> str:
+        parent_id = _parent_id(data)
+        if parent_id in self._creating:
+            return await self._creating[parent_id] or self.root_page_id
+        if parent_id in self.id_map:
+            return self.id_map[parent_id]
+        return self.root_page_id
+
+    async def _create(self, obj_id: str) -> None | str:
+        """ id of the created object, None if the API rejected it (it is added to skipped). """
+        data = self.snapshots[obj_id]["object"]
+        parent_id = await self._new_parent_id(data)
+        async with self._semaphore:
+            if obj_id in self.started:
+                # an interrupted restore sent this creation, it may exist without being recorded
+                created_id = await self._find_created(obj_id, data, parent_id)
+                if created_id is not None:
+                    self._record("create", obj_id, new_id=created_id)
+                    return created_id
+            else:
+                self._record("create_started", obj_id, started_at=dt.now(timezone.utc).isoformat())
+            endpoints = self.client.client
+
+            async def existing():
+                # a creation that timed out may have been done, it is looked up before being sent again
+                created_id = await self._find_created(obj_id, data, parent_id)
+                return None if created_id is None else {"id": created_id}
+
+            try:
+                if data["object"] == "database":
+                    draft = self._database_draft(obj_id, data, parent_id)
+                    created = await endpoints.databases.create(**draft.model_dump(), before_retry=existing)
+                else:
+                    draft = await self._page_draft(obj_id, data, parent_id)
+                    created = await endpoints.pages.create(**draft.model_dump(), before_retry=existing)
+            except APIResponseError as e:
+                if e.code != APIErrorCode.ValidationError:
+                    raise
+                self.skipped.append(obj_id)
+                return None
+        self._record("create", obj_id, new_id=created["id"])
+        return created["id"]
+
+    async def _find_created(self, obj_id: str, data: dict, parent_id: str) -> None | str:
+        """
+        id of an object with the title of obj_id created under parent_id since its creation was started,
+        and not restored from another object. rows are looked up with a query of their database,
+        other objects in the child pages and databases of their parent page.
+        """
+        title = _plain_title(data)
+        # created_time is rounded to the minute
+        since = dt.fromisoformat(self.started[obj_id]).replace(second=0, microsecond=0)
+        restored = set(self.id_map.values())
+        candidates = []
+        if data["parent"]["type"] == "database_id" and _parent_id(data) in self.id_map:
+            title_name = [n for n, v in data["properties"].items() if v["type"] == "title"][0]
+            payload = {"database_id": parent_id, "filter": {"property": title_name, "title": {"equals": title}}, "cache": False}
+            while True:
+                response = await self.client.client.databases.query(**payload)
+                candidates += [(i["id"], i["created_time"]) for i in response["results"]]
+                if not response["has_more"]:
+                    break
+                payload["start_cursor"] = response["next_cursor"]
+        else:
+            block_type = "child_database" if data["object"] == "database" else "child_page"
+            payload = {"block_id": parent_id}
+            while True:
+                response = await self.client.client.blocks.children.list(**payload)
+                candidates += [
+                    (i["id"], i["created_time"]) for i in response["results"]
+                    if i["type"] == block_type and i[block_type]["title"] == title
+                ]
+                if not response["has_more"]:
+                    break
+                payload["start_cursor"] = response["next_cursor"]
+        for candidate_id, created_time in candidates:
+            if candidate_id not in restored and dt.fromisoformat(created_time) >= since:
+                return candidate_id
+        return None
+
+    def _database_draft(self, obj_id: str, data: dict, parent_id: str) -> DatabaseDraft:
+        properties = {}
+        for name, column in data["properties"].items():
+            if column["type"] in ("relation", "rollup"):
+                # they need the other databases, they are added by _restore_columns
+                continue
+            if column["type"] == "status":
+                # status columns can not be created through the API
+                options = column["status"]["options"]
+                properties[name] = {"id": column["id"], "name": name, "type": "select", "select": {"options": options}}
+            elif column["type"] in _creatable_columns:
+                properties[name] = column
+            else:
+                self.skipped.append(f"{obj_id}:{name}")
+        return DatabaseDraft(
+            title=data["title"],
+            description=data["description"],
+            icon=_restorable_file(data["icon"]),
+            cover=_restorable_file(data["cover"]),
+            is_inline=data["is_inline"],
+            parent=PageParent.new(parent_id),
+            properties=properties,
+        )
+
+    async def _page_draft(self, obj_id: str, data: dict, parent_id: str) -> PageDraft:
+        title = [i for i in data["properties"].values() if i["type"] == "title"][0]["title"]
+        kwargs = dict(
+            title=title,
+            icon=_restorable_file(data["icon"]),
+            cover=_restorable_file(data["cover"]),
+        )
+        if data["parent"]["type"] != "database_id" or _parent_id(data) not in self.id_map:
+            return PageDraft(parent=PageParent.new(parent_id), **kwargs)
+        database = await self.client.fetch_database(parent_id)
+        properties = {}
+        for name, value in data["properties"].items():
+            if value["type"] in ("relation", "rollup", "formula", "created_time", "created_by",
+                                 "last_edited_time", "last_edited_by", "unique_id", "verification"):
+                continue
+            if name not in database.properties:
+                continue
+            restorable = _restorable_value(value)
+            if value["type"] == "status" and database.properties[name].type == "select":
+                restorable = {"type": "select", "select": restorable["status"]}
+            elif value["type"] != database.properties[name].type:
+                continue
+            if value["type"] == "files" and len(restorable["files"]) < len(value["files"]):
+                self.skipped.append(f"{obj_id}:{name}")
+            properties[name] = {**restorable, "id": database.properties[name].id}
+        return PageDraft(parent=DatabaseParent.new(parent_id), properties=properties, **kwargs)
+
+    def _restored_relation(self, database_id: str, column: dict) -> bool:
+        """
+        whether a relation column of the snapshot is recreated.
+        the target must be restored too, and a dual relation is only created from one side.
+        """
+        target = column["relation"]["database_id"]
+        if target not in self.id_map:
+            return False
+        if column["relation"]["type"] == "dual_property":
+            return database_id <= target
+        return True
+
+    async def _restore_columns(self, obj_id: str):
+        data = self.snapshots[obj_id]["object"]
+        database = await self.client.fetch_database(self.id_map[obj_id])
+        relations = {n: c for n, c in data["properties"].items() if c["type"] == "relation"}
+        rollups = {n: c for n, c in data["properties"].items() if c["type"] == "rollup"}
+        added = False
+        for name, column in relations.items():
+            if not self._restored_relation(obj_id, column) or name in database.properties:
+                self.skipped.append(f"{obj_id}:{name}")
+                continue
+            new_column = RelationColumn.new(self.id_map[column["relation"]["database_id"]], column["relation"]["type"])
+            database.add_property(name, new_column)
+            added = True
+        if added:
+            async with self._semaphore:
+                await database.update()
+        added = False
+        for name, column in rollups.items():
+            config = column["rollup"]
+            relation = database.properties.get(config["relation_property_name"])
+            if relation is None or name in database.properties:
+                self.skipped.append(f"{obj_id}:{name}")
+                continue
+            target = await self.client.fetch_database(str(relation.relation.database_id))
+            item = target.properties.get(config["rollup_property_name"])
+            if item is None:
+                self.skipped.append(f"{obj_id}:{name}")
+                continue
+            new_column = _column_adapter.validate_python({**column, "id": ""})
+            new_column.set_relation(relation)
+            new_column.set_rollup_item(item)
+            database.add_property(name, new_column)
+            added = True
+        if added:
+            async with self._semaphore:
+                await database.update()
+        self._record("columns", obj_id)
+
+    async def _restore_relations(self, obj_id: str):
+        data = self.snapshots[obj_id]["object"]
+        parent = self.snapshots.get(_parent_id(data) or "")
+        relations = {n: v for n, v in data["properties"].items() if v["type"] == "relation" and v["relation"]}
+        if parent is None or _parent_id(data) not in self.id_map or not relations:
+            self._record("relations", obj_id)
+            return
+        page = await self.client.fetch_page(self.id_map[obj_id])
+        database = await self.client.fetch_database(self.id_map[_parent_id(data)])
+        modified = False
+        for name, value in relations.items():
+            column = parent["object"]["properties"].get(name)
+            if column is None or not self._restored_relation(_parent_id(data), column) or name not in database.properties:
+                continue
+            # the column was added after the page was created, so the page may not have it yet
+            page.properties[name] = RelationValue(
+                id=database.properties[name].id,
+                type="relation",
+                has_more=False,
+                relation=[NotionObjectModel(id=self.id_map[i["id"]]) for i in value["relation"] if i["id"] in self.id_map],
+                is_modified=True,
+            )
+            modified = True
+        if modified:
+            async with self._semaphore:
+                await page.update()
+        self._record("relations", obj_id)
+
+    async def _restore_blocks(self, obj_id: str):
+        new_id = self.id_map[obj_id]
+        blocks = self._blocks(_remap(self.snapshots[obj_id]["blocks"], self.id_map))
+        if self._is_done("blocks_started", obj_id):
+            # an interrupted restore appended part of the content, it is appended again from the start
+            await self._clear_content(new_id)
+        else:
+            self._record("blocks_started", obj_id)
+        await append_block_tree(self.client.client, new_id, blocks, semaphore=self._semaphore)
+        self._record("blocks", obj_id)
+
+    async def _clear_content(self, page_id: str):
+        """ archive the blocks of a restored page, except its child pages and databases which are restored objects. """
+        block_ids = []
+        payload = {"block_id": page_id}
+        while True:
+            response = await self.client.client.blocks.children.list(**payload)
+            block_ids += [i["id"] for i in response["results"] if i["type"] not in ("child_page", "child_database")]
+            if not response["has_more"]:
+                break
+            payload["start_cursor"] = response["next_cursor"]
+        for block_id in block_ids:
+            async with self._semaphore:
+                await self.client.client.blocks.delete(block_id=block_id)
+
+    def _blocks(self, data: list[dict]) -> list:
+        """
+        blocks that can be created again. child pages and databases are restored as objects,
+        notion hosted files can not be uploaded and unsupported blocks can not be created.
+        """
+        blocks = []
+        for i in data:
+            block = parse_block(i)
+            if isinstance(block, (ChildPage, ChildDatabase)):
+                continue
+            if isinstance(block, OtherBlock):
+                self.skipped.append(i["id"])
+                continue
+            if isinstance(block, BaseMediaBlock) and block.get_content().type != "external":
+                self.skipped.append(i["id"])
+                continue
+            block.children = self._blocks(i.get("children", []))
+            blocks.append(block)
+        return blocks
@@ -4,7 +4,8 @@ Rich text objects
 https://developers.notion.com/reference/rich-text
 """
 
-from pydantic import HttpUrl
+from __future__ import annotations
+from pydantic import HttpUrl, ConfigDict
 from .base_model import NotionObjectModel, NotionBaseModel
 from .general_object import UrlObject, DateObject
 from .user import User, BaseUser
@@ -22,6 +23,9 @@ __all__ = (
 )
 
 
+MAX_TEXT_LENGTH = 2000
+
+
 class TextColor(Enum):
     blue = "blue"
     blue_background = "blue_background"
@@ -45,6 +49,11 @@ class TextColor(Enum):
 
 
 class Annotation(NotionBaseModel):
+    """
+    immutable and shared between rich texts. use BaseRichText.annotate to change it.
+    """
+    model_config = ConfigDict(validate_assignment=True, frozen=True)
+
     bold: bool = False
     italic: bool = False
     strikethrough: bool = False
@@ -52,12 +61,42 @@ class Annotation(NotionBaseModel):
     code: bool = False
     color: TextColor = TextColor.default
 
+    @classmethod
+    def intern(cls, annotation: Annotation) -> Annotation:
+        """ return the shared instance equal to annotation (including which fields were set). """
+        key = (
+            annotation.bold,
+            annotation.italic,
+            annotation.strikethrough,
+            annotation.underline,
+            annotation.code,
+            annotation.color,
+            frozenset(annotation.model_fields_set),
+        )
+        return _annotations.setdefault(key, annotation)
+
+    @classmethod
+    def default(cls) -> Annotation:
+        return cls.intern(cls())
+
+
+_annotations: dict[tuple, Annotation] = {}
+
 
 class BaseRichText(NotionBaseModel):
     annotations: Annotation
     plain_text: str
     href: None | HttpUrl
 
+    def model_post_init(self, __context) -> None:
+        self.__dict__["annotations"] = Annotation.intern(self.annotations)
+
+    def annotate(self, **kwargs):
+        """ copy-on-write update of annotations, e.g. text.annotate(bold=True, color="red") """
+        values = {i: getattr(self.annotations, i) for i in self.annotations.model_fields_set}
+        self.annotations = Annotation.intern(Annotation(**{**values, **kwargs}))
+        return self
+
 
 """ Equation text """
 
@@ -73,7 +112,7 @@ class EquationText(BaseRichText):
     @classmethod
     def new(cls, expression: str = ""):
         return cls(
-            annotations=Annotation(),
+            annotations=Annotation.default(),
             plain_text="",
             href=None,
             type="equation",
@@ -190,7 +229,7 @@ class MentionText(BaseRichText):
     @classmethod
     def new(cls, montion_model: MentionType):
         return cls(
-            annotations=Annotation(),
+            annotations=Annotation.default(),
             plain_text="",
             href=None,
             type="mention",
@@ -217,13 +256,20 @@ class Text(BaseRichText):
     @classmethod
     def new(cls, text: str = "", url=None):
         return cls(
-            annotations=Annotation(),
+            annotations=Annotation.default(),
             plain_text=text,
             href=None,
             type="text",
             text=TextContent.new(text, url),
         )
 
+    @classmethod
+    def new_list(cls, text: str = "") -> list[Text]:
+        """ Text.new split into segments of at most MAX_TEXT_LENGTH characters (limit of the API). """
+        if len(text) <= MAX_TEXT_LENGTH:
+            return [cls.new(text)]
+        return [cls.new(text[i:i + MAX_TEXT_LENGTH]) for i in range(0, len(text), MAX_TEXT_LENGTH)]
+
 
 RichText = Union[
     Text,
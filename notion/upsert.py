@@ -0,0 +1,152 @@
+"""
+Upsert of pages by key
+
+creates the pages of drafts whose key is not in the database yet and updates the others,
+sending only the properties whose value changed.
+"""
+from __future__ import annotations
+
+from .export import flatten_value
+from .page_property import normalize_payload
+from .query import iter_query
+from typing import Any, TYPE_CHECKING
+
+import asyncio
+
+if TYPE_CHECKING:
+    from .database import Database
+    from .draft import PageDraft
+    from .page import Page
+
+__all__ = (
+    "UpsertReport",
+    "changed_properties",
+    "upsert_pages",
+)
+
+
+# the API accepts at most 100 filters in a compound filter
+_KEYS_PER_QUERY = 100
+
+# column types whose values can be matched with an equals filter
+_key_types = ("title", "rich_text", "number", "select", "email", "url", "phone_number", "unique_id")
+
+
+class UpsertReport:
+    """ pages created, updated and left unchanged by an upsert, and the errors of failed writes, by key value. """
+
+    def __init__(self):
+        self.created: dict[Any, Page] = {}
+        self.updated: dict[Any, Page] = {}
+        self.unchanged: dict[Any, Page] = {}
+        self.failed: dict[Any, Exception] = {}
+
+    def __repr__(self):
+        return (f"<notion.UpsertReport; created: {len(self.created)}, "
+                f"updated: {len(self.updated)}, unchanged: {len(self.unchanged)}, failed: {len(self.failed)}>")
+
+
+def changed_properties(page: Page, draft: PageDraft) -> dict[str, Any]:
+    """
+    properties set in draft (is_modified) whose value differs from the one of page.
+    payloads are compared in their normalized form (see notion.page_property.normalize_payload).
+    """
+    changed = {}
+    for name, prop in draft.properties.items():
+        if not prop.is_modified or not prop.editable:
+            continue
+        current = page.properties.get(name)
+        if current is not None and normalize_payload(current.build()) == normalize_payload(prop.build()):
+            continue
+        changed[name] = prop
+    return changed
+
+
+def _key_filter(key: str, column_type: str, value) -> dict:
+    if column_type == "unique_id":
+        # "PREFIX-12" is filtered by its number
+        value = int(str(value).rsplit("-", 1)[-1])
+    return {"property": key, column_type: {"equals": value}}
+
+
+def _key_of(draft: PageDraft, key: str):
+    if key not in draft.properties:
+        raise KeyError(f"draft has no property named '{key}'")
+    value = flatten_value(draft.properties[key].get_value())
+    if value in (None, "", []):
+        raise ValueError(f"draft has no value for the key property '{key}'")
+    return value
+
+
+async def _query_by_keys(database: Database, key: str, values: list) -> dict[Any, Page]:
+    """ existing pages by key value, fetched with one filtered query per chunk of keys. """
+    from .page import Page
+    column_type = database.properties[key].type
+    found = {}
+    for i in range(0, len(values), _KEYS_PER_QUERY):
+        conditions = [_key_filter(key, column_type, v) for v in values[i:i + _KEYS_PER_QUERY]]
+        async for results in iter_query(database.client, database.id, filter={"or": conditions}):
+            for page in await Page.from_responses(database.client, results):
+                found[flatten_value(page.properties[key].get_value())] = page
+    return found
+
+
+async def upsert_pages(database: Database, drafts: list[PageDraft], key: str, max_concurrency: int = 4) -> UpsertReport:
+    """
+    create or update a page of database for every draft, matching existing pages by the value of column `key`.
+    existing pages are looked up in `database.pages` if it is indexed by key or all of its pages were fetched,
+    otherwise with filtered queries. only changed properties are sent, unchanged pages are not written.
+    the key column must be of one of the types in _key_types. a write that fails does not stop the others,
+    its error is in report.failed.
+    """
+    if key not in database.properties:
+        raise KeyError(f"'{database.__class__.__name__}' instance has no property named '{key}'")
+    column_type = database.properties[key].type
+    if column_type not in _key_types:
+        raise ValueError(f"a {column_type} column can not be used as key, use one of: {', '.join(_key_types)}")
+    by_key = {}
+    for draft in drafts:
+        value = _key_of(draft, key)
+        if value in by_key:
+            raise ValueError(f"several drafts have the key {value!r}")
+        by_key[value] = draft
+
+    if key in database.indexes or database.fetched_all_pages:
+        index = database._index(key)
+        existing = {}
+        for value in by_key:
+            found = index.find(value)
+            if found:
+                existing[value] = found[0]
+    else:
+        existing = await _query_by_keys(database, key, list(by_key))
+
+    report = UpsertReport()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def write(value, draft):
+        try:
+            await write_page(value, draft)
+        except Exception as e:
+            report.failed[value] = e
+
+    async def write_page(value, draft):
+        page = existing.get(value)
+        if page is None:
+            async with semaphore:
+                report.created[value] = await database.create_page(draft)
+            return
+        changed = changed_properties(page, draft)
+        if not changed:
+            report.unchanged[value] = page
+            return
+        async with semaphore:
+            response = await database.client.pages.update(
+                page_id=str(page.id), properties={name: prop.build() for name, prop in changed.items()})
+        page._parse(response)
+        report.updated[value] = page
+
+    async with asyncio.TaskGroup() as tg:
+        for value, draft in by_key.items():
+            tg.create_task(write(value, draft))
+    return report
@@ -4,7 +4,8 @@ User objects
 https://developers.notion.com/reference/user
 """
 
-from .base_model import NotionObjectModel, NotionBaseModel
+from pydantic import TypeAdapter
+from .base_model import NotionObjectModel, NotionBaseModel, construct_builder
 from .general_object import EmailObject, EmptyObject
 from typing import Literal, Any, Union
 
@@ -57,3 +58,11 @@ User = Union[
     Bot,
     BaseUser,
 ]
+
+_user_adapter = TypeAdapter(User)
+
+def parse_user(data: dict, trusted: bool = False) -> User:
+    """ build User from API response. """
+    if trusted:
+        return construct_builder(User)(data)
+    return _user_adapter.validate_python(data)
@@ -33,6 +33,11 @@ setup(
     download_url=URL,
     packages=PACKAGES,
     install_requires=requirements(),
+    extras_require={
+        "arrow": ["pyarrow"],
+        "numpy": ["numpy"],
+        "pandas": ["pandas"],
+    },
     python_requires='>=3.11, <4',
     classifiers=[
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,54 @@
+import asyncio
+import inspect
+import itertools
+
+import httpx
+import pytest
+
+import notion
+import notion.notion_client.client
+from notion.cache import Cache, cache
+
+from fake_notion import FakeNotion
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """ run coroutine tests in their own event loop. """
+    if inspect.iscoroutinefunction(pyfuncitem.obj):
+        arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+        asyncio.run(pyfuncitem.obj(**arguments))
+        return True
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """ the cache is global to the process, every test starts with an empty one. """
+    cache.__dict__.update(Cache().__dict__)
+    yield
+    cache.__dict__.update(Cache().__dict__)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(notion.notion_client.client, "eb", lambda: itertools.repeat(0))
+
+
+@pytest.fixture
+def fake() -> FakeNotion:
+    return FakeNotion()
+
+
+@pytest.fixture
+def connect(fake):
+    """ connect(**options) -> notion.Client sending its requests to fake. """
+    def connect(**options) -> notion.Client:
+        client = notion.Client("secret", **options)
+        client.client.client = httpx.AsyncClient(transport=fake.transport())
+        return client
+    return connect
+
+
+@pytest.fixture
+def client(connect) -> notion.Client:
+    return connect()
@@ -0,0 +1,566 @@
+"""
+in-memory Notion API for the tests, served to httpx through a MockTransport.
+
+it keeps databases, pages and blocks as the API returns them, evaluates the filters and sorts
+used by the library, paginates with cursors that can be expired, logs every request and can be
+told to fail the next requests matching a method and a path.
+"""
+from __future__ import annotations
+
+from datetime import datetime as dt, timedelta, timezone
+from typing import Any
+
+import copy
+import json
+import re
+import uuid
+
+import httpx
+
+USER = {"object": "user", "id": "6794760a-1f15-45cd-9c65-0dfe42f5135a"}
+
+_annotations = {"bold": False, "italic": False, "strikethrough": False, "underline": False, "code": False, "color": "default"}
+
+_error_codes = {400: "validation_error", 403: "restricted_resource", 404: "object_not_found", 409: "conflict_error", 429: "rate_limited", 500: "internal_server_error", 503: "service_unavailable"}
+
+
+def rich_text(content: str, **annotations) -> dict:
+    """ rich text object of the API, as found in responses. """
+    return {
+        "type": "text",
+        "text": {"content": content, "link": None},
+        "annotations": {**_annotations, **annotations},
+        "plain_text": content,
+        "href": None,
+    }
+
+
+def _rich_text(items: list[dict]) -> list[dict]:
+    """ rich text of a request completed like in the responses of the API. """
+    result = []
+    for item in items:
+        item = copy.deepcopy(item)
+        item.setdefault("type", "text")
+        item["annotations"] = {**_annotations, **(item.get("annotations") or {})}
+        if item["type"] == "text":
+            item["text"].setdefault("link", None)
+            item["plain_text"] = item["text"]["content"]
+            link = item["text"]["link"]
+            item["href"] = link["url"] if link else None
+        else:
+            item.setdefault("plain_text", "")
+            item.setdefault("href", None)
+        result.append(item)
+    return result
+
+
+def _plain(items: list[dict]) -> str:
+    return "".join(i["plain_text"] for i in items)
+
+
+def _error(status: int, message: str) -> httpx.Response:
+    code = _error_codes.get(status, "internal_server_error")
+    return httpx.Response(status, json={"object": "error", "status": status, "code": code, "message": message})
+
+
+class Fault:
+
+    def __init__(self, method: str, path: str, error: str | int, after: bool, times: int):
+        self.method = method
+        self.path = re.compile(path)
+        self.error = error
+        self.after = after
+        self.times = times
+
+    def matches(self, method: str, path: str) -> bool:
+        return self.times > 0 and method == self.method and self.path.fullmatch(path) is not None
+
+
+class FakeNotion:
+    """
+    fake = FakeNotion()
+    database_id = fake.add_database("Tasks", {"Name": {"type": "title"}, "Budget": {"type": "number"}})
+    client.client.client = httpx.AsyncClient(transport=fake.transport())
+    """
+
+    def __init__(self):
+        self.databases: dict[str, dict] = {}
+        self.pages: dict[str, dict] = {}
+        self.blocks: dict[str, dict] = {}
+        # ids of the children of pages and blocks, in order
+        self.children: dict[str, list[str]] = {}
+        # method, path and json body of every request received
+        self.requests: list[tuple[str, str, Any]] = []
+        self.faults: list[Fault] = []
+        # cursor: offset of the next result
+        self.cursors: dict[str, int] = {}
+        self.clock = dt(2024, 1, 1, tzinfo=timezone.utc)
+        self.unique_ids = 0
+        self.routes = [
+            ("GET", r"databases/([^/]+)", self.retrieve_database),
+            ("PATCH", r"databases/([^/]+)", self.update_database),
+            ("POST", r"databases", self.create_database),
+            ("POST", r"databases/([^/]+)/query", self.query_database),
+            ("GET", r"pages/([^/]+)", self.retrieve_page),
+            ("PATCH", r"pages/([^/]+)", self.update_page),
+            ("POST", r"pages", self.create_page),
+            ("GET", r"pages/([^/]+)/properties/([^/]+)", self.retrieve_page_property),
+            ("GET", r"blocks/([^/]+)", self.retrieve_block),
+            ("DELETE", r"blocks/([^/]+)", self.delete_block),
+            ("GET", r"blocks/([^/]+)/children", self.list_children),
+            ("PATCH", r"blocks/([^/]+)/children", self.append_children),
+            ("POST", r"search", self.search),
+        ]
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    """ Test helpers """
+
+    def fail(self, method: str, path: str, error: str | int = "timeout", after: bool = False, times: int = 1):
+        """
+        make the next `times` requests matching method and path (a regex of the path after /v1/) fail.
+        error: "timeout" or an http status. after: the request is processed before failing, as when
+        the response is lost.
+        """
+        self.faults.append(Fault(method, path, error, after, times))
+
+    def expire_cursors(self):
+        self.cursors.clear()
+
+    def sent(self, method: str, path: str = ".*") -> list[Any]:
+        """ bodies of the requests matching method and path. """
+        pattern = re.compile(path)
+        return [body for m, p, body in self.requests if m == method and pattern.fullmatch(p)]
+
+    def add_database(self, title: str, properties: dict[str, dict], parent_id: None | str = None) -> str:
+        """ a database with columns {name: {"type": ..., config}}, returns its id. """
+        parent_id = parent_id or self.add_page(None, "Workspace")
+        data = self._database({
+            "parent": {"type": "page_id", "page_id": parent_id},
+            "title": [rich_text(title)],
+            "properties": {name: {"name": name, **column} for name, column in properties.items()},
+        })
+        return data["id"]
+
+    def add_page(self, parent_id: None | str, title: str = "", **values) -> str:
+        """ a page under a page or a database (then values are {column name: API value}), returns its id. """
+        if parent_id is None:
+            parent = {"type": "workspace", "workspace": True}
+        elif parent_id in self.databases:
+            parent = {"type": "database_id", "database_id": parent_id}
+        else:
+            parent = {"type": "page_id", "page_id": parent_id}
+        properties = {name: {self._column(parent, name)["type"]: value} for name, value in values.items()}
+        properties[self._title_column(parent)] = {"title": [rich_text(title)]}
+        return self._page({"parent": parent, "properties": properties})["id"]
+
+    def rows(self, database_id: str) -> list[dict]:
+        """ the pages of a database that are not archived. """
+        database_id = _id(str(database_id))
+        return [i for i in self.pages.values() if i["parent"].get("database_id") == database_id and not i["archived"]]
+
+    def tree(self, block_id: str) -> list[tuple]:
+        """ (type, plain text, children) of the blocks under block_id. """
+        result = []
+        for child_id in self.children.get(_id(str(block_id)), []):
+            block = self.blocks[child_id]
+            content = block[block["type"]]
+            text = _plain(content["rich_text"]) if "rich_text" in content else content.get("title", "")
+            result.append((block["type"], text, self.tree(child_id)))
+        return result
+
+    """ Transport """
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.removeprefix("/v1/")
+        body = json.loads(request.content) if request.content else None
+        self.requests.append((request.method, path, body))
+        fault = next((i for i in self.faults if i.matches(request.method, path)), None)
+        if fault is not None:
+            fault.times -= 1
+            if fault.after:
+                self._route(request, path, body)
+            if fault.error == "timeout":
+                raise httpx.ReadTimeout("timed out", request=request)
+            return _error(fault.error, "injected failure")
+        return self._route(request, path, body)
+
+    def _route(self, request: httpx.Request, path: str, body: Any) -> httpx.Response:
+        for method, pattern, handler in self.routes:
+            match = re.fullmatch(pattern, path)
+            if method == request.method and match:
+                try:
+                    return httpx.Response(200, json=handler(*match.groups(), body=body, query=request.url.params))
+                except KeyError as e:
+                    return _error(404, f"Could not find {e}")
+                except ValueError as e:
+                    return _error(400, str(e))
+        return _error(400, f"Invalid request URL: {request.method} {path}")
+
+    """ Objects """
+
+    def _tick(self) -> str:
+        self.clock += timedelta(minutes=1)
+        return self.clock.isoformat().replace("+00:00", ".000Z")
+
+    def _meta(self, object_type: str, parent: dict) -> dict:
+        now = self._tick()
+        object_id = str(uuid.uuid4())
+        return {
+            "object": object_type,
+            "id": object_id,
+            "created_time": now,
+            "created_by": USER,
+            "last_edited_time": now,
+            "last_edited_by": USER,
+            "parent": parent,
+            "archived": False,
+            "icon": None,
+            "cover": None,
+            "url": f"https://www.notion.so/{object_id.replace('-', '')}",
+            "public_url": None,
+        }
+
+    def _database(self, body: dict) -> dict:
+        data = self._meta("database", _normalize_parent(body["parent"]))
+        data.update({
+            "title": _rich_text(body.get("title") or []),
+            "description": _rich_text(body.get("description") or []),
+            "is_inline": body.get("is_inline", False),
+            "icon": body.get("icon"),
+            "cover": body.get("cover"),
+            "properties": {},
+        })
+        self._set_columns(data, body.get("properties") or {})
+        self.databases[data["id"]] = data
+        self._add_child(data["parent"], data["id"], "child_database", _plain(data["title"]))
+        return data
+
+    def _set_columns(self, database: dict, properties: dict):
+        for name, column in properties.items():
+            if column is None:
+                database["properties"].pop(name, None)
+                continue
+            column = copy.deepcopy(column)
+            name = column.pop("name", name)
+            if "type" not in column:
+                column["type"] = next(k for k in column if k not in ("id", "name", "description"))
+            config = column.get(column["type"]) or {}
+            if column["type"] in ("select", "multi_select", "status"):
+                config["options"] = [
+                    {"id": i.get("id") or str(uuid.uuid4())[:4], "color": i.get("color", "default"), "name": i["name"]}
+                    for i in config.get("options", [])
+                ]
+            if column["type"] == "status":
+                config.setdefault("groups", [])
+            if column["type"] == "number":
+                config.setdefault("format", "number")
+            old = database["properties"].get(name)
+            column_id = old["id"] if old else ("title" if column["type"] == "title" else column.get("id") or str(uuid.uuid4())[:4])
+            database["properties"][name] = {"id": column_id, "name": name, "type": column["type"], column["type"]: config}
+
+    def _column(self, parent: dict, name: str) -> dict:
+        if parent["type"] == "database_id":
+            return self.databases[parent["database_id"]]["properties"][name]
+        if name != "title":
+            raise ValueError(f"{name} is not a property that exists")
+        return {"id": "title", "name": "title", "type": "title"}
+
+    def _title_column(self, parent: dict) -> str:
+        if parent["type"] == "database_id":
+            return next(n for n, c in self.databases[parent["database_id"]]["properties"].items() if c["type"] == "title")
+        return "title"
+
+    def _page(self, body: dict) -> dict:
+        parent = _normalize_parent(body["parent"])
+        if parent["type"] == "database_id" and parent["database_id"] not in self.databases:
+            raise KeyError(parent["database_id"])
+        data = self._meta("page", parent)
+        data["icon"] = body.get("icon")
+        data["cover"] = body.get("cover")
+        data["properties"] = {}
+        if parent["type"] == "database_id":
+            for name, column in self.databases[parent["database_id"]]["properties"].items():
+                data["properties"][name] = {"id": column["id"], "type": column["type"], column["type"]: self._empty(column, data)}
+        else:
+            data["properties"]["title"] = {"id": "title", "type": "title", "title": []}
+        self._set_values(data, body.get("properties") or {})
+        self.pages[data["id"]] = data
+        self._add_child(parent, data["id"], "child_page", _plain(data["properties"][self._title_column(parent)]["title"]))
+        for block in body.get("children") or []:
+            self._block(data["id"], "page_id", block)
+        return data
+
+    def _empty(self, column: dict, page: dict):
+        column_type = column["type"]
+        if column_type in ("title", "rich_text", "multi_select", "people", "files", "relation"):
+            return []
+        if column_type == "checkbox":
+            return False
+        if column_type == "created_time":
+            return page["created_time"]
+        if column_type == "last_edited_time":
+            return page["last_edited_time"]
+        if column_type in ("created_by", "last_edited_by"):
+            return USER
+        if column_type == "unique_id":
+            self.unique_ids += 1
+            return {"prefix": column["unique_id"].get("prefix"), "number": self.unique_ids}
+        return None
+
+    def _set_values(self, page: dict, properties: dict):
+        for name, value in properties.items():
+            column = self._column(page["parent"], name)
+            column_type = column["type"]
+            if column_type not in value:
+                raise ValueError(f"{name} is expected to be {column_type}.")
+            value = copy.deepcopy(value[column_type])
+            if column_type in ("title", "rich_text"):
+                value = _rich_text(value)
+            elif column_type in ("select", "status"):
+                value = None if value is None else self._option(column, value)
+            elif column_type == "multi_select":
+                value = [self._option(column, i) for i in value]
+            elif column_type == "date" and value is not None:
+                value = {"start": value["start"], "end": value.get("end"), "time_zone": value.get("time_zone")}
+            elif column_type == "relation":
+                value = [{"id": i["id"]} for i in value]
+            elif column_type in ("created_time", "last_edited_time", "created_by", "last_edited_by", "formula", "rollup", "unique_id"):
+                raise ValueError(f"{name} can not be edited")
+            item = {"id": column["id"], "type": column_type, column_type: value}
+            if column_type == "relation":
+                item["has_more"] = False
+            page["properties"][name] = item
+
+    def _option(self, column: dict, value: dict) -> dict:
+        options = column[column["type"]]["options"]
+        option = next((i for i in options if i["name"] == value.get("name") or i["id"] == value.get("id")), None)
+        if option is None:
+            if column["type"] == "status":
+                raise ValueError(f"Invalid status option {value}")
+            option = {"id": str(uuid.uuid4())[:4], "name": value["name"], "color": value.get("color", "default")}
+            options.append(option)
+        return dict(option)
+
+    def _add_child(self, parent: dict, child_id: str, block_type: str, title: str):
+        """ child pages and databases are also blocks of their parent page. """
+        if parent["type"] not in ("page_id", "block_id"):
+            return
+        data = self._meta("block", parent)
+        data.update({"id": child_id, "has_children": False, "type": block_type, block_type: {"title": title}})
+        for key in ("icon", "cover", "url", "public_url"):
+            del data[key]
+        self.blocks[child_id] = data
+        self.children.setdefault(parent[parent["type"]], []).append(child_id)
+
+    def _block(self, parent_id: str, parent_type: str, body: dict, after: None | str = None) -> dict:
+        body = copy.deepcopy(body)
+        block_type = body.get("type") or next(k for k in body if k not in ("object", "type"))
+        content = body[block_type]
+        children = content.pop("children", None) or body.pop("children", None) or []
+        if "rich_text" in content:
+            content["rich_text"] = _rich_text(content["rich_text"])
+        if block_type in ("paragraph", "heading_1", "heading_2", "heading_3", "bulleted_list_item",
+                          "numbered_list_item", "to_do", "toggle", "quote", "callout"):
+            content.setdefault("color", "default")
+        data = self._meta("block", {"type": parent_type, parent_type: parent_id})
+        for key in ("icon", "cover", "url", "public_url"):
+            del data[key]
+        data.update({"has_children": bool(children), "type": block_type, block_type: content})
+        self.blocks[data["id"]] = data
+        siblings = self.children.setdefault(parent_id, [])
+        siblings.insert(siblings.index(after) + 1 if after else len(siblings), data["id"])
+        for child in children:
+            self._block(data["id"], "block_id", child)
+        return data
+
+    """ Endpoints """
+
+    def retrieve_database(self, database_id, body, query):
+        return self.databases[_id(database_id)]
+
+    def update_database(self, database_id, body, query):
+        data = self.databases[_id(database_id)]
+        for key in ("title", "description"):
+            if key in body:
+                data[key] = _rich_text(body[key])
+        for key in ("icon", "cover", "is_inline", "archived"):
+            if key in body:
+                data[key] = body[key]
+        self._set_columns(data, body.get("properties") or {})
+        data["last_edited_time"] = self._tick()
+        return data
+
+    def create_database(self, body, query):
+        return self._database(body)
+
+    def query_database(self, database_id, body, query):
+        database_id = _id(database_id)
+        database = self.databases[database_id]
+        body = body or {}
+        rows = [i for i in self.rows(database_id) if _match(database, i, body.get("filter"))]
+        for sort in reversed(body.get("sorts") or []):
+            if "timestamp" in sort:
+                key = lambda i, s=sort: i[s["timestamp"]]
+            else:
+                key = lambda i, s=sort: _sort_key(i["properties"][s["property"]])
+            rows.sort(key=key, reverse=sort.get("direction") == "descending")
+        return self._paginate(rows, body)
+
+    def _paginate(self, items: list, body: dict) -> dict:
+        start = 0
+        if body.get("start_cursor"):
+            if body["start_cursor"] not in self.cursors:
+                raise ValueError("The start_cursor provided is invalid")
+            start = self.cursors[body["start_cursor"]]
+        page_size = body.get("page_size") or 100
+        end = start + page_size
+        next_cursor = None
+        if end < len(items):
+            next_cursor = str(uuid.uuid4())
+            self.cursors[next_cursor] = end
+        return {
+            "object": "list",
+            "results": items[start:end],
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+            "type": "page_or_database",
+            "page_or_database": {},
+        }
+
+    def retrieve_page(self, page_id, body, query):
+        return self.pages[_id(page_id)]
+
+    def update_page(self, page_id, body, query):
+        data = self.pages[_id(page_id)]
+        self._set_values(data, body.get("properties") or {})
+        for key in ("icon", "cover", "archived"):
+            if key in body:
+                data[key] = body[key]
+        data["last_edited_time"] = self._tick()
+        for item in data["properties"].values():
+            if item["type"] == "last_edited_time":
+                item["last_edited_time"] = data["last_edited_time"]
+        return data
+
+    def create_page(self, body, query):
+        return self._page(body)
+
+    def retrieve_page_property(self, page_id, property_id, body, query):
+        page = self.pages[_id(page_id)]
+        item = next(i for i in page["properties"].values() if i["id"] == property_id)
+        if item["type"] != "relation":
+            return {"object": "property_item", "type": item["type"], item["type"]: item[item["type"]]}
+        results = [{"object": "property_item", "type": "relation", "relation": i} for i in item["relation"]]
+        return {"object": "list", "results": results, "has_more": False, "next_cursor": None, "next_url": None}
+
+    def retrieve_block(self, block_id, body, query):
+        return self.blocks[_id(block_id)]
+
+    def delete_block(self, block_id, body, query):
+        block_id = _id(block_id)
+        data = self.blocks[block_id]
+        data["archived"] = True
+        parent = data["parent"]
+        self.children[parent[parent["type"]]].remove(block_id)
+        for objects in (self.pages, self.databases):
+            if block_id in objects:
+                objects[block_id]["archived"] = True
+        return data
+
+    def list_children(self, block_id, body, query):
+        block_id = _id(block_id)
+        if block_id not in self.blocks and block_id not in self.pages:
+            raise KeyError(block_id)
+        children = [self.blocks[i] for i in self.children.get(block_id, [])]
+        return self._paginate(children, {"start_cursor": query.get("start_cursor"), "page_size": int(query.get("page_size", 100))})
+
+    def append_children(self, block_id, body, query):
+        block_id = _id(block_id)
+        if len(body["children"]) > 100:
+            raise ValueError("body.children.length should be ≤ `100`")
+        parent_type = "page_id" if block_id in self.pages else "block_id"
+        if parent_type == "block_id":
+            self.blocks[block_id]["has_children"] = True
+        after = body.get("after")
+        results = []
+        for child in body["children"]:
+            block = self._block(block_id, parent_type, child, after=after)
+            after = block["id"]
+            results.append(block)
+        return {"object": "list", "results": results, "next_cursor": None, "has_more": False, "type": "block", "block": {}}
+
+    def search(self, body, query):
+        body = body or {}
+        items = [i for i in [*self.databases.values(), *self.pages.values()] if not i["archived"]]
+        if body.get("filter"):
+            items = [i for i in items if i["object"] == body["filter"]["value"]]
+        return self._paginate(items, body)
+
+
+def _id(object_id: str) -> str:
+    return str(uuid.UUID(object_id))
+
+
+def _normalize_parent(parent: dict) -> dict:
+    parent_type = parent.get("type") or next(iter(parent))
+    if parent_type == "workspace":
+        return {"type": "workspace", "workspace": True}
+    return {"type": parent_type, parent_type: _id(parent[parent_type])}
+
+
+def _sort_key(item: dict):
+    value = item[item["type"]]
+    if item["type"] in ("title", "rich_text"):
+        return _plain(value)
+    if isinstance(value, dict):
+        return value.get("name") or value.get("start") or ""
+    return (value is None, value)
+
+
+def _match(database: dict, page: dict, condition: None | dict) -> bool:
+    if not condition:
+        return True
+    if "or" in condition:
+        return any(_match(database, page, i) for i in condition["or"])
+    if "and" in condition:
+        return all(_match(database, page, i) for i in condition["and"])
+    if "timestamp" in condition:
+        value = page[condition["timestamp"]]
+        (operator, operand), = condition[condition["timestamp"]].items()
+        return _compare(operator, value, operand)
+    item = page["properties"][condition["property"]]
+    value = item[item["type"]]
+    (operator, operand), = next(v for k, v in condition.items() if k != "property").items()
+    if item["type"] in ("title", "rich_text"):
+        value = _plain(value)
+    elif item["type"] in ("select", "status"):
+        value = None if value is None else value["name"]
+    elif item["type"] == "multi_select":
+        value = [i["name"] for i in value]
+    elif item["type"] == "unique_id":
+        value = value["number"]
+    elif item["type"] == "relation":
+        value = [i["id"] for i in value]
+    return _compare(operator, value, operand)
+
+
+def _compare(operator: str, value, operand) -> bool:
+    if operator == "equals":
+        return value == operand
+    if operator == "does_not_equal":
+        return value != operand
+    if operator == "contains":
+        return operand in (value or [])
+    if operator == "is_empty":
+        return value in (None, "", [])
+    if operator == "is_not_empty":
+        return value not in (None, "", [])
+    if operator == "on_or_after":
+        return value >= operand
+    if operator == "greater_than":
+        return value is not None and value > operand
+    if operator == "less_than":
+        return value is not None and value < operand
+    raise ValueError(f"unsupported filter operator {operator}")
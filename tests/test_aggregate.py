@@ -0,0 +1,55 @@
+from datetime import datetime as dt, timedelta, timezone
+
+import pytest
+
+
+async def budget(fake, client):
+    database_id = fake.add_database("Budget", {
+        "Name": {"type": "title"},
+        "Amount": {"type": "number"},
+        "Team": {"type": "select", "select": {"options": [{"name": "a"}, {"name": "b"}]}},
+        "Due": {"type": "date"},
+        "Done": {"type": "checkbox"},
+    })
+    fake.add_page(database_id, "1", Amount=10, Team={"name": "a"}, Due={"start": "2024-01-01"}, Done=True)
+    fake.add_page(database_id, "2", Amount=20, Team={"name": "a"}, Due={"start": "2024-01-11"})
+    fake.add_page(database_id, "3", Amount=30, Team={"name": "b"}, Due={"start": "2024-01-05"}, Done=True)
+    fake.add_page(database_id, "4", Team={"name": "b"})
+    database = await client.fetch_database(database_id)
+    await database.fetch_child_pages()
+    return database
+
+
+async def test_aggregate(fake, client):
+    database = await budget(fake, client)
+    result = database.aggregate({
+        "Amount": ["sum", "average", "median", "range", "empty"],
+        "Done": "percent_checked",
+        "Team": "count_per_group",
+        "Due": ["earliest_date", "latest_date", "date_range"],
+    })
+    assert result["Amount"] == {"sum": 60.0, "average": 20.0, "median": 20.0, "range": 20.0, "empty": 1}
+    assert result["Done"] == 0.5
+    assert result["Team"] == {"a": 2, "b": 2}
+    assert result["Due"] == {
+        "earliest_date": dt(2024, 1, 1, tzinfo=timezone.utc),
+        "latest_date": dt(2024, 1, 11, tzinfo=timezone.utc),
+        "date_range": timedelta(days=10),
+    }
+
+
+async def test_aggregate_group_by(fake, client):
+    database = await budget(fake, client)
+    assert database.aggregate({"Amount": "sum", "Name": "count"}, group_by="Team") == {
+        "a": {"Amount": 30.0, "Name": 2},
+        "b": {"Amount": 30.0, "Name": 2},
+    }
+    assert database.aggregate({"Name": "show_original"}, group_by="Amount") == {
+        10.0: {"Name": ["1"]}, 20.0: {"Name": ["2"]}, 30.0: {"Name": ["3"]}, None: {"Name": ["4"]}}
+
+
+async def test_aggregate_empty_and_wrong_columns(fake, client):
+    database = await budget(fake, client)
+    assert database.aggregate({"Amount": "max"}, group_by="Due")[None] == {"Amount": None}
+    with pytest.raises(ValueError):
+        database.aggregate({"Team": "sum"})
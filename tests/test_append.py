@@ -0,0 +1,27 @@
+import pytest
+
+from notion.block import Paragraph, BulletedListItem
+from notion.notion_client import APIResponseError
+
+
+async def test_chunks_of_100_in_order(fake, client):
+    page = await client.fetch_page(fake.add_page(None, "doc"))
+    blocks = [Paragraph.new(str(i)) for i in range(250)]
+    blocks[120].children = [BulletedListItem.new(f"120.{i}") for i in range(130)]
+    created = await page.append_blocks(blocks, max_concurrency=3)
+
+    appends = fake.sent("PATCH", r"blocks/.*/children")
+    assert all(len(body["children"]) <= 100 for body in appends)
+    assert [len(body["children"]) for body in appends if body["children"][0]["type"] == "paragraph"] == [100, 100, 50]
+    tree = fake.tree(str(page.id))
+    assert [text for _, text, _ in tree] == [str(i) for i in range(250)]
+    assert [text for _, text, _ in tree[120][2]] == [f"120.{i}" for i in range(130)]
+    assert [block.get_text() for block in created] == [str(i) for i in range(250)]
+    assert [block.get_text() for block in created[120].children] == [f"120.{i}" for i in range(130)]
+
+
+async def test_append_raises_api_errors_unwrapped(fake, client):
+    page = await client.fetch_page(fake.add_page(None, "doc"))
+    fake.fail("PATCH", r"blocks/.*/children", 400)
+    with pytest.raises(APIResponseError):
+        await page.append_blocks([Paragraph.new("a")])
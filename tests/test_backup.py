@@ -0,0 +1,47 @@
+from notion.backup import Backup, DirectoryStore, SqliteStore
+
+from fake_notion import rich_text
+
+
+def workspace(fake) -> list[str]:
+    root = fake.add_page(None, "root")
+    pages = [fake.add_page(root, f"page {i}") for i in range(5)]
+    for page_id in pages:
+        fake.append_children(page_id, body={"children": [{"type": "paragraph", "paragraph": {"rich_text": [rich_text(page_id)]}}]}, query={})
+    return [root, *pages]
+
+
+async def test_incremental_backup(fake, client, tmp_path):
+    pages = workspace(fake)
+    stats = await Backup(client, str(tmp_path / "backup.sqlite")).run()
+    assert stats == {"seen": 6, "fetched": 6, "written": 6, "skipped": 0, "failed": 0}
+
+    fake.clock = fake.clock.replace(year=2025)
+    fake.update_page(pages[1], body={"icon": {"type": "emoji", "emoji": "🚀"}}, query={})
+    stats = await Backup(client, str(tmp_path / "backup.sqlite")).run()
+    assert stats == {"seen": 6, "fetched": 1, "written": 1, "skipped": 5, "failed": 0}
+
+
+async def test_failed_objects_are_recorded(fake, client, tmp_path):
+    pages = workspace(fake)
+    fake.fail("GET", rf"blocks/{pages[2]}/children", 404)
+    stats = await Backup(client, str(tmp_path / "backup"), max_concurrency=2).run()
+    assert stats["written"] == 5 and stats["failed"] == 1
+    failure, = DirectoryStore(str(tmp_path / "backup")).failures()
+    assert failure["id"] == pages[2] and failure["error"].startswith("APIResponseError")
+
+    stats = await Backup(client, str(tmp_path / "backup")).run()
+    assert stats["written"] == 1 and stats["failed"] == 0
+    assert DirectoryStore(str(tmp_path / "backup")).failures() == []
+
+
+async def test_sqlite_store_records_failures(fake, client, tmp_path):
+    pages = workspace(fake)
+    fake.fail("GET", rf"blocks/{pages[0]}/children", 500, times=1)
+    fake.fail("GET", rf"blocks/{pages[3]}/children", 403)
+    backup = Backup(client, str(tmp_path / "backup.sqlite"))
+    stats = await backup.run()
+    assert stats["failed"] == 1 and stats["written"] == 5
+    assert [i["id"] for i in backup.store.failures()] == [pages[3]]
+    backup.store.close()
+    assert isinstance(backup.store, SqliteStore)
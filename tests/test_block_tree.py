@@ -0,0 +1,52 @@
+import pytest
+
+from notion.block import fetch_block_tree
+from notion.notion_client import APIResponseError
+
+from fake_notion import rich_text
+
+
+def paragraph(text: str, children: list[dict] = ()) -> dict:
+    content = {"rich_text": [rich_text(text)]}
+    if children:
+        content["children"] = list(children)
+    return {"type": "paragraph", "paragraph": content}
+
+
+def document(fake) -> str:
+    page_id = fake.add_page(None, "doc")
+    fake.append_children(page_id, body={"children": [
+        paragraph("1", [paragraph("1.1", [paragraph("1.1.1")]), paragraph("1.2")]),
+        paragraph("2"),
+        paragraph("3", [paragraph("3.1")]),
+    ]}, query={})
+    return page_id
+
+
+def outline(blocks, depth: int = 0) -> list[tuple[int, str]]:
+    result = []
+    for block in blocks:
+        result += [(depth, block.get_text())] + outline(block.children, depth + 1)
+    return result
+
+
+async def test_fetch_block_tree(fake, client):
+    page_id = document(fake)
+    blocks = await fetch_block_tree(client.client, page_id, max_concurrency=2)
+    assert outline(blocks) == [
+        (0, "1"), (1, "1.1"), (2, "1.1.1"), (1, "1.2"), (0, "2"), (0, "3"), (1, "3.1")]
+
+
+async def test_fetch_block_tree_pages(fake, client):
+    page_id = fake.add_page(None, "long")
+    fake.append_children(page_id, body={"children": [paragraph(str(i)) for i in range(100)]}, query={})
+    fake.append_children(page_id, body={"children": [paragraph(str(i)) for i in range(100, 150)]}, query={})
+    blocks = await fetch_block_tree(client.client, page_id)
+    assert [block.get_text() for block in blocks] == [str(i) for i in range(150)]
+
+
+async def test_fetch_block_tree_raises_api_errors_unwrapped(fake, client):
+    page_id = document(fake)
+    fake.fail("GET", r"blocks/.*/children", 404, times=10)
+    with pytest.raises(APIResponseError):
+        await fetch_block_tree(client.client, page_id)
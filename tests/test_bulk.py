@@ -0,0 +1,101 @@
+from uuid import UUID
+
+import pytest
+
+from notion.bulk import Journal, archive_pages, create_pages, update_pages
+from notion.draft import PageDraft
+from notion.exceptions import BulkOperationError, OperationPendingError
+from notion.notion_client import APIResponseError
+
+
+class Crash(BaseException):
+    """ the process dies """
+
+
+async def contacts(fake, client):
+    database_id = fake.add_database("Contacts", {"Name": {"type": "title"}, "Key": {"type": "rich_text"}, "Age": {"type": "number"}})
+    return await client.fetch_database(database_id)
+
+
+def drafts(database, count: int) -> list[PageDraft]:
+    return [PageDraft(title=f"contact {i}", parent=database) for i in range(count)]
+
+
+async def test_resume_after_a_crash(fake, client, tmp_path):
+    database = await contacts(fake, client)
+    journal = str(tmp_path / "journal.sqlite")
+    keys = [f"contact-{i}" for i in range(10)]
+    created = []
+
+    def on_created(page):
+        created.append(page)
+        if len(created) == 4:
+            raise Crash()
+
+    with pytest.raises(BaseExceptionGroup) as e:
+        await create_pages(client.client, drafts(database, 10), keys=keys, journal=journal,
+                           max_concurrency=2, on_created=on_created)
+    assert e.group_contains(Crash)
+    with Journal(journal) as j:
+        done, pending = j.entries("done"), j.entries("pending")
+    assert len(done) < 10 and len(pending) >= 1
+
+    sent = len(fake.sent("POST", "pages"))
+    with pytest.raises(BulkOperationError) as e:
+        await create_pages(client.client, drafts(database, 10), keys=keys, journal=journal)
+    # the pending creations may have created their page, they are left to the caller
+    assert sorted(e.value.errors) == sorted(i["key"] for i in pending)
+    assert len(fake.sent("POST", "pages")) - sent == 10 - len(done) - len(pending)
+    with Journal(journal) as j:
+        assert {i["key"]: i["page_id"] for i in j.entries("done")} == {
+            key: page_id for key, page_id in zip(keys, e.value.results) if page_id is not None}
+
+
+async def test_pending_creates_are_not_resent_without_a_token(fake, client, tmp_path):
+    database = await contacts(fake, client)
+    journal = str(tmp_path / "journal.sqlite")
+    keys = [f"contact-{i}" for i in range(3)]
+
+    def on_created(page):
+        raise Crash()
+
+    with pytest.raises(BaseExceptionGroup):
+        await create_pages(client.client, drafts(database, 1), keys=keys[:1], journal=journal, on_created=on_created)
+    assert len(fake.rows(database.id)) == 1
+
+    with pytest.raises(BulkOperationError) as e:
+        await create_pages(client.client, drafts(database, 3), keys=keys, journal=journal)
+    assert list(e.value.errors) == ["contact-0"]
+    assert isinstance(e.value.errors["contact-0"], OperationPendingError)
+    assert e.value.results[0] is None and None not in e.value.results[1:]
+    assert len(fake.rows(database.id)) == 3
+
+    with Journal(journal) as j:
+        assert [i["key"] for i in j.entries("pending")] == ["contact-0"]
+        j.forget("contact-0")
+    await create_pages(client.client, drafts(database, 3), keys=keys, journal=journal)
+    assert len(fake.rows(database.id)) == 4
+
+
+async def test_failed_operations_do_not_stop_the_others(fake, client, tmp_path):
+    database = await contacts(fake, client)
+    journal = str(tmp_path / "journal.sqlite")
+    await database.fetch_child_pages()
+    ids = await database.create_pages(drafts(database, 5), journal=journal)
+    pages = [database.pages[UUID(i)] for i in ids]
+    for i, page in enumerate(pages):
+        page.properties["Age"].number = 20 + i
+    fake.fail("PATCH", f"pages/{ids[2]}", 400)
+    with pytest.raises(BulkOperationError) as e:
+        await update_pages(client.client, pages, journal=journal)
+    error, = e.value.errors.values()
+    assert isinstance(error, APIResponseError)
+    assert [i["properties"]["Age"]["number"] for i in fake.rows(database.id)] == [20, 21, None, 23, 24]
+    with Journal(journal) as j:
+        assert len(j.entries("failed")) == 1
+
+    sent = len(fake.sent("PATCH", r"pages/.*"))
+    await update_pages(client.client, pages, journal=journal)
+    assert len(fake.sent("PATCH", r"pages/.*")) - sent == 1
+    assert await archive_pages(client.client, ids, journal=journal) == ids
+    assert fake.rows(database.id) == []
@@ -0,0 +1,76 @@
+from notion.draft import PageDraft
+
+from fake_notion import rich_text
+
+
+async def tasks(fake, client):
+    projects_id = fake.add_database("Projects", {"Name": {"type": "title"}})
+    first, second = fake.add_page(projects_id, "first"), fake.add_page(projects_id, "second")
+    tasks_id = fake.add_database("Tasks", {
+        "Name": {"type": "title"},
+        "Points": {"type": "number"},
+        "Notes": {"type": "rich_text"},
+        "Project": {"type": "relation", "relation": {"database_id": projects_id, "type": "single_property", "single_property": {}}},
+    })
+    fake.add_page(tasks_id, "task", Points=3, Notes=[rich_text("note", bold=True)], Project=[{"id": first}])
+    projects = await client.fetch_database(projects_id)
+    await projects.fetch_child_pages()
+    database = await client.fetch_database(tasks_id)
+    await database.fetch_child_pages()
+    task, = database.pages.values()
+    return database, task, first, second
+
+
+def ids(column) -> list[list[str]]:
+    return [[str(i.id) for i in row] for row in column]
+
+
+async def test_no_op_update_sends_nothing(fake, client):
+    database, task, first, _ = await tasks(fake, client)
+    task.properties["Points"].number = 3
+    task.properties["Project"].clear_pages()
+    task.properties["Project"].add_page(first)
+    await task.update(archived=False)
+    assert fake.sent("PATCH", r"pages/.*") == []
+    # the bold annotation is dropped
+    task.properties["Notes"].set_text("note")
+    assert list(task.changed_properties()) == ["Notes"]
+
+
+async def test_update_sends_only_changed_properties(fake, client):
+    database, task, *_ = await tasks(fake, client)
+    task.properties["Points"].number = 3
+    await task.update()
+    assert fake.sent("PATCH", r"pages/.*") == []
+    task.properties["Points"].number = 5
+    await task.update()
+    body, = fake.sent("PATCH", r"pages/.*")
+    assert list(body["properties"]) == ["Points"]
+    assert fake.pages[str(task.id)]["properties"]["Points"]["number"] == 5
+    await task.update()
+    assert len(fake.sent("PATCH", r"pages/.*")) == 1
+
+
+async def test_relation_changes_are_tracked(fake, client):
+    database, task, first, second = await tasks(fake, client)
+    database.create_index("Project")
+    assert database.find("Project", first) == [task]
+    assert ids(database.column("Project")) == [[first]]
+
+    task.properties["Project"].add_page(second)
+    assert database.find("Project", second) == [task]
+    assert ids(database.column("Project")) == [[first, second]]
+    assert list(task.changed_properties()) == ["Project"]
+
+    task.properties["Project"].delete_page(first)
+    assert database.find("Project", first) == []
+    assert ids(database.column("Project")) == [[second]]
+
+    await task.update()
+    body, = fake.sent("PATCH", r"pages/.*")
+    assert body["properties"]["Project"]["relation"] == [{"id": second}]
+
+    task.properties["Project"].add_page(first)
+    task.properties["Project"].delete_page(first)
+    await task.update()
+    assert len(fake.sent("PATCH", r"pages/.*")) == 1
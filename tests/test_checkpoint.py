@@ -0,0 +1,74 @@
+import json
+import os
+
+import pytest
+
+from notion.query import iter_query
+
+
+class Crash(Exception):
+    pass
+
+
+def events(fake, count: int) -> str:
+    database_id = fake.add_database("Events", {"Name": {"type": "title"}, "Seq": {"type": "number"}})
+    for i in range(count):
+        fake.add_page(database_id, f"event {i}", Seq=i)
+    return database_id
+
+
+async def scan(client, database_id, checkpoint, stop_after=None) -> list[int]:
+    seen = []
+    responses = 0
+    async for results in iter_query(client.client, database_id, page_size=10, checkpoint=checkpoint, checkpoint_interval=2):
+        seen += [i["properties"]["Seq"]["number"] for i in results]
+        responses += 1
+        if responses == stop_after:
+            raise Crash()
+    return seen
+
+
+async def test_resume_from_checkpoint(fake, client, tmp_path):
+    database_id = events(fake, 95)
+    checkpoint = str(tmp_path / "scan.json")
+    with pytest.raises(Crash):
+        await scan(client, database_id, checkpoint, stop_after=5)
+    assert json.load(open(checkpoint))["count"] == 40
+
+    queries = len(fake.sent("POST", r"databases/.*/query"))
+    seen = await scan(client, database_id, checkpoint)
+    assert seen == list(range(40, 95))
+    assert len(fake.sent("POST", r"databases/.*/query")) - queries == 6
+    assert not os.path.exists(checkpoint)
+
+
+async def test_resume_with_an_expired_cursor(fake, client, tmp_path):
+    database_id = events(fake, 95)
+    checkpoint = str(tmp_path / "scan.json")
+    with pytest.raises(Crash):
+        await scan(client, database_id, checkpoint, stop_after=5)
+    fake.expire_cursors()
+    queries = len(fake.sent("POST", r"databases/.*/query"))
+    # edited after the checkpoint, so they are after the watermark
+    for row in fake.rows(database_id):
+        if row["properties"]["Seq"]["number"] in (3, 50):
+            fake.update_page(row["id"], body={"properties": {"Seq": {"number": row["properties"]["Seq"]["number"]}}}, query={})
+
+    seen = await scan(client, database_id, checkpoint)
+    # the pages edited at the watermark (event 39) are returned again
+    assert sorted(seen) == [3, *range(39, 95)]
+    assert not os.path.exists(checkpoint)
+    expired, restarted = fake.sent("POST", r"databases/.*/query")[queries:queries + 2]
+    assert "start_cursor" in expired
+    assert "start_cursor" not in restarted and "last_edited_time" in json.dumps(restarted["filter"])
+
+
+async def test_checkpoint_of_another_query_is_ignored(fake, client, tmp_path):
+    database_id = events(fake, 30)
+    checkpoint = str(tmp_path / "scan.json")
+    with pytest.raises(Crash):
+        await scan(client, database_id, checkpoint, stop_after=2)
+    seen = []
+    async for results in iter_query(client.client, database_id, filter={"property": "Seq", "number": {"less_than": 100}}, checkpoint=checkpoint):
+        seen += results
+    assert len(seen) == 30
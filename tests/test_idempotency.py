@@ -0,0 +1,101 @@
+import pytest
+
+from notion.bulk import Journal, create_page, create_pages
+from notion.draft import PageDraft
+from notion.exceptions import BulkOperationError
+from notion.notion_client import APIResponseError
+from notion.notion_client.errors import RequestTimeoutError
+
+
+class Crash(BaseException):
+    """ the process dies """
+
+
+async def orders(fake, client):
+    database_id = fake.add_database("Orders", {"Name": {"type": "title"}, "Token": {"type": "rich_text"}})
+    return await client.fetch_database(database_id)
+
+
+@pytest.mark.parametrize("error", ["timeout", 500, 503])
+async def test_retried_creation_returns_the_page_created_first(fake, client, error):
+    database = await orders(fake, client)
+    fake.fail("POST", "pages", error, after=True)
+    page = await database.create_page(PageDraft(title="order", parent=database), token="order-1", token_property="Token")
+    row, = fake.rows(database.id)
+    assert row["id"] == str(page.id)
+    assert len(fake.sent("POST", "pages")) == 1
+    lookup, = fake.sent("POST", r"databases/.*/query")
+    assert lookup["filter"] == {"property": "Token", "rich_text": {"equals": "order-1"}}
+
+
+async def test_retried_creation_is_sent_again_if_not_created(fake, client):
+    database = await orders(fake, client)
+    fake.fail("POST", "pages", "timeout")
+    await database.create_page(PageDraft(title="order", parent=database), token="order-1", token_property="Token")
+    assert len(fake.rows(database.id)) == 1
+    assert len(fake.sent("POST", "pages")) == 2
+
+
+async def test_creation_without_token_is_not_retried(fake, client):
+    database = await orders(fake, client)
+    request = PageDraft(title="order", parent=database).model_dump()
+    fake.fail("POST", "pages", "timeout", after=True)
+    with pytest.raises(RequestTimeoutError):
+        await create_page(client.client, request)
+    fake.fail("POST", "pages", 502, after=True)
+    with pytest.raises(APIResponseError):
+        await create_page(client.client, request)
+    assert len(fake.rows(database.id)) == 2
+    assert len(fake.sent("POST", "pages")) == 2
+
+    # rate limited requests were not processed, they are retried
+    fake.fail("POST", "pages", 429)
+    await create_page(client.client, request)
+    assert len(fake.rows(database.id)) == 3
+
+
+async def test_bulk_creation_without_token_stays_pending(fake, client, tmp_path):
+    database = await orders(fake, client)
+    journal = str(tmp_path / "journal.sqlite")
+    fake.fail("POST", "pages", "timeout", after=True)
+    with pytest.raises(BulkOperationError):
+        await create_pages(client.client, [PageDraft(title="order", parent=database)], keys=["order-1"], journal=journal)
+    with pytest.raises(BulkOperationError):
+        await create_pages(client.client, [PageDraft(title="order", parent=database)], keys=["order-1"], journal=journal)
+    assert len(fake.rows(database.id)) == 1
+
+    ids = await create_pages(client.client, [PageDraft(title="order", parent=database)], keys=["order-1"], journal=str(tmp_path / "other.sqlite"), token_property="Token")
+    assert len(fake.rows(database.id)) == 2
+    ids_again = await create_pages(client.client, [PageDraft(title="order", parent=database)], keys=["order-1"], journal=str(tmp_path / "other.sqlite"), token_property="Token")
+    assert ids_again == ids
+
+
+async def test_bulk_creation_resumes_after_a_crash(fake, client, tmp_path):
+    database = await orders(fake, client)
+    journal = str(tmp_path / "journal.sqlite")
+    keys = [f"order-{i}" for i in range(10)]
+    created = []
+
+    def on_created(page):
+        created.append(page)
+        if len(created) == 4:
+            raise Crash()
+
+    with pytest.raises(BaseExceptionGroup) as e:
+        await create_pages(client.client, [PageDraft(title=f"order {i}", parent=database) for i in range(10)], keys=keys, journal=journal,
+                           max_concurrency=2, on_created=on_created, token_property="Token")
+    assert e.group_contains(Crash)
+    with Journal(journal) as j:
+        done, pending = j.entries("done"), j.entries("pending")
+    assert len(done) < 10 and len(pending) >= 1
+    existing = len(fake.rows(database.id))
+    assert existing > len(done)
+
+    sent = len(fake.sent("POST", "pages"))
+    ids = await create_pages(client.client, [PageDraft(title=f"order {i}", parent=database) for i in range(10)], keys=keys, journal=journal, token_property="Token")
+    assert len(set(ids)) == 10
+    assert sorted(i["id"] for i in fake.rows(database.id)) == sorted(ids)
+    # the pages created before the crash were found by their token
+    assert len(fake.sent("POST", "pages")) - sent == 10 - existing
+    with Journal(journal) as j:
+        assert [i["page_id"] for i in sorted(j.entries("done"), key=lambda i: keys.index(i["key"]))] == ids
@@ -0,0 +1,35 @@
+import io
+
+from fake_notion import rich_text
+
+
+def block(block_type: str, text: str = "", children: list[dict] = (), **content) -> dict:
+    if text or block_type not in ("divider",):
+        content.setdefault("rich_text", [rich_text(text)])
+    if children:
+        content["children"] = list(children)
+    return {"type": block_type, block_type: content}
+
+
+async def test_export_markdown(fake, client):
+    page_id = fake.add_page(None, "doc")
+    fake.append_children(page_id, body={"children": [
+        block("heading_1", "Title"),
+        {"type": "paragraph", "paragraph": {"rich_text": [rich_text("bold", bold=True), rich_text(" and "), rich_text("code", code=True)]}},
+        block("bulleted_list_item", "one", [block("bulleted_list_item", "nested")]),
+        block("bulleted_list_item", "two"),
+        block("to_do", "done", checked=True),
+        {"type": "divider", "divider": {}},
+        block("code", 'print("hi")', language="python", caption=[]),
+    ]}, query={})
+    page = await client.fetch_page(page_id)
+    chunks = [chunk async for chunk in page.iter_markdown()]
+    assert "".join(chunks) == (
+        "# Title\n"
+        "\n**bold** and `code`\n"
+        "\n- one\n  - nested\n- two\n"
+        "- [x] done\n"
+        "\n---\n"
+        '\n```python\nprint("hi")\n```\n'
+    )
+    assert (await page.export_markdown(io.StringIO())).getvalue() == "".join(chunks)
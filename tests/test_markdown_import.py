@@ -0,0 +1,54 @@
+from notion.markdown import markdown_to_blocks
+
+DOCUMENT = """# Title
+
+Some **bold**, *italic*, `code` and [a link](https://example.com/).
+
+## List
+
+- one
+  - nested
+    - deeper
+- two
+
+Between the lists.
+
+1. first
+2. second
+
+> a quote
+
+- [ ] todo
+- [x] done
+
+```python
+print("hi")
+```
+
+---
+
+| a | b |
+| --- | --- |
+| 1 | 2 |
+"""
+
+
+async def test_markdown_round_trip(fake, client):
+    page = await client.fetch_page(fake.add_page(None, "doc"))
+    await page.import_markdown(DOCUMENT)
+    assert "".join([chunk async for chunk in page.iter_markdown()]) == DOCUMENT
+
+
+async def test_long_documents_are_sent_in_chunks(fake, client):
+    page = await client.fetch_page(fake.add_page(None, "doc"))
+    document = "\n\n".join(f"paragraph {i}" for i in range(230)) + "\n"
+    await page.import_markdown(document)
+    assert [len(body["children"]) for body in fake.sent("PATCH", r"blocks/.*/children")] == [100, 100, 30]
+    assert "".join([chunk async for chunk in page.iter_markdown()]) == document
+
+
+def test_links_are_set_like_in_responses():
+    paragraph, = markdown_to_blocks("[a link](https://example.com/)")
+    text, = paragraph.paragraph.rich_text
+    assert text.href == "https://example.com/"
+    assert str(text.text.link.url) == "https://example.com/"
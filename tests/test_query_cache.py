@@ -0,0 +1,70 @@
+from notion.cache import cache
+from notion.draft import PageDraft
+from notion.bulk import find_by_token
+
+from fake_notion import rich_text
+
+
+QUERY = r"databases/.*/query"
+
+
+async def people(fake, client, count: int = 3):
+    database_id = fake.add_database("People", {"Name": {"type": "title"}, "Age": {"type": "number"}})
+    for i in range(count):
+        fake.add_page(database_id, f"person {i}", Age=20 + i)
+    return await client.fetch_database(database_id)
+
+
+async def test_identical_queries_are_cached(fake, connect):
+    client = connect(query_ttl=60)
+    database = await people(fake, client)
+    await database.fetch_child_pages()
+    await database.fetch_child_pages()
+    assert len(fake.sent("POST", QUERY)) == 1
+    assert (cache.queries.hits, cache.queries.misses) == (1, 1)
+    # iter_query does not use the cache unless asked to
+    await client.client.databases.query(database_id=str(database.id), cache=False)
+    assert len(fake.sent("POST", QUERY)) == 2
+
+
+async def test_create_and_update_invalidate(fake, connect):
+    client = connect(query_ttl=60)
+    database = await people(fake, client)
+    await database.fetch_child_pages()
+
+    draft = PageDraft(title="person 3", parent=database)
+    draft.properties["Age"].number = 23
+    await database.create_page(draft)
+    await database.fetch_child_pages()
+    assert len(fake.sent("POST", QUERY)) == 2
+    assert len(database.pages) == 4
+
+    page = next(i for i in database.pages.values() if i.properties["Age"].number == 20)
+    page.properties["Age"].number = 30
+    await page.update()
+    await database.fetch_child_pages()
+    assert len(fake.sent("POST", QUERY)) == 3
+    assert sorted(i.properties["Age"].number for i in database.pages.values()) == [21, 22, 23, 30]
+
+
+async def test_paginated_queries_are_not_cached(fake, connect):
+    client = connect(query_ttl=60)
+    database = await people(fake, client, count=150)
+    await database.fetch_child_pages()
+    assert len(fake.sent("POST", QUERY)) == 2
+    assert len(cache.queries) == 0
+    # a page added between two scans is in the second one
+    fake.add_page(str(database.id), "person 150", Age=0)
+    await database.fetch_child_pages()
+    assert len(fake.sent("POST", QUERY)) == 4
+    assert len(database.pages) == 151
+
+
+async def test_find_by_token_is_not_cached(fake, connect):
+    client = connect(query_ttl=60)
+    database_id = fake.add_database("Jobs", {"Name": {"type": "title"}, "Token": {"type": "rich_text"}})
+    assert await find_by_token(client.client, database_id, "Token", "abc") is None
+    # created elsewhere, the query cache would not know about it
+    page_id = fake.add_page(database_id, "job", Token=[rich_text("abc")])
+    assert (await find_by_token(client.client, database_id, "Token", "abc"))["id"].replace("-", "") == page_id.replace("-", "")
+    assert len(cache.queries) == 0
@@ -0,0 +1,44 @@
+from notion.page import Page
+
+from fake_notion import rich_text
+
+
+def columns():
+    return {
+        "Name": {"type": "title"},
+        "Budget": {"type": "number"},
+        "Status": {"type": "select", "select": {"options": [{"name": "Todo", "color": "red"}]}},
+        "Tags": {"type": "multi_select", "multi_select": {"options": [{"name": "a"}, {"name": "b"}]}},
+        "Done": {"type": "checkbox"},
+        "Link": {"type": "url"},
+        "Notes": {"type": "rich_text"},
+    }
+
+
+async def test_dump_is_the_response(fake, client):
+    database_id = fake.add_database("Tasks", columns())
+    page_id = fake.add_page(
+        database_id, "first", Budget=2.5, Status={"name": "Todo"}, Tags=[{"name": "a"}, {"name": "b"}],
+        Done=True, Link="https://example.com/a", Notes=[rich_text("bold", bold=True), rich_text(" plain")])
+    page = await client.fetch_page(page_id)
+    dump = page.model_dump()
+    assert dump["properties"] == fake.pages[page_id]["properties"]
+    assert dump["id"] == page_id
+    assert dump["created_time"] == fake.pages[page_id]["created_time"].replace(".000Z", "Z")
+    assert dump["parent"] == {"type": "database_id", "database_id": database_id}
+
+
+async def test_dump_round_trip(fake, client):
+    database_id = fake.add_database("Tasks", columns())
+    page_id = fake.add_page(database_id, "first", Budget=1, Notes=[rich_text("x", italic=True)])
+    page = await client.fetch_page(page_id)
+    dump = page.model_dump()
+    client.cache.pages.objects.clear()
+    assert Page(client=client.client, **dump).model_dump() == dump
+
+
+async def test_dump_include_and_exclude(fake, client):
+    database_id = fake.add_database("Tasks", columns())
+    database = await client.fetch_database(database_id)
+    assert database.model_dump(include={"id", "is_inline"}) == {"id": database_id, "is_inline": False}
+    assert "properties" not in database.model_dump(exclude={"properties"})
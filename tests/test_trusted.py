@@ -0,0 +1,61 @@
+from notion.database import Database
+from notion.page import Page
+
+from fake_notion import rich_text
+
+
+def tasks(fake) -> str:
+    database_id = fake.add_database("Tasks", {
+        "Name": {"type": "title"},
+        "Budget": {"type": "number", "number": {"format": "dollar"}},
+        "Status": {"type": "select", "select": {"options": [{"name": "Todo", "color": "red"}]}},
+        "Tags": {"type": "multi_select", "multi_select": {"options": [{"name": "a"}]}},
+        "Due": {"type": "date"},
+        "Link": {"type": "url"},
+        "Mail": {"type": "email"},
+        "Owner": {"type": "people"},
+        "Created": {"type": "created_time"},
+    })
+    fake.add_page(database_id, "empty")
+    page_id = fake.add_page(
+        database_id, "full", Budget=3, Status={"name": "Todo"}, Tags=[{"name": "a"}],
+        Due={"start": "2024-02-01T10:00:00.000+00:00", "end": "2024-02-03"}, Link="https://example.com/a?b=c",
+        Mail="a@example.com", Owner=[{"object": "user", "id": "6794760a-1f15-45cd-9c65-0dfe42f5135b"}])
+    linked = rich_text("linked")
+    linked["text"]["link"] = {"url": "https://example.com/"}
+    linked["href"] = "https://example.com/"
+    fake.pages[page_id]["properties"]["Name"]["title"].append(linked)
+    fake.pages[page_id]["icon"] = {"type": "emoji", "emoji": "🚀"}
+    return database_id
+
+
+async def test_trusted_and_validated_dumps_are_equal(fake, connect):
+    database_id = tasks(fake)
+    validated = connect()
+    database = await validated.fetch_database(database_id)
+    await database.fetch_child_pages()
+    expected = {str(k): v.model_dump() for k, v in database.pages.items()}
+    expected_database = database.model_dump()
+
+    validated.cache.pages.objects.clear()
+    validated.cache.databases.objects.clear()
+    trusted = connect(trust_responses=True)
+    database = await trusted.fetch_database(database_id)
+    await database.fetch_child_pages()
+    assert database.model_dump() == expected_database
+    assert {str(k): v.model_dump() for k, v in database.pages.items()} == expected
+
+
+async def test_trusted_models_have_the_validated_types(fake, connect):
+    database_id = tasks(fake)
+    client = connect()
+    data = fake.rows(database_id)[1]
+    validated = Page(client=client.client, **data)
+    client.cache.pages.objects.clear()
+    trusted = Page.model_construct_trusted(data)
+    for name, prop in validated.properties.items():
+        assert type(trusted.properties[name]) is type(prop)
+        assert trusted.properties[name].get_value() == prop.get_value()
+    assert trusted.created_time == validated.created_time
+    assert Database.model_construct_trusted(fake.databases[database_id]).model_dump() == \
+        Database(client=client.client, **fake.databases[database_id]).model_dump()
@@ -0,0 +1,66 @@
+import pytest
+
+from notion.draft import PageDraft
+
+from fake_notion import rich_text
+
+
+async def products(fake, client, count: int = 5):
+    database_id = fake.add_database("Products", {
+        "Name": {"type": "title"},
+        "Sku": {"type": "rich_text"},
+        "Price": {"type": "number"},
+        "Tags": {"type": "multi_select", "multi_select": {"options": [{"name": "a"}]}},
+    })
+    for i in range(count):
+        fake.add_page(database_id, f"product {i}", Sku=[rich_text(f"sku-{i}")], Price=i)
+    return await client.fetch_database(database_id)
+
+
+def draft(database, sku: str, price: float) -> PageDraft:
+    d = PageDraft(title=f"product {sku.removeprefix('sku-')}", parent=database)
+    d.properties["Sku"].set_text(sku)
+    d.properties["Price"].number = price
+    return d
+
+
+async def test_upsert_counts(fake, client):
+    database = await products(fake, client)
+    # 0-2 unchanged, 3-4 updated, 5-6 created
+    drafts = [draft(database, f"sku-{i}", i if i < 3 else i * 10) for i in range(7)]
+    report = await database.upsert(drafts, "Sku")
+    assert (sorted(report.unchanged), sorted(report.updated), sorted(report.created), report.failed) == (
+        ["sku-0", "sku-1", "sku-2"], ["sku-3", "sku-4"], ["sku-5", "sku-6"], {})
+    assert len(fake.sent("POST", "pages")) == 2
+    assert sorted((list(body["properties"]), body["properties"]["Price"]["number"]) for body in fake.sent("PATCH", r"pages/.*")) == [
+        (["Price"], 30), (["Price"], 40)]
+    assert sorted(i["properties"]["Price"]["number"] for i in fake.rows(database.id)) == [0, 1, 2, 30, 40, 50, 60]
+
+    report = await database.upsert([draft(database, f"sku-{i}", i if i < 3 else i * 10) for i in range(7)], "Sku")
+    assert (len(report.unchanged), len(report.updated), len(report.created)) == (7, 0, 0)
+
+
+async def test_upsert_uses_the_pages_already_fetched(fake, client):
+    database = await products(fake, client)
+    await database.fetch_child_pages()
+    queries = len(fake.sent("POST", r"databases/.*/query"))
+    report = await database.upsert([draft(database, "sku-1", 1), draft(database, "sku-9", 9)], "Sku")
+    assert (list(report.unchanged), list(report.created)) == (["sku-1"], ["sku-9"])
+    assert len(fake.sent("POST", r"databases/.*/query")) == queries
+
+
+async def test_upsert_reports_failed_writes(fake, client):
+    database = await products(fake, client)
+    failing = next(i["id"] for i in fake.rows(database.id) if i["properties"]["Price"]["number"] == 3)
+    fake.fail("PATCH", f"pages/{failing}", 400)
+    report = await database.upsert([draft(database, f"sku-{i}", 100 + i) for i in range(6)], "Sku")
+    assert list(report.failed) == ["sku-3"]
+    assert (len(report.updated), len(report.created)) == (4, 1)
+
+
+async def test_upsert_key_must_be_matchable(fake, client):
+    database = await products(fake, client)
+    with pytest.raises(ValueError):
+        await database.upsert([draft(database, "sku-1", 1)], "Tags")
+    with pytest.raises(ValueError):
+        await database.upsert([draft(database, "sku-1", 1), draft(database, "sku-1", 2)], "Sku")